@@ -0,0 +1,319 @@
+"""Tabele sumar pentru rapoartele DWH, întreținute incremental alături de FactOrderItems.
+
+- AggDailyProductSales: zi x produs -> sume vânzări / profit / discount
+- AggDailyUserOrders:   zi x utilizator -> număr de comenzi distincte
+- AggDailyDiscount:     zi (+ is_weekend) -> suma raporturilor discount/vânzare și numărul lor
+
+Rapoartele citesc sumarele (un rând per zi x produs/utilizator), deci latența depinde de numărul
+de zile din interval, nu de numărul de fapte. La orice scriere pe FactOrderItems, zilele afectate
+sunt recalculate din tabela brută în aceeași tranzacție (idempotent, corect și pentru COUNT DISTINCT).
+Presupunere: toate rândurile unei comenzi au același time_id (comanda aparține unei singure zile),
+astfel încât comenzile distincte per zi se pot aduna peste zile.
+Recalcularea unei zile (DELETE + INSERT ... SELECT) ține un applock exclusiv `Agg:<time_id>` până
+la COMMIT: două tranzacții care ating aceeași zi o recalculează pe rând, iar a doua vede faptele
+celei dintâi (fără rânduri pierdute sau deadlock între DELETE-uri). Lock-urile se iau în ordinea
+crescătoare a zilelor.
+
+Reconstruire completă:
+    python -m lab2.aggregates --rebuild
+"""
+import argparse
+import threading
+import time
+
+AGG_TABLES = ("AggDailyProductSales", "AggDailyUserOrders", "AggDailyDiscount")
+
+DDL = {
+    "AggDailyProductSales": """
+        CREATE TABLE AggDailyProductSales (
+            time_id INT NOT NULL,
+            product_id INT NOT NULL,
+            sales_sum FLOAT NOT NULL,
+            profit_sum FLOAT NOT NULL,
+            discount_sum FLOAT NOT NULL,
+            fact_count INT NOT NULL,
+            PRIMARY KEY (time_id, product_id)
+        )
+    """,
+    "AggDailyUserOrders": """
+        CREATE TABLE AggDailyUserOrders (
+            time_id INT NOT NULL,
+            user_id INT NOT NULL,
+            order_count INT NOT NULL,
+            PRIMARY KEY (time_id, user_id)
+        )
+    """,
+    "AggDailyDiscount": """
+        CREATE TABLE AggDailyDiscount (
+            time_id INT NOT NULL PRIMARY KEY,
+            is_weekend INT NOT NULL,
+            ratio_sum FLOAT NOT NULL,
+            ratio_count INT NOT NULL
+        )
+    """,
+}
+
+# SELECT-urile care calculează sumarele din FactOrderItems; {where} filtrează zilele
+REFRESH_SQL = {
+    "AggDailyProductSales": """
+        INSERT INTO AggDailyProductSales (time_id, product_id, sales_sum, profit_sum, discount_sum, fact_count)
+        SELECT time_id, product_id, SUM(sales_amount), SUM(sales_amount * profit_margin),
+               SUM(COALESCE(discount_amount, 0)), COUNT(*)
+        FROM FactOrderItems {where}
+        GROUP BY time_id, product_id
+    """,
+    "AggDailyUserOrders": """
+        INSERT INTO AggDailyUserOrders (time_id, user_id, order_count)
+        SELECT time_id, user_id, COUNT(DISTINCT order_id)
+        FROM FactOrderItems {where}
+        GROUP BY time_id, user_id
+    """,
+    "AggDailyDiscount": """
+        INSERT INTO AggDailyDiscount (time_id, is_weekend, ratio_sum, ratio_count)
+        SELECT FOI.time_id, MAX(DT.is_weekend),
+               COALESCE(SUM(FOI.discount_amount / FOI.sales_amount), 0), COUNT(FOI.discount_amount / FOI.sales_amount)
+        FROM FactOrderItems FOI
+        JOIN DimTime DT ON FOI.time_id = DT.time_id
+        {where_foi} {and_or_where} FOI.sales_amount > 0
+        GROUP BY FOI.time_id
+    """,
+}
+
+# Anul și trimestrul derivate direct din time_id (YYYYMMDD), fără JOIN pe DimTime
+_YEAR = "(time_id / 10000)"
+_QUARTER = "(((time_id / 100) % 100 + 2) / 3)"
+
+# Variantele rapoartelor care citesc sumarele; aceleași coloane și parametri ca REPORT_SQL
+AGG_REPORT_SQL = {
+    "top_low_sales": """
+        SELECT
+            product_id,
+            SUM(sales_sum) AS TotalSales
+        FROM AggDailyProductSales
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY product_id
+        ORDER BY TotalSales DESC;
+    """,
+    "top_quarter_profit": f"""
+        SELECT TOP 1
+            CONCAT({_YEAR}, '-Q', {_QUARTER}) AS Quarter,
+            SUM(profit_sum) AS TotalProfit
+        FROM AggDailyProductSales
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY {_YEAR}, {_QUARTER}
+        ORDER BY TotalProfit DESC;
+    """,
+    "top_10_users_orders": """
+        SELECT TOP 10
+            user_id,
+            SUM(order_count) AS DistinctOrderCount
+        FROM AggDailyUserOrders
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY user_id
+        ORDER BY DistinctOrderCount DESC;
+    """,
+    "avg_discount_weekend_vs_weekday": """
+        SELECT
+            CASE
+                WHEN is_weekend = 1 THEN 'Weekend'
+                ELSE 'Zi de Saptamana'
+            END AS Perioada,
+            SUM(ratio_sum) / NULLIF(SUM(ratio_count), 0) * 100 AS Procent_Mediu_Discount
+        FROM AggDailyDiscount
+        WHERE time_id >= ? AND time_id <= ? AND ratio_count > 0
+        GROUP BY is_weekend
+        ORDER BY is_weekend DESC;
+    """,
+    "product_sales_classification": """
+        WITH ProductSales AS (
+            SELECT
+                product_id,
+                SUM(sales_sum) AS TotalSales
+            FROM AggDailyProductSales
+            WHERE time_id >= ? AND time_id <= ?
+            GROUP BY product_id
+        ),
+        SalesStats AS (
+            SELECT AVG(TotalSales) AS AvgSales, MAX(TotalSales) AS MaxSales FROM ProductSales
+        )
+        SELECT
+            PS.product_id,
+            PS.TotalSales,
+            CASE
+                WHEN PS.TotalSales >= (SS.AvgSales + (SS.MaxSales - SS.AvgSales) / 2) THEN 'Top Seller'
+                WHEN PS.TotalSales >= SS.AvgSales THEN 'Average Seller'
+                ELSE 'Low Seller'
+            END AS Classification
+        FROM ProductSales PS
+        CROSS JOIN SalesStats SS
+        ORDER BY PS.TotalSales DESC;
+    """,
+    # Aceleași coloane ca REPORT_SQL["dashboard"]; intervalul (?, ?) apare de patru ori (AGG_REPORT_RANGES)
+    "dashboard": """
+        SELECT 'P' AS grp, product_id AS key_id, SUM(sales_sum) AS sales_sum, NULL AS profit_sum,
+               NULL AS ratio_sum, NULL AS ratio_count, NULL AS order_count
+        FROM AggDailyProductSales
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY product_id
+        UNION ALL
+        SELECT 'U', user_id, NULL, NULL, NULL, NULL, SUM(order_count)
+        FROM AggDailyUserOrders
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY user_id
+        UNION ALL
+        SELECT 'D', time_id, NULL, SUM(profit_sum), NULL, NULL, NULL
+        FROM AggDailyProductSales
+        WHERE time_id >= ? AND time_id <= ?
+        GROUP BY time_id
+        UNION ALL
+        SELECT 'D', time_id, NULL, NULL, ratio_sum, ratio_count, NULL
+        FROM AggDailyDiscount
+        WHERE time_id >= ? AND time_id <= ?;
+    """,
+}
+
+# De câte ori apare intervalul (?, ?) în varianta pe sumare (implicit o dată, ca în REPORT_SQL)
+AGG_REPORT_RANGES = {"dashboard": 4}
+
+# Limită de parametri per instrucțiune (SQL Server: 2100)
+_IN_CHUNK = 1000
+
+
+def _chunks(values, size=_IN_CHUNK):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class AggregateLockTimeout(Exception):
+    """Lock-ul de recalculare al unei zile nu s-a obținut în timpul permis."""
+
+
+# Applock exclusiv pe o zi, eliberat la sfârșitul tranzacției; rezultat < 0 = timeout / deadlock
+_DAY_LOCK_SQL = """
+    SET NOCOUNT ON;
+    DECLARE @result INT;
+    EXEC @result = sp_getapplock @Resource = ?, @LockMode = 'Exclusive',
+                                 @LockOwner = 'Transaction', @LockTimeout = ?;
+    SELECT @result;
+"""
+
+
+class AggregateStore:
+    """Știe dacă tabelele sumar există (verificare memorată) și le întreține."""
+
+    def __init__(self, enabled=True, recheck_after=60.0, lock_timeout_ms=10_000):
+        self.enabled = enabled
+        self.recheck_after = recheck_after
+        self.lock_timeout_ms = lock_timeout_ms
+        self._lock = threading.Lock()
+        self._available = None
+        self._checked_at = 0.0
+
+    def available(self, cursor):
+        if not self.enabled:
+            return False
+        with self._lock:
+            # Odată create, tabelele rămân; absența lor se reverifică periodic
+            if self._available:
+                return True
+            if self._available is False and time.monotonic() - self._checked_at < self.recheck_after:
+                return False
+        found = all(
+            cursor.execute("SELECT OBJECT_ID(?, 'U')", (f"dbo.{t}",)).fetchone()[0] is not None
+            for t in AGG_TABLES
+        )
+        with self._lock:
+            self._available = found
+            self._checked_at = time.monotonic()
+        return found
+
+    def report_sql(self, name, cursor, fallback, time_range):
+        """(SQL, parametri) ai raportului: pe sumare dacă acestea există, altfel pe tabela brută.
+
+        time_range = (time_id_min, time_id_max), repetat de câte ori îl cere interogarea aleasă.
+        """
+        if self.available(cursor):
+            return AGG_REPORT_SQL[name], tuple(time_range) * AGG_REPORT_RANGES.get(name, 1)
+        return fallback[name], tuple(time_range)
+
+    def days_for_facts(self, cursor, fact_ids):
+        """Zilele (time_id) rândurilor de fapte date, citite ÎNAINTE de update/delete."""
+        days = set()
+        for chunk in _chunks(fact_ids):
+            cursor.execute(
+                f"SELECT DISTINCT time_id FROM FactOrderItems WHERE fact_id IN ({', '.join(['?'] * len(chunk))})",
+                chunk,
+            )
+            days.update(row[0] for row in cursor.fetchall())
+        return days
+
+    def lock_days(self, cursor, time_ids):
+        """Ia applock-urile `Agg:<time_id>` (ordonate) în tranzacția curentă."""
+        for time_id in sorted(time_ids):
+            result = cursor.execute(_DAY_LOCK_SQL, (f"Agg:{time_id}", self.lock_timeout_ms)).fetchone()[0]
+            if result < 0:
+                raise AggregateLockTimeout(
+                    f"Sumarele zilei {time_id} sunt recalculate de altă tranzacție (sp_getapplock = {result})")
+
+    def refresh_days(self, cursor, time_ids):
+        """Recalculează sumarele pentru zilele date din FactOrderItems (în tranzacția curentă).
+
+        Zilele rămân blocate pentru alte recalculări până la COMMIT / ROLLBACK.
+        """
+        time_ids = sorted({t for t in time_ids if t is not None})
+        if not time_ids or not self.available(cursor):
+            return
+        self.lock_days(cursor, time_ids)
+        for chunk in _chunks(time_ids):
+            plhs = ", ".join(["?"] * len(chunk))
+            for table in AGG_TABLES:
+                cursor.execute(f"DELETE FROM {table} WHERE time_id IN ({plhs})", chunk)
+                cursor.execute(
+                    REFRESH_SQL[table].format(
+                        where=f"WHERE time_id IN ({plhs})",
+                        where_foi=f"WHERE FOI.time_id IN ({plhs})",
+                        and_or_where="AND",
+                    ),
+                    chunk,
+                )
+
+    def rebuild(self, conn):
+        """Creează (dacă lipsesc) și recalculează integral tabelele sumar."""
+        cursor = conn.cursor()
+        for table in AGG_TABLES:
+            if cursor.execute("SELECT OBJECT_ID(?, 'U')", (f"dbo.{table}",)).fetchone()[0] is None:
+                cursor.execute(DDL[table])
+            cursor.execute(f"TRUNCATE TABLE {table}")
+            cursor.execute(REFRESH_SQL[table].format(where="", where_foi="", and_or_where="WHERE"))
+        conn.commit()
+        with self._lock:
+            self._available = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rebuild", action="store_true", help="recalculează integral sumarele")
+    args = parser.parse_args()
+    if not args.rebuild:
+        parser.print_help()
+        return
+
+    import pyodbc
+    from .db_config import DB_CONFIG
+    conn = pyodbc.connect(
+        f"DRIVER={DB_CONFIG['DRIVER']};SERVER={DB_CONFIG['SERVER']};"
+        f"DATABASE={DB_CONFIG['DATABASE']};UID={DB_CONFIG['UID']};PWD={DB_CONFIG['PWD']}"
+    )
+    t0 = time.perf_counter()
+    AggregateStore().rebuild(conn)
+    cursor = conn.cursor()
+    for table in AGG_TABLES:
+        count = cursor.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        print(f"{table}: {count} rânduri")
+    print(f"Reconstruire completă în {time.perf_counter() - t0:.1f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
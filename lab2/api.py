@@ -1,18 +1,37 @@
 from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse, Response
+from pydantic import BaseModel, ValidationError
 import pyodbc # Inlocuitor pentru pymysql
 import uuid
 import time
 from datetime import datetime, timedelta
 import json
 # Importul de configurare ar trebui să fie funcțional în mediul local
-from .db_config import DB_CONFIG 
+from .db_config import DB_CONFIG, POOL_CONFIG, EXECUTOR_CONFIG, ORDER_ITEMS_CONFIG, DAY_BUCKETS_CONFIG, SLOW_QUERY_CONFIG, REPORT_JOBS_CONFIG, EXPORT_CONFIG
+from .backends import get_backend
+from .db_pool import ConnectionPool, PoolTimeout, check_pool_size
+from .db_executor import DBExecutor, offload
+from .lookup_cache import LookupCache
+from .report_cache import ReportCache
+from .report_jobs import ReportJobs
+from .report_queries import REPORT_SQL, time_id_range
+from .aggregates import AggregateLockTimeout, AggregateStore
+from .dashboard import summarize
+from .order_items import OrderItems
+from .day_buckets import count_by_day, resolve_tz
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ORDER_BY, keyset_filter, split_page
+from .streaming import ExportStreams, stream_query, streaming_response
+from .results import FastJSONResponse, Rows, execute_rows, shaped
+from .metrics import Metrics, MetricsMiddleware, record_rows, timed
+from .slow_queries import SlowQueryLog
 
 # --- Inițializare FastAPI ---
 app = FastAPI(
     title="DWH Admin API",
-    description="Backend pentru operațiuni CRUD și Rapoarte DWH conectat la SQL Server."
+    description="Backend pentru operațiuni CRUD și Rapoarte DWH conectat la SQL Server.",
+    # orjson pentru toate răspunsurile JSON (vezi results.py)
+    default_response_class=FastJSONResponse,
 )
 
 # Adaugă middleware-ul CORS pentru a permite accesul din frontend
@@ -21,34 +40,67 @@ app.add_middleware(
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # admin.html afișează antetul Server-Timing (vezi metrics.py)
+    expose_headers=["Server-Timing"],
 )
 
+# Histograme de latență per rută (expuse la /metrics) și antetul Server-Timing
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+# Conexiunea ODBC, TOP, cheile generate și fast_executemany vin din backend (vezi backends.py)
+backend = get_backend("mssql", DB_CONFIG)
+
+# Pool-ul de conexiuni: login-ul ODBC se face o singură dată per conexiune, nu per request
+db_pool = ConnectionPool(backend.connect, ping=backend.ping, **POOL_CONFIG)
+
 def get_db():
-    """Funcție helper pentru a obține conexiunea la baza de date SQL Server (pyodbc)."""
+    """Funcție helper pentru a împrumuta o conexiune din pool (pyodbc).
+
+    conn.close() returnează conexiunea în pool, deci rutele existente rămân neschimbate.
+    """
     try:
-        # DB_CONFIG ar trebui sa contina:
-        # DRIVER: '{ODBC Driver 17 for SQL Server}'
-        # SERVER: 'server_address'
-        # DATABASE: 'db_name'
-        # UID: 'user'
-        # PWD: 'password'
-        
-        conn_str = (
-            f"DRIVER={DB_CONFIG['DRIVER']};"
-            f"SERVER={DB_CONFIG['SERVER']};"
-            f"DATABASE={DB_CONFIG['DATABASE']};"
-            f"UID={DB_CONFIG['UID']};"
-            f"PWD={DB_CONFIG['PWD']}"
-        )
-        conn = pyodbc.connect(conn_str)
-        # Setează atributul row_as_dict pentru a returna rândurile ca dicționare
-        conn.setdecoding(pyodbc.SQL_CHAR, encoding='utf-8')
-        conn.setencoding(encoding='utf-8')
-        return conn
+        with timed("acquire"):
+            return db_pool.acquire()
+    except PoolTimeout as ex:
+        raise HTTPException(status_code=503, detail=f"Pool de conexiuni epuizat: {ex}")
     except pyodbc.Error as ex:
         sqlstate = ex.args[0]
         raise HTTPException(status_code=500, detail=f"Eroare de conexiune SQL Server ({sqlstate}): {ex}")
 
+# Executoare separate pentru rapoarte și pentru căile OLTP ieftine:
+# rapoartele lente nu pot bloca /admin/latest-order, CRUD etc.
+report_executor = DBExecutor("reports", EXECUTOR_CONFIG["report_workers"], EXECUTOR_CONFIG["max_queue"])
+oltp_executor = DBExecutor("oltp", EXECUTOR_CONFIG["oltp_workers"], EXECUTOR_CONFIG["max_queue"])
+# Exporturile streaming: locuri limitate, fiecare cu conexiunea ținută pe durata descărcării
+export_streams = ExportStreams(EXPORT_CONFIG["max_streams"])
+
+# Rutele cu @offload(executor, get_db) primesc `conn`, împrumutată și returnată în același apel
+
+@app.on_event("shutdown")
+def close_db_pool():
+    report_jobs.shutdown()
+    report_executor.shutdown()
+    oltp_executor.shutdown()
+    export_streams.executor.shutdown()
+    db_pool.close_all()
+
+@app.get("/admin/db/pool-stats")
+async def pool_stats():
+    """Statistici pool: conexiuni în uz, libere, timp de așteptare."""
+    return db_pool.stats()
+
+@app.get("/admin/db/executor-stats")
+async def executor_stats():
+    """Statistici pentru executoarele DB (thread-uri ocupate, coadă, cereri respinse)."""
+    return {"reports": report_executor.stats(), "oltp": oltp_executor.stats(),
+            "exports": export_streams.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Histogramele de latență în formatul text Prometheus."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 # ==========================================
 # 1. MODELE PYDANTIC PENTRU TABELE DWH (Neschimbate)
@@ -153,6 +205,75 @@ TABLE_MODELS = {
     "FactOrderItems": {"add": FactOrderItemsCreate, "update": FactOrderItemsUpdate, "primary_key": "fact_id"},
 }
 
+# Cache pentru tabelele mici (id -> nume); invalidat de crud_operation la fiecare scriere
+dim_cache = LookupCache({
+    "products": ("product_id", "name"),
+    "DimProduct": ("product_id", "name"),
+    "DimUser": ("user_id", "nume"),
+    "DimLocation": ("location_id", "region"),
+    "DimStatus": ("status_id", "status_name"),
+})
+
+# Cache pentru rezultatele rapoartelor DWH; versiunea de date a unei tabele crește la fiecare scriere CRUD
+# Recalculările din fundal rulează pe report_executor (aceeași limită de thread-uri / conexiuni)
+report_cache = ReportCache(max_entries=128, ttl=60.0, stale_ttl=600.0, executor=report_executor)
+
+# Toți consumatorii care pot ține conexiuni simultan; job-urile de rapoarte și recalculările
+# cache-ului rulează pe report_executor (refresh_workers = 0), deci nu se adaugă separat
+check_pool_size(POOL_CONFIG["max_size"], reports=report_executor.max_workers, oltp=oltp_executor.max_workers,
+                exports=export_streams.max_streams, refresh=report_cache.refresh_workers)
+
+# Produsele comenzilor din orders ca rânduri (order_items.py); citirea după read_mode
+order_items = OrderItems("mssql", read_mode=ORDER_ITEMS_CONFIG["read_mode"])
+
+# Tabelele sumar zi x produs / zi x utilizator / zi (vezi aggregates.py)
+aggregates = AggregateStore(enabled=True)
+
+def fact_days(cursor, table_name, fact_ids=(), new_time_ids=()):
+    """Zilele ale căror sumare trebuie recalculate după o scriere pe FactOrderItems.
+
+    Trebuie apelată ÎNAINTE de update/delete, ca să prindă și time_id-urile vechi.
+    """
+    if table_name != "FactOrderItems" or not aggregates.available(cursor):
+        return set()
+    days = {t for t in new_time_ids if t is not None}
+    if fact_ids:
+        days |= aggregates.days_for_facts(cursor, fact_ids)
+    return days
+
+def invalidate_caches(table_name):
+    """Apelat după commit-ul unei scrieri CRUD pe `table_name`."""
+    dim_cache.invalidate(table_name)
+    report_cache.bump(table_name)
+
+@app.get("/admin/cache/lookup-stats")
+async def lookup_cache_stats():
+    """Statistici pentru cache-ul de dimensiuni (hits, încărcări, invalidări)."""
+    return dim_cache.stats()
+
+@app.get("/admin/cache/report-stats")
+async def report_cache_stats():
+    """Statistici pentru cache-ul de rapoarte (hits, misses, evictions etc.)."""
+    return report_cache.stats()
+
+# Instrucțiunile peste prag, cu planul capturat la prima depășire (vezi slow_queries.py)
+slow_queries = SlowQueryLog("mssql", **SLOW_QUERY_CONFIG)
+
+@app.get("/admin/diagnostics/slow-queries")
+async def slow_query_stats(fingerprint: str | None = Query(None, description="Detaliile (și planul) unei amprente")):
+    """Interogările lente agregate per amprentă: număr, p95, max, rute."""
+    if fingerprint is None:
+        return slow_queries.summary()
+    details = slow_queries.details(fingerprint)
+    if details is None:
+        raise HTTPException(status_code=404, detail=f"Amprentă necunoscută: {fingerprint}")
+    return details
+
+@app.get("/admin/db/order-items-stats")
+async def order_items_stats():
+    """Modul de citire order_items și diferențele văzute în modul dual."""
+    return order_items.stats()
+
 # ==========================================
 # 3. RUTA GENERICĂ CRUD (Adaptată pentru pyodbc/SQL Server)
 # ==========================================
@@ -162,68 +283,230 @@ def execute_query(cursor, query, params=None, fetch_all=False):
     if params is None:
         params = []
     
-    cursor.execute(query, params)
+    started = time.perf_counter()
+    with timed("execute"):
+        cursor.execute(query, params)
     
-    if query.strip().upper().startswith(("SELECT", "WITH")):
-        # Extrage numele coloanelor pentru a crea dicționare
-        columns = [column[0] for column in cursor.description]
+    if not query.strip().upper().startswith(("SELECT", "WITH")):
+        slow_queries.observe(cursor, query, params, time.perf_counter() - started, rows=cursor.rowcount)
+        return None
+
+    # Extrage numele coloanelor pentru a crea dicționare
+    columns = [column[0] for column in cursor.description]
+    with timed("fetch"):
         if fetch_all:
-            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            rows = cursor.fetchall()
         else:
             row = cursor.fetchone()
-            return dict(zip(columns, row)) if row else None
-    return None
+            rows = [row] if row else []
+    record_rows(len(rows))
+    # După fetchone() pot rămâne rânduri necitite: planul se capturează doar după fetchall()
+    slow_queries.observe(cursor, query, params, time.perf_counter() - started, rows=len(rows), plan_ready=fetch_all)
+    if fetch_all:
+        return [dict(zip(columns, row)) for row in rows]
+    return dict(zip(columns, rows[0])) if rows else None
+
+# Tabelele cu cheie IDENTITY (cheia nu se trimite la inserare)
+IDENTITY_TABLES = ["DimUser", "DimProduct", "DimOrder", "DimStatus", "FactOrderItems"]
+
+BULK_ACTIONS = ("bulk_add", "bulk_update", "bulk_delete")
+
+def apply_add_defaults(table_name, validated):
+    """Completează ID-urile/timpul automat și elimină cheia IDENTITY înainte de INSERT."""
+    if table_name == "DimOrder":
+        if 'order_public_id' not in validated: validated['order_public_id'] = str(uuid.uuid4())
+        if 'created_at' not in validated: validated['created_at'] = int(time.time())
+    elif table_name == "DimUser":
+        if 'created_at' not in validated: validated['created_at'] = int(time.time())
+    if table_name in IDENTITY_TABLES:
+        validated.pop(TABLE_MODELS[table_name]["primary_key"], None)
+    return validated
+
+def validate_rows(schema, rows):
+    """Validează toate rândurile într-o singură trecere; întoarce (valide, erori per rând)."""
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "detail": "Rândul trebuie să fie un obiect JSON."})
+            continue
+        try:
+            valid.append((index, schema(**row).model_dump(exclude_none=True)))
+        except ValidationError as e:
+            errors.append({
+                "index": index,
+                "detail": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()],
+            })
+    return valid, errors
+
+def chunked(items, size):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def group_by_columns(items):
+    """Grupează rândurile după setul de coloane, ca fiecare grup să folosească o singură instrucțiune."""
+    groups = {}
+    for index, data in items:
+        groups.setdefault(tuple(data), []).append((index, data))
+    return groups
+
+def bulk_insert(cursor, table_name, items, chunk_size, return_ids):
+    """Inserează rândurile validate prin calea bulk a backend-ului.
+
+    Cu return_ids, cheile generate revin prin MERGE ... OUTPUT (ordonate după rândul sursă);
+    fără return_ids se folosește fast_executemany.
+    """
+    primary_key = TABLE_MODELS[table_name]["primary_key"]
+    with_ids = return_ids and table_name in IDENTITY_TABLES
+    inserted = []
+    for cols, group in group_by_columns(items).items():
+        rows = [tuple(data.values()) for _, data in group]
+        if with_ids:
+            ids = backend.bulk_insert(cursor, table_name, cols, rows, chunk_size, primary_key=primary_key)
+            inserted.extend({"index": index, "id": pk} for (index, _), pk in zip(group, ids))
+        else:
+            backend.bulk_insert(cursor, table_name, cols, rows, chunk_size)
+    inserted.sort(key=lambda r: r["index"])
+    return inserted
+
+def bulk_operation(table_name, action, rows, chunk_size, return_ids):
+    """bulk_add / bulk_update / bulk_delete: validare într-o trecere, scriere într-o singură tranzacție."""
+    if not isinstance(rows, list) or not rows:
+        raise HTTPException(status_code=400, detail="Acțiunile bulk necesită o listă nevidă de rânduri.")
+
+    model_config = TABLE_MODELS[table_name]
+    primary_key = model_config["primary_key"]
+
+    if action == "bulk_add":
+        items, errors = validate_rows(model_config["add"], rows)
+        items = [(index, apply_add_defaults(table_name, data)) for index, data in items]
+    elif action == "bulk_update":
+        items, errors = validate_rows(model_config["update"], rows)
+        checked = []
+        for index, data in items:
+            if len(data) < 2:
+                errors.append({"index": index, "detail": "Nu s-au furnizat câmpuri de actualizat."})
+            else:
+                checked.append((index, data))
+        items = checked
+    else:
+        items, errors = [], []
+        for index, row in enumerate(rows):
+            value = row.get(primary_key) if isinstance(row, dict) else row
+            if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+                items.append((index, value))
+            else:
+                errors.append({"index": index, "detail": f"ID-ul principal ({primary_key}) necesar pentru ștergere."})
+    errors.sort(key=lambda e: e["index"])
+
+    if not items:
+        raise HTTPException(status_code=400, detail={"message": "Niciun rând valid.", "errors": errors})
+
+    conn = get_db()
+    cursor = slow_queries.cursor(conn.cursor())
+    written = 0
+    inserted = []
+    try:
+        if action == "bulk_add":
+            days = fact_days(cursor, table_name, new_time_ids=[data.get("time_id") for _, data in items])
+        elif action == "bulk_update":
+            days = fact_days(cursor, table_name, fact_ids=[data[primary_key] for _, data in items],
+                             new_time_ids=[data.get("time_id") for _, data in items])
+        else:
+            days = fact_days(cursor, table_name, fact_ids=[value for _, value in items])
+
+        if action == "bulk_add":
+            inserted = bulk_insert(cursor, table_name, items, chunk_size, return_ids)
+            written = len(items)
+        elif action == "bulk_update":
+            cursor.fast_executemany = True
+            for cols, group in group_by_columns(items).items():
+                set_cols = [c for c in cols if c != primary_key]
+                query = f"UPDATE {table_name} SET {', '.join(f'{c}=?' for c in set_cols)} WHERE {primary_key}=?"
+                for chunk in chunked(group, chunk_size):
+                    cursor.executemany(query, [tuple(data[c] for c in set_cols) + (data[primary_key],) for _, data in chunk])
+            written = len(items)
+        else:
+            per_statement = min(chunk_size, backend.max_params - 1)
+            for chunk in chunked(items, per_statement):
+                cursor.execute(
+                    f"DELETE FROM {table_name} WHERE {primary_key} IN ({', '.join(['?'] * len(chunk))})",
+                    [value for _, value in chunk],
+                )
+                written += max(cursor.rowcount, 0)
+        aggregates.refresh_days(cursor, days)
+        conn.commit()
+        invalidate_caches(table_name)
+    except AggregateLockTimeout as e:
+        conn.rollback()
+        raise HTTPException(status_code=503, detail=f"{e}. Tranzacția a fost anulată, reîncearcă.")
+    except pyodbc.Error as e:
+        conn.rollback()
+        sqlstate = e.args[0]
+        raise HTTPException(status_code=400, detail={
+            "message": f"Eroare SQL Server ({sqlstate}): {str(e)}. Tranzacția a fost anulată.",
+            "errors": errors,
+        })
+    finally:
+        conn.close()
+
+    result = {
+        "status": "success" if not errors else "partial",
+        "action": {"bulk_add": "bulk_added", "bulk_update": "bulk_updated", "bulk_delete": "bulk_deleted"}[action],
+        "requested": len(rows),
+        "written": written,
+        "errors": errors,
+    }
+    if action == "bulk_add":
+        result["inserted_ids"] = inserted
+    return result
 
 @app.post("/admin/crud/{table_name}/{action}")
-def crud_operation(table_name: str, action: str, payload: dict = Body(...)):
+@offload(oltp_executor)
+def crud_operation(
+    table_name: str,
+    action: str,
+    payload: dict | list = Body(...),
+    chunk_size: int = Query(1000, ge=1, le=10000, description="Rânduri per instrucțiune (acțiuni bulk)"),
+    return_ids: bool = Query(True, description="bulk_add: returnează cheile generate"),
+):
     """Operatii CRUD generice pe tabelele DWH, adaptate pentru SQL Server/pyodbc."""
     if table_name not in TABLE_MODELS:
         raise HTTPException(status_code=404, detail=f"Tabelă DWH necunoscută: {table_name}")
+    if action in BULK_ACTIONS:
+        rows = payload.get("rows") if isinstance(payload, dict) else payload
+        return bulk_operation(table_name, action, rows, chunk_size, return_ids)
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Payload-ul trebuie să fie un obiect JSON.")
     
     model_config = TABLE_MODELS[table_name]
     primary_key = model_config["primary_key"]
     conn = get_db()
-    cursor = conn.cursor()
+    cursor = slow_queries.cursor(conn.cursor())
     
     try:
         if action == "delete":
             pk_value = payload.get(primary_key)
             if not pk_value: raise HTTPException(status_code=400, detail=f"ID-ul principal ({primary_key}) necesar pentru ștergere.")
+            days = fact_days(cursor, table_name, fact_ids=[pk_value])
             cursor.execute(f"DELETE FROM {table_name} WHERE {primary_key} = ?", (pk_value,))
+            aggregates.refresh_days(cursor, days)
             conn.commit()
+            invalidate_caches(table_name)
             return {"status": "success", "action": "deleted", "id": pk_value}
 
         elif action == "add":
             AddSchema = model_config["add"]
             validated = AddSchema(**payload).model_dump(exclude_none=True)
-            
-            # Logica de setare ID-uri/timp automat
-            if table_name == "DimOrder":
-                if 'order_public_id' not in validated: validated['order_public_id'] = str(uuid.uuid4())
-                if 'created_at' not in validated: validated['created_at'] = int(time.time())
-            elif table_name == "DimUser":
-                if 'created_at' not in validated: validated['created_at'] = int(time.time())
-            
-            # Pentru SQL Server, trebuie să excludem coloanele Identity
-            is_identity = table_name in ["DimUser", "DimProduct", "DimOrder", "DimStatus", "FactOrderItems"]
-            if primary_key in validated and is_identity and table_name != "DimLocation":
-                validated.pop(primary_key, None)
-
-            cols = ", ".join(validated.keys())
-            vals = tuple(validated.values())
-            plhs = ", ".join(["?"] * len(vals)) # Placeholder '?' pentru pyodbc
-            
-            # Interogarea de inserare
-            insert_query = f"INSERT INTO {table_name} ({cols}) VALUES ({plhs})"
-            cursor.execute(insert_query, vals)
-            
-            # Obține ID-ul inserat pentru SQL Server (IDENTITY_INSERT ON nu este necesar aici)
-            last_id = None
-            if is_identity:
-                cursor.execute("SELECT SCOPE_IDENTITY() AS new_id")
-                last_id = cursor.fetchone()[0]
+            validated = apply_add_defaults(table_name, validated)
+            is_identity = table_name in IDENTITY_TABLES
 
+            # Cheia IDENTITY revine din același INSERT (OUTPUT INSERTED), nu dintr-un batch separat
+            last_id = backend.insert(cursor, table_name, validated, primary_key=primary_key if is_identity else None)
+            days = fact_days(cursor, table_name, new_time_ids=[validated.get("time_id")])
+
+            aggregates.refresh_days(cursor, days)
             conn.commit()
+            invalidate_caches(table_name)
             return {"status": "success", "action": "added", "data": validated, "inserted_id": last_id}
 
         elif action == "update":
@@ -239,10 +522,16 @@ def crud_operation(table_name: str, action: str, payload: dict = Body(...)):
             if not clauses: return {"status": "warning", "action": "no_update", "detail": "Nu s-au furnizat câmpuri de actualizat."}
             
             update_query = f"UPDATE {table_name} SET {', '.join(clauses)} WHERE {primary_key}=?"
+            days = fact_days(cursor, table_name, fact_ids=[pk], new_time_ids=[validated.get("time_id")])
             cursor.execute(update_query, tuple(vals))
+            aggregates.refresh_days(cursor, days)
             conn.commit()
+            invalidate_caches(table_name)
             return {"status": "success", "action": "updated", "id": pk}
 
+    except AggregateLockTimeout as e:
+        conn.rollback()
+        raise HTTPException(status_code=503, detail=f"{e}. Tranzacția a fost anulată, reîncearcă.")
     except pyodbc.Error as e:
         conn.rollback()
         sqlstate = e.args[0]
@@ -255,17 +544,36 @@ def crud_operation(table_name: str, action: str, payload: dict = Body(...)):
 
 # ==========================================
 # 4. RUTE PENTRU RAPOARTE DWH (Adaptate pentru SQL Server)
-# Conversia de la UNIX_TIMESTAMP la datetime pentru SQL Server
+# Intervalul UNIX [start, end] se traduce în intervalul de time_id (YYYYMMDD)
+# și se trimite ca parametri; textul SQL e constant (vezi report_queries.py)
 # ==========================================
 
-# SQL Server folosește DATEADD(second, [timestamp], '1970-01-01') pentru a converti UNIX_TIMESTAMP
-def get_sqls_time_conversion(timestamp_param):
-    """Returnează sintaxa SQL Server pentru a converti un timestamp UNIX în datetime."""
-    return f"DATEADD(second, {timestamp_param}, '1970-01-01')"
+def attach_names(conn, rows, id_col, table, name_col):
+    """Înlocuiește coloana id cu numele din cache (fără JOIN doar pentru nume).
+
+    Un id lipsă din cache reîncarcă o dată dimensiunea; rămâne "ID Necunoscut N" doar dacă
+    rândul nu există nici în tabelă (fapte fără rând în dimensiune).
+    Față de vechiul JOIN pe dimensiune: gruparea este pe id, deci produsele cu același nume
+    rămân rânduri separate, iar faptele fără rând în dimensiune apar (JOIN-ul le elimina).
+    """
+    if isinstance(rows, Rows):
+        pos = rows.columns.index(id_col)
+        names = dim_cache.get_map(table, conn, keys={row[pos] for row in rows.data})
+        return rows.replace_column(id_col, name_col, names)
+    names = dim_cache.get_map(table, conn, keys={row[id_col] for row in rows})
+    result = []
+    for row in rows:
+        row = dict(row)
+        key = row.pop(id_col)
+        result.append({name_col: names.get(key, f"ID Necunoscut {key}"), **row})
+    return result
 
 
 # 1. Produsul cu cel mai mare și cel mai mic volum de vânzări
 @app.get("/admin/reports/top-low-sales")
+@offload(report_executor)
+@shaped
+@report_cache.cached("top_low_sales", depends_on=("FactOrderItems", "DimProduct"))
 def top_low_sales(
     start: int = Query(..., description="Start Timestamp"), 
     end: int = Query(..., description="End Timestamp")
@@ -274,28 +582,15 @@ def top_low_sales(
     conn = get_db()
     cursor = conn.cursor()
     try:
-        start_date_sql = get_sqls_time_conversion(start)
-        end_date_sql = get_sqls_time_conversion(end)
-        
-        # Folosim ROW_NUMBER() pentru a simula LIMIT sau OFFSET (deși putem folosi TOP pentru simplitate)
-        query = f"""
-            SELECT 
-                DP.name AS ProductName, 
-                SUM(FOI.sales_amount) AS TotalSales
-            FROM FactOrderItems FOI
-            JOIN DimProduct DP ON FOI.product_id = DP.product_id
-            JOIN DimTime DT ON FOI.time_id = DT.time_id
-            WHERE DT.full_date >= {start_date_sql} AND DT.full_date <= {end_date_sql}
-            GROUP BY DP.name
-            ORDER BY TotalSales DESC;
-        """
-        results = execute_query(cursor, query, fetch_all=True)
+        query, params = aggregates.report_sql("top_low_sales", cursor, REPORT_SQL, time_id_range(start, end))
+        results = execute_rows(cursor, query, params, slow_log=slow_queries)
+        results = attach_names(conn, results, "product_id", "DimProduct", "ProductName")
 
         if not results:
             return {"message": "Nu există date în FactOrderItems pentru perioada selectată."}
 
-        top_product = results[0]
-        low_product = results[-1]
+        top_product = results.row(0)
+        low_product = results.row(-1)
         
         return {
             "TopProduct": top_product,
@@ -309,6 +604,8 @@ def top_low_sales(
 
 # 2. Trimestrul cu cel mai mare profit total
 @app.get("/admin/reports/top-quarter-profit")
+@offload(report_executor)
+@report_cache.cached("top_quarter_profit", depends_on=("FactOrderItems",))
 def top_quarter_profit(
     start: int = Query(..., description="Start Timestamp"), 
     end: int = Query(..., description="End Timestamp")
@@ -317,20 +614,8 @@ def top_quarter_profit(
     conn = get_db()
     cursor = conn.cursor()
     try:
-        start_date_sql = get_sqls_time_conversion(start)
-        end_date_sql = get_sqls_time_conversion(end)
-
-        query = f"""
-            SELECT TOP 1 
-                CONCAT(DT.year, '-Q', DT.quarter) AS Quarter,
-                SUM(FOI.sales_amount * FOI.profit_margin) AS TotalProfit
-            FROM FactOrderItems FOI
-            JOIN DimTime DT ON FOI.time_id = DT.time_id
-            WHERE DT.full_date >= {start_date_sql} AND DT.full_date <= {end_date_sql}
-            GROUP BY DT.year, DT.quarter
-            ORDER BY TotalProfit DESC;
-        """
-        result = execute_query(cursor, query)
+        query, params = aggregates.report_sql("top_quarter_profit", cursor, REPORT_SQL, time_id_range(start, end))
+        result = execute_query(cursor, query, params=params)
 
         if not result:
             return {"message": "Nu s-a găsit profit în FactOrderItems pentru perioada selectată."}
@@ -343,6 +628,9 @@ def top_quarter_profit(
 
 # 3. Top 10 Utilizatori după numărul de comenzi distincte
 @app.get("/admin/reports/top-10-users-orders")
+@offload(report_executor)
+@shaped
+@report_cache.cached("top_10_users_orders", depends_on=("FactOrderItems", "DimUser"))
 def top_10_users_orders(
     start: int = Query(..., description="Start Timestamp"), 
     end: int = Query(..., description="End Timestamp")
@@ -351,21 +639,9 @@ def top_10_users_orders(
     conn = get_db()
     cursor = conn.cursor()
     try:
-        start_date_sql = get_sqls_time_conversion(start)
-        end_date_sql = get_sqls_time_conversion(end)
-        
-        query = f"""
-            SELECT TOP 10 
-                DU.nume AS UserName,
-                COUNT(DISTINCT FOI.order_id) AS DistinctOrderCount
-            FROM FactOrderItems FOI
-            JOIN DimUser DU ON FOI.user_id = DU.user_id
-            JOIN DimTime DT ON FOI.time_id = DT.time_id
-            WHERE DT.full_date >= {start_date_sql} AND DT.full_date <= {end_date_sql}
-            GROUP BY DU.nume
-            ORDER BY DistinctOrderCount DESC;
-        """
-        results = execute_query(cursor, query, fetch_all=True)
+        query, params = aggregates.report_sql("top_10_users_orders", cursor, REPORT_SQL, time_id_range(start, end))
+        results = execute_rows(cursor, query, params, slow_log=slow_queries)
+        results = attach_names(conn, results, "user_id", "DimUser", "UserName")
         
         if not results:
             return {"message": "Nu s-au găsit comenzi distincte în FactOrderItems pentru perioada selectată."}
@@ -378,6 +654,9 @@ def top_10_users_orders(
 
 # 4. Procentul mediu de discount (Weekend vs. Zile Săptămânale)
 @app.get("/admin/reports/avg-discount-weekend-vs-weekday")
+@offload(report_executor)
+@shaped
+@report_cache.cached("avg_discount_weekend_vs_weekday", depends_on=("FactOrderItems", "DimTime"))
 def avg_discount_weekend_vs_weekday(
     start: int = Query(..., description="Start Timestamp"), 
     end: int = Query(..., description="End Timestamp")
@@ -386,24 +665,8 @@ def avg_discount_weekend_vs_weekday(
     conn = get_db()
     cursor = conn.cursor()
     try:
-        start_date_sql = get_sqls_time_conversion(start)
-        end_date_sql = get_sqls_time_conversion(end)
-
-        query = f"""
-            SELECT 
-                CASE
-                    WHEN DT.is_weekend = 1 THEN 'Weekend'
-                    ELSE 'Zi de Saptamana'
-                END AS Perioada,
-                AVG(FOI.discount_amount / FOI.sales_amount) * 100 AS Procent_Mediu_Discount
-            FROM FactOrderItems FOI
-            JOIN DimTime DT ON FOI.time_id = DT.time_id
-            WHERE DT.full_date >= {start_date_sql} AND DT.full_date <= {end_date_sql}
-            AND FOI.sales_amount > 0 
-            GROUP BY DT.is_weekend
-            ORDER BY DT.is_weekend DESC;
-        """
-        results = execute_query(cursor, query, fetch_all=True)
+        query, params = aggregates.report_sql("avg_discount_weekend_vs_weekday", cursor, REPORT_SQL, time_id_range(start, end))
+        results = execute_rows(cursor, query, params, slow_log=slow_queries)
 
         if not results:
             return {"message": "Nu s-au găsit date de discount în FactOrderItems pentru perioada selectată."}
@@ -416,6 +679,9 @@ def avg_discount_weekend_vs_weekday(
 
 # 5. Clasificarea Produselor după Volumul Total de Vânzări
 @app.get("/admin/reports/product-sales-classification")
+@offload(report_executor)
+@shaped
+@report_cache.cached("product_sales_classification", depends_on=("FactOrderItems", "DimProduct"))
 def product_sales_classification(
     start: int = Query(..., description="Start Timestamp"), 
     end: int = Query(..., description="End Timestamp")
@@ -424,38 +690,9 @@ def product_sales_classification(
     conn = get_db()
     cursor = conn.cursor()
     try:
-        start_date_sql = get_sqls_time_conversion(start)
-        end_date_sql = get_sqls_time_conversion(end)
-        
-        # Clasificarea produselor în SQL Server folosind funcții de fereastră sau CTE-uri
-        query = f"""
-            WITH ProductSales AS (
-                SELECT 
-                    DP.name AS ProductName, 
-                    SUM(FOI.sales_amount) AS TotalSales
-                FROM FactOrderItems FOI
-                JOIN DimProduct DP ON FOI.product_id = DP.product_id
-                JOIN DimTime DT ON FOI.time_id = DT.time_id
-                WHERE DT.full_date >= {start_date_sql} AND DT.full_date <= {end_date_sql}
-                GROUP BY DP.name
-            ),
-            SalesStats AS (
-                SELECT AVG(TotalSales) AS AvgSales, MAX(TotalSales) AS MaxSales FROM ProductSales
-            )
-            SELECT
-                PS.ProductName,
-                PS.TotalSales,
-                CASE
-                    -- Presupune că MaxSales și AvgSales există
-                    WHEN PS.TotalSales >= (SS.AvgSales + (SS.MaxSales - SS.AvgSales) / 2) THEN 'Top Seller'
-                    WHEN PS.TotalSales >= SS.AvgSales THEN 'Average Seller'
-                    ELSE 'Low Seller'
-                END AS Classification
-            FROM ProductSales PS
-            CROSS JOIN SalesStats SS
-            ORDER BY PS.TotalSales DESC;
-        """
-        results = execute_query(cursor, query, fetch_all=True)
+        query, params = aggregates.report_sql("product_sales_classification", cursor, REPORT_SQL, time_id_range(start, end))
+        results = execute_rows(cursor, query, params, slow_log=slow_queries)
+        results = attach_names(conn, results, "product_id", "DimProduct", "ProductName")
 
         if not results:
             return {"message": "Nu există date de vânzări în FactOrderItems pentru perioada selectată."}
@@ -466,10 +703,81 @@ def product_sales_classification(
     finally:
         conn.close()
 
+# 6. Dashboard: toate cele cinci rapoarte dintr-o singură citire a faptelor
+@app.get("/admin/reports/dashboard")
+@offload(report_executor)
+@report_cache.cached("dashboard", depends_on=("FactOrderItems", "DimProduct", "DimUser"))
+def reports_dashboard(
+    start: int = Query(..., description="Start Timestamp"),
+    end: int = Query(..., description="End Timestamp")
+):
+    """Rapoartele 1-5 într-un singur răspuns: o interogare cu agregate parțiale, restul în memorie."""
+    conn = get_db()
+    cursor = conn.cursor()
+    try:
+        query, params = aggregates.report_sql("dashboard", cursor, REPORT_SQL, time_id_range(start, end))
+        data = summarize(execute_rows(cursor, query, params, slow_log=slow_queries).data)
+
+        sales = attach_names(conn, data["sales"], "product_id", "DimProduct", "ProductName")
+        top_users = attach_names(conn, data["top_users"], "user_id", "DimUser", "UserName")
+        classification = attach_names(conn, data["classification"], "product_id", "DimProduct", "ProductName")
+
+        return {
+            "top_low_sales": {"TopProduct": sales[0], "LowProduct": sales[-1], "AllResults": sales} if sales
+                else {"message": "Nu există date în FactOrderItems pentru perioada selectată."},
+            "top_quarter_profit": data["top_quarter"]
+                or {"message": "Nu s-a găsit profit în FactOrderItems pentru perioada selectată."},
+            "top_10_users_orders": top_users
+                or {"message": "Nu s-au găsit comenzi distincte în FactOrderItems pentru perioada selectată."},
+            "avg_discount_weekend_vs_weekday": data["discount"]
+                or {"message": "Nu s-au găsit date de discount în FactOrderItems pentru perioada selectată."},
+            "product_sales_classification": classification
+                or {"message": "Nu există date de vânzări în FactOrderItems pentru perioada selectată."},
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Eroare la generarea dashboard-ului: {str(e)}")
+    finally:
+        conn.close()
+
+# Rapoartele de mai sus, rulate ca job-uri în fundal (vezi report_jobs.py). Se înregistrează
+# funcția sincronă de sub @offload: job-ul trece prin același cache și rulează pe report_executor
+report_jobs = ReportJobs(report_executor, **REPORT_JOBS_CONFIG)
+for report_name, report_route in {
+    "top_low_sales": top_low_sales,
+    "top_quarter_profit": top_quarter_profit,
+    "top_10_users_orders": top_10_users_orders,
+    "avg_discount_weekend_vs_weekday": avg_discount_weekend_vs_weekday,
+    "product_sales_classification": product_sales_classification,
+    "dashboard": reports_dashboard,
+}.items():
+    report_jobs.register(report_name, report_route.__wrapped__)
+
+# Rute sincrone: metadatele și rezultatele job-urilor se citesc/scriu pe disc, nu în bucla async
+@app.post("/admin/reports/{report_name}/jobs", status_code=202)
+def submit_report_job(
+    report_name: str,
+    start: int = Query(..., description="Start Timestamp"),
+    end: int = Query(..., description="End Timestamp"),
+):
+    """Pune raportul (ex. product-sales-classification) în coada job-urilor; întoarce id-ul job-ului."""
+    job_id, deduplicated = report_jobs.submit(report_name.replace("-", "_"), start=start, end=end)
+    return {"job_id": job_id, "status": report_jobs.status(job_id)["status"], "deduplicated": deduplicated}
+
+@app.get("/admin/jobs/{job_id}")
+def report_job_status(job_id: str):
+    """Starea și progresul job-ului; când este gata, răspunsul conține și rezultatul ("result")."""
+    return Response(report_jobs.response_body(job_id), media_type="application/json")
+
+@app.get("/admin/jobs")
+def report_jobs_stats():
+    return report_jobs.stats()
+
 # ==========================================
 # 5. RUTE LEGACY/PLACEHOLDER (Adaptate pentru SQL Server)
 # ==========================================
 
+TZ_DESCRIPTION = "Fus orar IANA pentru zile (ex. Europe/Bucharest); implicit fusul serverului"
+
 def resolve_product_names(conn, product_ids_json):
     """Funcție helper pentru a rezolva ID-urile de produs în nume (OLTP/SQL Server)."""
     if not product_ids_json:
@@ -479,113 +787,95 @@ def resolve_product_names(conn, product_ids_json):
         p_ids = json.loads(product_ids_json)
         if isinstance(p_ids, int): p_ids = [p_ids]
         
-        cursor = conn.cursor()
         if not p_ids: return []
         
-        placeholders = ', '.join(['?'] * len(p_ids))
-        query = f"SELECT product_id, name FROM products WHERE product_id IN ({placeholders})"
-        
-        cursor.execute(query, tuple(p_ids))
-        
-        # Extrage rezultatele ca dicționare
-        columns = [column[0] for column in cursor.description]
-        product_lookup = {row[0]: row[1] for row in cursor.fetchall()} # Assuming product_id is the first column
-        
-        return [product_lookup.get(pid, f"ID Necunoscut {pid}") for pid in p_ids]
+        # Numele vin din cache-ul de produse (fără interogare per comandă)
+        return dim_cache.names("products", p_ids, conn)
     except Exception:
         return ["Eroare la parsarea ID-urilor de produs"]
 
 @app.get("/admin/latest-order")
-def latest_order():
+@offload(oltp_executor, get_db)
+def latest_order(conn=None):
     """Obține cea mai recentă comandă din tabela OLTP veche 'orders' (SQL Server)."""
-    conn = get_db()
-    cursor = conn.cursor()
-    try:
-        # Folosim TOP 1 și alias-uri
-        query = """
-            SELECT TOP 1 o.order_id, o.order_public_id, o.products, o.order_status, o.created_at, u.name as user_name
-            FROM orders o
-            JOIN users_login_info u ON o.user_id = u.user_id
-            ORDER BY o.created_at DESC
-        """
-        order = execute_query(cursor, query)
-        
-        if not order:
-            return {"message": "Nu s-a găsit nicio comandă în tabela OLTP.", "data": None}
-        
-        product_names = resolve_product_names(conn, order.get('products'))
-        
-        order['products'] = ", ".join(product_names)
-        order['date'] = datetime.fromtimestamp(order['created_at']).strftime("%Y-%m-%d %H:%M:%S")
-        return {"warning": "Aceste date provin din tabela OLTP veche. Folosiți /admin/reports/ pentru DWH.", "data": order}
-    finally:
-        conn.close()
-
-def get_orders_by_status(conn, status: str):
-    """Funcție helper pentru rutele completed/pending orders (OLTP/SQL Server)."""
     cursor = conn.cursor()
+    # Folosim TOP 1 și alias-uri
     query = """
-        SELECT TOP 50 o.order_id, o.order_public_id, o.created_at, u.name as user_name, o.products
+        SELECT TOP 1 o.order_id, o.order_public_id, o.products, o.order_status, o.created_at, u.name as user_name
         FROM orders o
         JOIN users_login_info u ON o.user_id = u.user_id
-        WHERE o.order_status = ?
         ORDER BY o.created_at DESC
     """
-    orders = execute_query(cursor, query, params=[status], fetch_all=True)
+    order = execute_query(cursor, query)
+    
+    if not order:
+        return {"message": "Nu s-a găsit nicio comandă în tabela OLTP.", "data": None}
+    
+    product_names = resolve_product_names(conn, order.get('products'))
+    
+    order['products'] = ", ".join(product_names)
+    order['date'] = datetime.fromtimestamp(order['created_at']).strftime("%Y-%m-%d %H:%M:%S")
+    return {"warning": "Aceste date provin din tabela OLTP veche. Folosiți /admin/reports/ pentru DWH.", "data": order}
+
+def get_orders_by_status(conn, status: str, limit: int, after: str | None):
+    """Funcție helper pentru rutele completed/pending orders (OLTP/SQL Server), paginată keyset."""
+    cursor = conn.cursor()
+    after_sql, after_params = keyset_filter(after, prefix="o.")
+    query, params = backend.limit(f"""
+        SELECT o.order_id, o.order_public_id, o.created_at, u.name as user_name, o.products
+        FROM orders o
+        JOIN users_login_info u ON o.user_id = u.user_id
+        WHERE o.order_status = ?{after_sql}
+        {ORDER_BY.format(p="o.")}
+    """, [status, *after_params], limit + 1)
+    orders = execute_query(cursor, query, params=list(params), fetch_all=True)
+    orders, next_cursor = split_page(orders, limit)
     
     for order in orders:
         order['date'] = datetime.fromtimestamp(order['created_at']).strftime("%Y-%m-%d %H:%M")
         order['products'] = ", ".join(resolve_product_names(conn, order.get('products')))
     
-    return {"warning": "Aceste date provin din tabela OLTP veche. Folosiți /admin/reports/ pentru DWH.", "status": status, "count": len(orders), "orders": orders}
+    return {"warning": "Aceste date provin din tabela OLTP veche. Folosiți /admin/reports/ pentru DWH.", "status": status, "count": len(orders), "orders": orders, "next_cursor": next_cursor}
 
 @app.get("/admin/completed-orders")
-def completed_orders():
-    """Obține ultimele 50 de comenzi finalizate din tabela OLTP (SQL Server)."""
-    conn = get_db()
-    try:
-        return get_orders_by_status(conn, "completed")
-    finally:
-        conn.close()
+@offload(oltp_executor, get_db)
+def completed_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
+):
+    """Comenzile finalizate din tabela OLTP (SQL Server), cele mai recente primele, paginate."""
+    return get_orders_by_status(conn, "completed", limit, after)
 
 @app.get("/admin/pending-orders")
-def pending_orders():
-    """Obține ultimele 50 de comenzi în așteptare din tabela OLTP (SQL Server)."""
-    conn = get_db()
-    try:
-        return get_orders_by_status(conn, "pending")
-    finally:
-        conn.close()
+@offload(oltp_executor, get_db)
+def pending_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
+):
+    """Comenzile în așteptare din tabela OLTP (SQL Server), cele mai recente primele, paginate."""
+    return get_orders_by_status(conn, "pending", limit, after)
 
 @app.get("/admin/orders-last-week")
-def orders_last_week():
+@offload(report_executor)
+def orders_last_week(tz: str | None = Query(None, description=TZ_DESCRIPTION)):
     """Numărul de comenzi pe ultimele 7 zile (OLTP/SQL Server)."""
+    zone = resolve_tz(tz)
     end_ts = int(time.time())
-    start_dt = datetime.fromtimestamp(end_ts) - timedelta(days=6)
+    start_dt = datetime.fromtimestamp(end_ts, zone) - timedelta(days=6)
     start_ts = int(start_dt.timestamp())
     
     conn = get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT created_at FROM orders 
-            WHERE created_at >= ? AND created_at <= ?
-        """
-        cursor.execute(query, (start_ts, end_ts))
-        
-        columns = [column[0] for column in cursor.description]
-        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        by_day = count_by_day(cursor, "mssql", "orders", "created_at", start_ts, end_ts, zone, DAY_BUCKETS_CONFIG["mode"])
         
         counts = {}
         for i in range(7):
             day_dt = start_dt + timedelta(days=i)
             day_str = day_dt.strftime("%Y-%m-%d")
-            counts[day_str] = 0
-            
-        for row in rows:
-            day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-            if day in counts:
-                counts[day] += 1
+            counts[day_str] = by_day.get(day_str, 0)
             
         dates = list(counts.keys())
         counts_list = list(counts.values())
@@ -596,10 +886,13 @@ def orders_last_week():
 
 # Rutele vechi de statistică OLTP
 @app.get("/admin/stats/user-orders")
+@offload(oltp_executor)
 def get_user_orders_by_name_old(
     name: str, 
     start: int = Query(..., description="Start Timestamp"), 
-    end: int = Query(..., description="End Timestamp")
+    end: int = Query(..., description="End Timestamp"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară")
 ):
     """Avertisment: Această rută folosește tabele OLTP vechi. Recomandat: Rapoarte DWH."""
     conn = get_db()
@@ -612,13 +905,15 @@ def get_user_orders_by_name_old(
             raise HTTPException(status_code=404, detail="Utilizatorul nu a fost găsit.")
         
         user_id = user['user_id']
-        query = """
+        after_sql, after_params = keyset_filter(after)
+        query, params = backend.limit(f"""
              SELECT order_id, order_public_id, products, order_status, created_at 
              FROM orders 
-             WHERE user_id = ? AND created_at >= ? AND created_at <= ?
-             ORDER BY created_at DESC
-        """
-        orders = execute_query(cursor, query, params=[user_id, start, end], fetch_all=True)
+             WHERE user_id = ? AND created_at >= ? AND created_at <= ?{after_sql}
+             {ORDER_BY.format(p="")}
+        """, [user_id, start, end, *after_params], limit + 1)
+        orders = execute_query(cursor, query, params=list(params), fetch_all=True)
+        orders, next_cursor = split_page(orders, limit)
         
         result = []
         for r in orders:
@@ -629,11 +924,12 @@ def get_user_orders_by_name_old(
                 "status": r["order_status"],
                 "date": datetime.fromtimestamp(r["created_at"]).strftime("%Y-%m-%d %H:%M")
             })
-        return {"warning": "OLTP Data. Folosiți DWH reports.", "user": name, "count": len(result), "orders": result}
+        return {"warning": "OLTP Data. Folosiți DWH reports.", "user": name, "count": len(result), "orders": result, "next_cursor": next_cursor}
     finally:
         conn.close()
 
 @app.get("/admin/stats/order-status")
+@offload(report_executor)
 def stats_order_status_old(start: int = Query(...), end: int = Query(...)):
     """Avertisment: Această rută folosește tabele OLTP vechi. Recomandat: Rapoarte DWH."""
     conn = get_db()
@@ -651,24 +947,14 @@ def stats_order_status_old(start: int = Query(...), end: int = Query(...)):
         conn.close()
 
 @app.get("/admin/stats/daily-orders")
-def stats_daily_orders_old(start: int = Query(...), end: int = Query(...)):
+@offload(report_executor)
+def stats_daily_orders_old(start: int = Query(...), end: int = Query(...), tz: str | None = Query(None, description=TZ_DESCRIPTION)):
     """Avertisment: Această rută folosește tabele OLTP vechi. Recomandat: Rapoarte DWH."""
     conn = get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT created_at FROM orders 
-            WHERE created_at >= ? AND created_at <= ?
-        """
-        cursor.execute(query, (start, end))
-        
-        columns = [column[0] for column in cursor.description]
-        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-        counts = {}
-        for row in rows:
-            day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-            counts[day] = counts.get(day, 0) + 1
+        # GROUP BY pe ziua locală direct în SQL (vezi day_buckets.py)
+        counts = count_by_day(cursor, "mssql", "orders", "created_at", start, end, resolve_tz(tz), DAY_BUCKETS_CONFIG["mode"])
         
         dates = sorted(counts.keys())
         counts_list = [counts[d] for d in dates]
@@ -678,24 +964,14 @@ def stats_daily_orders_old(start: int = Query(...), end: int = Query(...)):
         conn.close()
 
 @app.get("/admin/stats/new-users")
-def stats_new_users_old(start: int = Query(...), end: int = Query(...)):
+@offload(report_executor)
+def stats_new_users_old(start: int = Query(...), end: int = Query(...), tz: str | None = Query(None, description=TZ_DESCRIPTION)):
     """Avertisment: Această rută folosește tabele OLTP vechi. Recomandat: Rapoarte DWH."""
     conn = get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT created_at FROM users_login_info 
-            WHERE created_at >= ? AND created_at <= ?
-        """
-        cursor.execute(query, (start, end))
-        
-        columns = [column[0] for column in cursor.description]
-        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-        counts = {}
-        for row in rows:
-            day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-            counts[day] = counts.get(day, 0) + 1
+        # GROUP BY pe ziua locală direct în SQL (vezi day_buckets.py)
+        counts = count_by_day(cursor, "mssql", "users_login_info", "created_at", start, end, resolve_tz(tz), DAY_BUCKETS_CONFIG["mode"])
 
         dates = sorted(counts.keys())
         counts_list = [counts[d] for d in dates]
@@ -705,37 +981,105 @@ def stats_new_users_old(start: int = Query(...), end: int = Query(...)):
         conn.close()
 
 @app.get("/admin/stats/products-popularity")
+@offload(report_executor)
 def stats_products_old(start: int = Query(...), end: int = Query(...)):
     """Avertisment: Această rută folosește tabele OLTP vechi. Recomandat: Rapoarte DWH."""
     conn = get_db()
     cursor = conn.cursor()
     try:
-        query = """
-            SELECT products FROM orders 
-            WHERE created_at >= ? AND created_at <= ?
-        """
-        cursor.execute(query, (start, end))
-        columns = [column[0] for column in cursor.description]
-        orders = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        
+        # Numărul de apariții per produs (JSON sau GROUP BY pe order_items, după read_mode)
+        counts = order_items.popularity(cursor, start, end)
         
-        product_map = {}
-        cursor.execute("SELECT product_id, name FROM products")
-        columns = [column[0] for column in cursor.description]
-        products_db = [dict(zip(columns, row)) for row in cursor.fetchall()]
-        product_map = {p['product_id']: p['name'] for p in products_db}
+        product_map = dim_cache.get_map("products", conn, keys=counts)
         
         product_counts = {}
-        for order in orders:
-            try:
-                prod_ids = json.loads(order['products'])
-                if isinstance(prod_ids, int): prod_ids = [prod_ids]
-                for pid in prod_ids:
-                    p_name = product_map.get(pid, f"ID {pid}")
-                    product_counts[p_name] = product_counts.get(p_name, 0) + 1
-            except:
-                continue
+        for pid, count in counts.items():
+            p_name = product_map.get(pid, f"ID {pid}")
+            product_counts[p_name] = product_counts.get(p_name, 0) + count
 
         return {"warning": "OLTP Data. Folosiți DWH reports.", "data": product_counts}
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+# ==========================================
+# 6. EXPORT STREAMING (NDJSON / CSV)
+# Rezultatele se citesc cu fetchmany() și se trimit pe măsură ce sosesc:
+# memorie constantă, primul octet ajunge imediat
+# ==========================================
+
+EXPORT_BATCH_SIZE = 2000
+
+# Tabelele exportabile: (SELECT, coloana de filtrare pe interval)
+EXPORT_TABLES = {
+    "orders": (
+        "SELECT order_id, order_public_id, user_id, products, order_status, created_at FROM orders",
+        "created_at",
+    ),
+    "FactOrderItems": ("SELECT * FROM FactOrderItems", "time_id"),
+}
+
+# Rapoartele care au nevoie de nume din cache: raport -> (coloană id, tabelă, coloană nume)
+REPORT_NAME_COLUMNS = {
+    "top_low_sales": ("product_id", "DimProduct", "ProductName"),
+    "top_10_users_orders": ("user_id", "DimUser", "UserName"),
+    "product_sales_classification": ("product_id", "DimProduct", "ProductName"),
+}
+
+def names_transform(names, id_col, name_col):
+    """Transformare pe loturi de rânduri: înlocuiește coloana id cu numele din cache."""
+    def transform(columns, rows):
+        if id_col not in columns:
+            return columns, rows
+        pos = columns.index(id_col)
+        out_cols = [name_col if c == id_col else c for c in columns]
+        out_rows = [
+            tuple(names.get(v, f"ID Necunoscut {v}") if i == pos else v for i, v in enumerate(row))
+            for row in rows
+        ]
+        return out_cols, out_rows
+    return transform
+
+@app.get("/admin/export/{table_name}")
+async def export_table(
+    table_name: str,
+    format: str = Query("ndjson", description="ndjson sau csv"),
+    start: int | None = Query(None, description="Start Timestamp (opțional)"),
+    end: int | None = Query(None, description="End Timestamp (opțional)"),
+):
+    """Export streaming pentru tabelele OLTP 'orders' și DWH 'FactOrderItems'."""
+    if table_name not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Tabelă neexportabilă: {table_name}")
+    query, filter_col = EXPORT_TABLES[table_name]
+    params = []
+    if start is not None and end is not None:
+        query += f" WHERE {filter_col} >= ? AND {filter_col} <= ?"
+        params = list(time_id_range(start, end)) if filter_col == "time_id" else [start, end]
+    query += f" ORDER BY {TABLE_MODELS.get(table_name, {}).get('primary_key', 'order_id')}"
+    body = stream_query(export_streams, get_db, query, params, format, EXPORT_BATCH_SIZE)
+    return streaming_response(body, format, table_name)
+
+@app.get("/admin/reports/{report_name}/export")
+async def export_report(
+    report_name: str,
+    start: int = Query(..., description="Start Timestamp"),
+    end: int = Query(..., description="End Timestamp"),
+    format: str = Query("ndjson", description="ndjson sau csv"),
+):
+    """Export streaming pentru oricare dintre cele 5 rapoarte DWH (ex. top-low-sales)."""
+    key = report_name.replace("-", "_")
+    if key not in REPORT_SQL or key == "dashboard":
+        raise HTTPException(status_code=404, detail=f"Raport necunoscut: {report_name}")
+    transform = None
+    if key in REPORT_NAME_COLUMNS:
+        id_col, table, name_col = REPORT_NAME_COLUMNS[key]
+
+        def load_names():
+            conn = get_db()
+            try:
+                return dim_cache.get_map(table, conn)
+            finally:
+                conn.close()
+
+        transform = names_transform(await report_executor.run(load_names), id_col, name_col)
+    body = stream_query(export_streams, get_db, REPORT_SQL[key], time_id_range(start, end),
+                        format, EXPORT_BATCH_SIZE, transform)
+    return streaming_response(body, format, key)
@@ -0,0 +1,375 @@
+"""Adaptoare de backend: SQL Server (pyodbc), MySQL (pymysql) și SQLite (sqlite3).
+
+Un backend ține tot ce diferă între drivere: stilul placeholder-ului, paginarea (TOP / LIMIT),
+cheia generată la INSERT (OUTPUT INSERTED / lastrowid), conversia timestamp-urilor UNIX și
+calea cea mai rapidă de inserare în masă a driverului:
+    mssql  - fast_executemany (parametrii trimiși ca un singur array ODBC); cu chei: MERGE ... OUTPUT
+    mysql  - INSERT ... VALUES (...), (...) pe mai multe rânduri, un round-trip per bucată
+    sqlite - executemany în tranzacția curentă (în proces); cu chei: VALUES pe mai multe rânduri
+
+Build-ul OLTP (lab2/mysql/api copy.py) alege backend-ul din BACKEND_CONFIG, deci poate rula
+întreg pe un fișier SQLite (benchmark și teste de încărcare pe o singură mașină):
+    python -m lab2.backends --init-sqlite lab2/oltp.db
+"""
+import argparse
+import importlib
+import re
+from contextlib import contextmanager
+
+_SELECT = re.compile(r"^\s*SELECT(\s+DISTINCT)?\s", re.I)
+
+
+def _dict_row(cursor, row):
+    return dict(zip([c[0] for c in cursor.description], row))
+
+
+def _first(row):
+    return next(iter(row.values())) if isinstance(row, dict) else row[0]
+
+
+class Backend:
+    """Comportamentul comun (LIMIT, lastrowid); subclasele suprascriu doar ce diferă."""
+
+    dialect = None
+    driver = None
+    ph = "?"
+    # Limitele unei singure instrucțiuni: parametri și rânduri într-un VALUES
+    max_params = 32766
+    max_values_rows = 10_000
+
+    def __init__(self, config=None, dict_rows=False):
+        self.config = dict(config or {})
+        self.dict_rows = dict_rows
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.dialect}>"
+
+    @property
+    def Error(self):
+        """Clasa de bază a erorilor driverului (pentru `except backend.Error`)."""
+        return importlib.import_module(self.driver).Error
+
+    # --- SQL ---
+
+    @classmethod
+    def placeholders(cls, n):
+        return ", ".join([cls.ph] * n)
+
+    @classmethod
+    def limit(cls, sql, params, n):
+        """SELECT-ul limitat la primele n rânduri: (sql, params)."""
+        return f"{sql} LIMIT {cls.ph}", (*params, n)
+
+    @classmethod
+    def int_div(cls, expr, divisor):
+        return f"({expr}) / {divisor}"
+
+    @classmethod
+    def from_unixtime(cls, expr):
+        """Timestamp UNIX (secunde, UTC) -> dată și oră a serverului."""
+        raise NotImplementedError
+
+    # --- Conexiuni ---
+
+    def connect(self):
+        raise NotImplementedError
+
+    def ping(self, conn):
+        """Verificare ieftină a conexiunii la împrumut din pool."""
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+        finally:
+            cursor.close()
+
+    # --- Scrieri ---
+
+    def insert(self, cursor, table, data, primary_key=None):
+        """INSERT pentru un rând (dict); întoarce cheia generată dacă primary_key este dat."""
+        cursor.execute(f"INSERT INTO {table} ({', '.join(data)}) VALUES ({self.placeholders(len(data))})",
+                       tuple(data.values()))
+        return self.last_id(cursor) if primary_key else None
+
+    def last_id(self, cursor):
+        return cursor.lastrowid
+
+    def upsert(self, cursor, table, data, key, primary_key):
+        """INSERT sau rândul existent cu aceeași valoare în coloana unică `key`, într-o singură
+        instrucțiune (fără cursă între SELECT și INSERT); întoarce cheia primară a rândului."""
+        raise NotImplementedError
+
+    @contextmanager
+    def explicit_keys(self, cursor, table):
+        """Inserări cu valori date pentru cheia generată (doar SQL Server cere IDENTITY_INSERT)."""
+        yield
+
+    def bulk_insert(self, cursor, table, columns, rows, chunk_size=1000, primary_key=None):
+        """Inserează rândurile (tupluri în ordinea `columns`) în tranzacția curentă.
+
+        Fără primary_key întoarce numărul de rânduri; cu primary_key, cheile generate în
+        ordinea rândurilor.
+        """
+        if primary_key is None:
+            query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({self.placeholders(len(columns))})"
+            for start in range(0, len(rows), chunk_size):
+                cursor.executemany(query, [tuple(r) for r in rows[start:start + chunk_size]])
+            return len(rows)
+        ids = []
+        for chunk in self._chunks(rows, chunk_size, len(columns)):
+            ids += self._insert_values(cursor, table, columns, chunk)
+        return ids
+
+    def _chunks(self, rows, chunk_size, width):
+        per_statement = max(1, min(chunk_size, self.max_values_rows, self.max_params // width))
+        for start in range(0, len(rows), per_statement):
+            yield rows[start:start + per_statement]
+
+    def _insert_values(self, cursor, table, columns, chunk):
+        # INSERT cu VALUES pe mai multe rânduri: cheile unei singure instrucțiuni sunt consecutive
+        row_plhs = f"({self.placeholders(len(columns))})"
+        cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_plhs] * len(chunk))}",
+                       [v for row in chunk for v in row])
+        first = self._first_id(cursor, len(chunk))
+        return list(range(first, first + len(chunk)))
+
+    def _first_id(self, cursor, count):
+        return cursor.lastrowid
+
+
+class MSSQLBackend(Backend):
+    dialect = "mssql"
+    driver = "pyodbc"
+    ph = "?"
+    # 2100 de parametri per instrucțiune, 1000 de rânduri per VALUES
+    max_params = 2100
+    max_values_rows = 1000
+
+    @classmethod
+    def limit(cls, sql, params, n):
+        # TOP (?) vine înaintea celorlalți parametri în textul SQL
+        return _SELECT.sub(lambda m: f"SELECT{m.group(1) or ''} TOP ({cls.ph}) ", sql, count=1), (n, *params)
+
+    @classmethod
+    def from_unixtime(cls, expr):
+        return f"DATEADD(second, {expr}, '1970-01-01')"
+
+    def connect(self):
+        import pyodbc
+        # config: DRIVER ('{ODBC Driver 17 for SQL Server}'), SERVER, DATABASE, UID, PWD
+        conn = pyodbc.connect(";".join(f"{key}={self.config[key]}" for key in ("DRIVER", "SERVER", "DATABASE", "UID", "PWD")))
+        conn.setdecoding(pyodbc.SQL_CHAR, encoding="utf-8")
+        conn.setencoding(encoding="utf-8")
+        return conn
+
+    def insert(self, cursor, table, data, primary_key=None):
+        if not primary_key:
+            return super().insert(cursor, table, data)
+        # OUTPUT în aceeași instrucțiune: SCOPE_IDENTITY() citit separat ar fi în alt batch
+        cursor.execute(f"INSERT INTO {table} ({', '.join(data)}) OUTPUT INSERTED.{primary_key} "
+                       f"VALUES ({self.placeholders(len(data))})", tuple(data.values()))
+        return cursor.fetchone()[0]
+
+    def last_id(self, cursor):
+        cursor.execute("SELECT SCOPE_IDENTITY()")
+        return cursor.fetchone()[0]
+
+    def upsert(self, cursor, table, data, key, primary_key):
+        # HOLDLOCK: fără el, două MERGE concurente pot vedea amândouă "NOT MATCHED"
+        cols = list(data)
+        cursor.execute(
+            f"MERGE INTO {table} WITH (HOLDLOCK) AS tgt "
+            f"USING (SELECT {', '.join(f'{self.ph} AS {c}' for c in cols)}) AS src ON tgt.{key} = src.{key} "
+            f"WHEN MATCHED THEN UPDATE SET tgt.{key} = src.{key} "
+            f"WHEN NOT MATCHED THEN INSERT ({', '.join(cols)}) VALUES ({', '.join('src.' + c for c in cols)}) "
+            f"OUTPUT INSERTED.{primary_key};",
+            tuple(data.values()),
+        )
+        return _first(cursor.fetchone())
+
+    @contextmanager
+    def explicit_keys(self, cursor, table):
+        cursor.execute("SELECT OBJECTPROPERTY(OBJECT_ID(?), 'TableHasIdentity')", (table,))
+        identity = cursor.fetchone()[0] == 1
+        if identity:
+            cursor.execute(f"SET IDENTITY_INSERT {table} ON")
+        try:
+            yield
+        finally:
+            if identity:
+                cursor.execute(f"SET IDENTITY_INSERT {table} OFF")
+
+    def bulk_insert(self, cursor, table, columns, rows, chunk_size=1000, primary_key=None):
+        if primary_key is None:
+            cursor.fast_executemany = True
+            return super().bulk_insert(cursor, table, columns, rows, chunk_size)
+        # Un INSERT ... OUTPUT pe mai multe rânduri nu garantează ordinea: MERGE întoarce
+        # indexul rândului sursă împreună cu cheia generată
+        col_list = ", ".join(columns)
+        row_plhs = f"({self.placeholders(len(columns) + 1)})"
+        ids = []
+        for chunk_start, chunk in self._indexed_chunks(rows, chunk_size, len(columns) + 1):
+            cursor.execute(
+                f"MERGE INTO {table} AS tgt "
+                f"USING (VALUES {', '.join([row_plhs] * len(chunk))}) AS src (row_idx, {col_list}) ON 1 = 0 "
+                f"WHEN NOT MATCHED THEN INSERT ({col_list}) VALUES ({', '.join('src.' + c for c in columns)}) "
+                f"OUTPUT src.row_idx, INSERTED.{primary_key};",
+                [v for i, row in enumerate(chunk, chunk_start) for v in (i, *row)],
+            )
+            ids += [pk for _, pk in sorted(tuple(r) for r in cursor.fetchall())]
+        return ids
+
+    def _indexed_chunks(self, rows, chunk_size, width):
+        start = 0
+        for chunk in self._chunks(rows, chunk_size, width):
+            yield start, chunk
+            start += len(chunk)
+
+
+class MySQLBackend(Backend):
+    dialect = "mysql"
+    driver = "pymysql"
+    ph = "%s"
+    max_params = 65535
+
+    @classmethod
+    def int_div(cls, expr, divisor):
+        return f"({expr}) DIV {divisor}"
+
+    @classmethod
+    def from_unixtime(cls, expr):
+        return f"FROM_UNIXTIME({expr})"
+
+    def connect(self):
+        import pymysql
+        if self.dict_rows:
+            return pymysql.connect(**self.config, cursorclass=pymysql.cursors.DictCursor)
+        return pymysql.connect(**self.config)
+
+    def ping(self, conn):
+        conn.ping(reconnect=False)
+
+    def upsert(self, cursor, table, data, key, primary_key):
+        # LAST_INSERT_ID(pk) face ca lastrowid să fie cheia rândului existent la duplicat.
+        # InnoDB consumă totuși o valoare AUTO_INCREMENT per apel (goluri în id-uri, nu duplicate).
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(data)}) VALUES ({self.placeholders(len(data))}) "
+            f"ON DUPLICATE KEY UPDATE {primary_key} = LAST_INSERT_ID({primary_key})",
+            tuple(data.values()),
+        )
+        return cursor.lastrowid
+
+    def bulk_insert(self, cursor, table, columns, rows, chunk_size=1000, primary_key=None):
+        if primary_key is not None:
+            return super().bulk_insert(cursor, table, columns, rows, chunk_size, primary_key)
+        # Explicit, nu prin rescrierea din executemany: aceeași limită de rânduri ca pentru chei
+        for chunk in self._chunks(rows, chunk_size, len(columns)):
+            row_plhs = f"({self.placeholders(len(columns))})"
+            cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_plhs] * len(chunk))}",
+                           [v for row in chunk for v in row])
+        return len(rows)
+
+
+class SQLiteBackend(Backend):
+    dialect = "sqlite"
+    driver = "sqlite3"
+    ph = "?"
+
+    @classmethod
+    def from_unixtime(cls, expr):
+        return f"datetime({expr}, 'unixepoch')"
+
+    def connect(self):
+        import sqlite3
+        # Conexiunile din pool trec între thread-urile executorului (una singură la un moment dat)
+        conn = sqlite3.connect(self.config.get("path", ":memory:"), timeout=self.config.get("timeout", 5.0),
+                               check_same_thread=False)
+        for name, value in self.config.get("pragmas", {}).items():
+            conn.execute(f"PRAGMA {name} = {value}")
+        if self.dict_rows:
+            conn.row_factory = _dict_row
+        return conn
+
+    def upsert(self, cursor, table, data, key, primary_key):
+        # DO UPDATE (nu DO NOTHING): RETURNING întoarce și rândul existent (SQLite >= 3.35)
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(data)}) VALUES ({self.placeholders(len(data))}) "
+            f"ON CONFLICT ({key}) DO UPDATE SET {key} = excluded.{key} RETURNING {primary_key}",
+            tuple(data.values()),
+        )
+        return _first(cursor.fetchone())
+
+    def _first_id(self, cursor, count):
+        # lastrowid este cheia ultimului rând; cheile INTEGER PRIMARY KEY sunt consecutive
+        return cursor.lastrowid - count + 1
+
+
+BACKENDS = {
+    "mssql": MSSQLBackend,
+    "mysql": MySQLBackend,
+    "sqlite": SQLiteBackend,
+}
+
+
+def get_backend(dialect, config=None, dict_rows=False):
+    try:
+        return BACKENDS[dialect](config, dict_rows=dict_rows)
+    except KeyError:
+        raise ValueError(f"Dialect necunoscut: {dialect} ({', '.join(BACKENDS)})")
+
+
+# Schema OLTP a build-ului MySQL (vezi lab2/mysql/create_tables.py), în dialectul SQLite
+SQLITE_OLTP_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS users_login_info (
+        user_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        order_id INTEGER PRIMARY KEY,
+        order_public_id TEXT NOT NULL,
+        user_id INTEGER REFERENCES users_login_info(user_id),
+        products TEXT NOT NULL,
+        order_status TEXT NOT NULL,
+        created_at INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS products (
+        product_id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE,
+        price NUMERIC NOT NULL
+    )
+    """,
+]
+SQLITE_PRODUCTS = [("Caricature", 29.99), ("Voiceover", 49.99), ("Song", 79.99)]
+
+
+def init_sqlite(path, log=print):
+    """Creează schema OLTP într-un fișier SQLite și aplică migrările (indexuri, order_items)."""
+    from .migrations import migrate
+
+    conn = SQLiteBackend({"path": path}).connect()
+    try:
+        for ddl in SQLITE_OLTP_SCHEMA:
+            conn.execute(ddl)
+        conn.executemany("INSERT OR IGNORE INTO products (name, price) VALUES (?, ?)", SQLITE_PRODUCTS)
+        conn.commit()
+        migrate(conn, "sqlite", log=log, scopes=("oltp",))
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--init-sqlite", metavar="DB", required=True, help="fișierul SQLite de creat / completat")
+    args = parser.parse_args()
+    init_sqlite(args.init_sqlite)
+    print(f"Schema OLTP pregătită în {args.init_sqlite}; setați BACKEND_CONFIG['dialect'] = 'sqlite'")
+
+
+if __name__ == "__main__":
+    main()
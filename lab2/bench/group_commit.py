@@ -0,0 +1,168 @@
+"""Benchmark pentru /process-order: un COMMIT per comandă vs group commit (group_commit.py).
+
+Mai multe fire plasează comenzi ca cererile concurente ale API-ului. Drumul direct face
+INSERT + COMMIT pentru fiecare comandă pe o conexiune din pool; drumul cu group commit pune
+comanda în coada GroupCommitWriter și așteaptă COMMIT-ul lotului. Pe SQLite se folosește
+synchronous=FULL, ca fiecare COMMIT să ajungă pe disc (costul pe care îl amortizează lotul).
+Se verifică apoi că fiecare comandă a fost scrisă o singură dată, cu produsele ei.
+
+    python -m lab2.bench.group_commit
+    python -m lab2.bench.group_commit --threads 64 --orders 200 --max-batch 200 --max-delay-ms 2
+    python -m lab2.bench.group_commit --dialect mysql
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+from ..backends import get_backend, init_sqlite
+from ..db_pool import ConnectionPool
+from ..group_commit import CommitUncertain, GroupCommitWriter
+from ..order_items import OrderItems
+
+ORDER_COLUMNS = ("order_public_id", "user_id", "products", "order_status", "created_at")
+
+
+def order_inserter(backend, pool, items):
+    # Ca insert_orders din mysql/api copy.py
+    def insert_orders(rows):
+        conn = pool.acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                order_ids = backend.bulk_insert(cursor, "orders", ORDER_COLUMNS, rows, primary_key="order_id")
+                items.write(cursor, [(order_id, row[2]) for order_id, row in zip(order_ids, rows)], replace=False)
+            except BaseException:
+                conn.rollback()
+                raise
+            try:
+                conn.commit()
+            except backend.Error as e:
+                conn.discard()
+                raise CommitUncertain(f"COMMIT eșuat pentru {len(rows)} comenzi: {e}") from e
+            return order_ids
+        finally:
+            conn.close()
+    return insert_orders
+
+
+def run(place, threads, orders, user_ids, seed):
+    """Fiecare fir plasează `orders` comenzi; întoarce (secunde, {order_public_id: (order_id, produse)})."""
+    placed, lock = {}, threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(n):
+        rnd = random.Random(seed + n)
+        local = {}
+        barrier.wait()
+        for _ in range(orders):
+            products = [rnd.randint(1, 5) for _ in range(rnd.randint(1, 4))]
+            row = (str(uuid.uuid4()), rnd.choice(user_ids), json.dumps(products), "completed", int(time.time()))
+            local[row[0]] = (place(row), products)
+        with lock:
+            placed.update(local)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - started, placed
+
+
+def check(backend, pool, placed):
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        problems = []
+        ids = {order_id for order_id, _ in placed.values()}
+        if len(ids) != len(placed):
+            problems.append(f"{len(placed) - len(ids)} order_id-uri duplicate")
+        for public_id, (order_id, products) in list(placed.items())[:200]:
+            cursor.execute(f"SELECT order_public_id FROM orders WHERE order_id = {backend.ph}", (order_id,))
+            row = cursor.fetchone()
+            cursor.execute(f"SELECT SUM(qty) FROM order_items WHERE order_id = {backend.ph}", (order_id,))
+            qty = cursor.fetchone()[0]
+            if row is None or row[0] != public_id or qty != len(products):
+                problems.append(f"order_id {order_id}: {row} / {qty} produse")
+        conn.rollback()
+        return problems
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=("sqlite", "mysql"), default="sqlite",
+                        help="mysql folosește BACKEND_CONFIG / DB_CONFIG din mysql/db_config copy.py")
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--orders", type=int, default=100, help="comenzi per fir")
+    parser.add_argument("--max-batch", type=int, default=100)
+    parser.add_argument("--max-delay-ms", type=float, default=5.0)
+    parser.add_argument("--pool-size", type=int, default=6, help="ca EXECUTOR_CONFIG['oltp_workers']")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.dialect == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(), "group_commit.db")
+        init_sqlite(path, log=lambda _: None)
+        backend = get_backend("sqlite", {"path": path, "timeout": 60,
+                                         "pragmas": {"journal_mode": "WAL", "synchronous": "FULL"}})
+    else:
+        from ..mysql.db_config import BACKEND_CONFIG, DB_CONFIG
+        backend = get_backend("mysql", BACKEND_CONFIG.get("mysql", DB_CONFIG))
+
+    pool = ConnectionPool(backend.connect, ping=backend.ping, max_size=args.pool_size, timeout=60)
+    items = OrderItems(backend.dialect)
+    insert_orders = order_inserter(backend, pool, items)
+    conn = pool.acquire()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"INSERT INTO users_login_info (name, created_at) VALUES ({backend.ph}, {backend.ph})",
+                       (f"bench_group_commit_{uuid.uuid4()}", int(time.time())))
+        user_ids = [backend.last_id(cursor)]
+        conn.commit()
+    finally:
+        conn.close()
+
+    # Drumul direct trece prin același număr de fire de executor ca API-ul
+    direct_slots = threading.BoundedSemaphore(args.pool_size)
+
+    def direct(row):
+        with direct_slots:
+            return insert_orders([row])[0]
+
+    writer = GroupCommitWriter("orders", insert_orders, max_batch=args.max_batch,
+                               max_delay_ms=args.max_delay_ms, max_queue=args.threads * 2)
+
+    def grouped(row):
+        return writer.submit(row).result()
+
+    total = args.threads * args.orders
+    print(f"{backend.dialect}: {args.threads} fire x {args.orders} comenzi, lot <= {args.max_batch}, "
+          f"fereastră {args.max_delay_ms} ms")
+    print(f"{'variantă':<16}{'comenzi/s':>10}{'lot mediu':>11}  verificare")
+    failed = False
+    for label, place in (("COMMIT / comandă", direct), ("group commit", grouped)):
+        seconds, placed = run(place, args.threads, args.orders, user_ids, args.seed)
+        problems = check(backend, pool, placed)
+        if len(placed) != total:
+            problems.append(f"{len(placed)} din {total} comenzi")
+        batch = writer.stats()["avg_batch_size"] if place is grouped else 1
+        status = "ok" if not problems else f"{len(problems)} probleme, ex. {problems[0]}"
+        print(f"{label:<16}{total / seconds:>10.0f}{batch:>11}  {status}")
+        failed = failed or bool(problems)
+    writer.close()
+    pool.close_all()
+    if failed:
+        raise SystemExit("comenzi lipsă sau duplicate")
+
+
+if __name__ == "__main__":
+    main()
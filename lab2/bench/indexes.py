@@ -0,0 +1,171 @@
+"""Benchmark înainte/după pentru indexurile din migrations.py.
+
+Construiește în SQLite un set de date scalat (orders + users_login_info + FactOrderItems +
+DimTime), rulează interogările rutelor fără indexuri secundare, aplică migrările
+(migrate(conn, "sqlite")) și rulează din nou aceleași interogări cu aceiași parametri.
+Rezultatele trebuie să fie identice; se afișează timpul mediu și planul folosit după migrare.
+
+    python -m lab2.bench.indexes
+    python -m lab2.bench.indexes --orders 1000000 --facts 1000000 --repeat 50
+"""
+import argparse
+import random
+import time
+import uuid
+
+from ..migrations import migrate
+from ..report_queries import REPORT_SQL, time_id_range
+from .report_queries import build_sqlite, random_windows, to_sqlite
+
+# Interogările rutelor din lab2/api.py și lab2/mysql/api copy.py, în sintaxa SQLite
+# (TOP -> LIMIT); parametrii sunt generați de `params` pentru fiecare repetiție.
+ROUTE_QUERIES = {
+    "get-orders (pagina 1)": """
+        SELECT * FROM orders WHERE user_id = ?
+        ORDER BY created_at DESC, order_id DESC LIMIT 51
+    """,
+    "get-orders (pagină adâncă)": """
+        SELECT * FROM orders WHERE user_id = ?
+        AND created_at <= ? AND (created_at < ? OR order_id < ?)
+        ORDER BY created_at DESC, order_id DESC LIMIT 51
+    """,
+    "pending-orders": """
+        SELECT o.order_id, o.order_public_id, o.created_at, u.name as user_name, o.products
+        FROM orders o
+        JOIN users_login_info u ON o.user_id = u.user_id
+        WHERE o.order_status = ?
+        ORDER BY o.created_at DESC, o.order_id DESC LIMIT 51
+    """,
+    "stats/user-orders": """
+        SELECT order_id, order_public_id, products, order_status, created_at
+        FROM orders
+        WHERE user_id = ? AND created_at >= ? AND created_at <= ?
+        ORDER BY created_at DESC, order_id DESC LIMIT 51
+    """,
+    "orders-last-week": """
+        SELECT created_at FROM orders
+        WHERE created_at >= ? AND created_at <= ?
+    """,
+    "stats/order-status": """
+        SELECT order_status, COUNT(*) as count
+        FROM orders
+        WHERE created_at >= ? AND created_at <= ?
+        GROUP BY order_status
+    """,
+    "lab3 istoric utilizator": """
+        SELECT COUNT(*), SUM(sales_amount) FROM FactOrderItems
+        WHERE user_id = ? AND time_id >= ?
+    """,
+}
+
+REPORTS = ["top_low_sales", "top_10_users_orders", "avg_discount_weekend_vs_weekday", "product_sales_classification"]
+
+
+def add_orders(conn, orders, users, span_days, seed):
+    rnd = random.Random(seed)
+    now = int(time.time())
+    conn.execute("CREATE TABLE users_login_info (user_id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE, "
+                 "created_at INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE orders (order_id INTEGER PRIMARY KEY, order_public_id TEXT NOT NULL, user_id INTEGER, "
+                 "products TEXT NOT NULL, order_status TEXT NOT NULL, created_at INTEGER NOT NULL)")
+    conn.executemany("INSERT INTO users_login_info VALUES (?, ?, ?)",
+                     ((i, f"user{i}", now - span_days * 86400) for i in range(1, users + 1)))
+    conn.executemany("INSERT INTO orders VALUES (?, ?, ?, ?, ?, ?)", (
+        (i, str(uuid.UUID(int=rnd.getrandbits(128))), rnd.randint(1, users),
+         f"[{rnd.randint(1, 3)}, {rnd.randint(1, 3)}]",
+         "pending" if rnd.random() < 0.05 else "completed",
+         now - rnd.randint(0, span_days * 86400))
+        for i in range(1, orders + 1)
+    ))
+    conn.execute("ANALYZE")
+    conn.commit()
+    return now
+
+
+def make_params(conn, now, first, days, users, repeat, seed):
+    rnd = random.Random(seed)
+    windows = random_windows(first, days, repeat, seed)
+    params = {name: [] for name in ROUTE_QUERIES}
+    for i in range(repeat):
+        user = rnd.randint(1, users)
+        params["get-orders (pagina 1)"].append((user,))
+        # Cursorul pentru o pagină din mijlocul istoricului utilizatorului
+        rows = conn.execute("SELECT created_at, order_id FROM orders WHERE user_id = ? "
+                            "ORDER BY created_at DESC, order_id DESC", (user,)).fetchall()
+        c, o = rows[len(rows) // 2] if rows else (now, 0)
+        params["get-orders (pagină adâncă)"].append((user, c, c, o))
+        params["pending-orders"].append(("pending",))
+        start = now - rnd.randint(30, 365) * 86400
+        params["stats/user-orders"].append((user, start, start + 90 * 86400))
+        week = now - rnd.randint(0, 300) * 86400
+        params["orders-last-week"].append((week - 7 * 86400, week))
+        params["stats/order-status"].append((week - 30 * 86400, week))
+        params["lab3 istoric utilizator"].append((rnd.randint(1, 5000), time_id_range(*windows[i])[0]))
+    for name in REPORTS:
+        params[name] = [time_id_range(start, end) for start, end in windows]
+    return params
+
+
+def normalize(row):
+    # Ordinea de însumare diferă între planuri; comparăm sumele rotunjite
+    return tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+
+
+def run_all(conn, queries, params):
+    timings, results = {}, {}
+    for name, sql in queries.items():
+        total = 0.0
+        out = []
+        for p in params[name]:
+            t0 = time.perf_counter()
+            rows = conn.execute(sql, p).fetchall()
+            total += time.perf_counter() - t0
+            out.append(sorted(map(normalize, rows)))
+        timings[name] = total / len(params[name])
+        results[name] = out
+    return timings, results
+
+
+def plan(conn, sql, p):
+    return "; ".join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, p).fetchall())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=300_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument("--facts", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    conn, first = build_sqlite(args.facts, args.days, args.seed, with_index=False)
+    now = add_orders(conn, args.orders, args.users, args.days, args.seed)
+    print(f"Date generate: {args.orders} comenzi, {args.facts} fapte ({time.perf_counter() - t0:.1f}s)")
+
+    queries = dict(ROUTE_QUERIES)
+    queries.update({name: to_sqlite(REPORT_SQL[name]) for name in REPORTS})
+    params = make_params(conn, now, first, args.days, args.users, args.repeat, args.seed)
+
+    before, before_rows = run_all(conn, queries, params)
+    t0 = time.perf_counter()
+    migrate(conn, "sqlite")
+    conn.execute("ANALYZE")
+    print(f"Migrare aplicată în {time.perf_counter() - t0:.1f}s")
+    after, after_rows = run_all(conn, queries, params)
+
+    print(f"\n{'interogare':<34}{'înainte (ms)':>14}{'după (ms)':>12}{'speedup':>10}")
+    for name in queries:
+        if before_rows[name] != after_rows[name]:
+            raise AssertionError(f"{name}: rezultate diferite după migrare")
+        print(f"{name:<34}{before[name] * 1000:>14.2f}{after[name] * 1000:>12.2f}"
+              f"{before[name] / max(after[name], 1e-9):>9.1f}x")
+    print("\nPlanuri după migrare:")
+    for name, sql in queries.items():
+        print(f"  {name}: {plan(conn, sql, params[name][0])}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Test de încărcare cu trafic mixt: rapoarte DWH lente + cereri OLTP ieftine.
+
+Rulează împotriva unui server pornit (uvicorn lab2.api:app --port 8000) și raportează
+throughput-ul și latențele p50/p99 separat pentru fiecare clasă de trafic. Scopul este
+să arate că rapoartele nu mai înfometează căile OLTP.
+
+    python -m lab2.bench.load_mixed --duration 30 --report-clients 16 --oltp-clients 16
+    python -m lab2.bench.load_mixed --build mysql      # rutele OLTP din build-ul pymysql
+"""
+import argparse
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+
+REPORT_PATHS = [
+    "/admin/reports/top-low-sales",
+    "/admin/reports/top-quarter-profit",
+    "/admin/reports/top-10-users-orders",
+    "/admin/reports/avg-discount-weekend-vs-weekday",
+    "/admin/reports/product-sales-classification",
+]
+
+OLTP_PATHS = {
+    "mssql": ["/admin/latest-order", "/admin/pending-orders", "/admin/completed-orders"],
+    "mysql": ["/get-orders?userId={user_id}", "/admin/latest-order", "/admin/pending-orders"],
+}
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    k = min(len(values) - 1, max(0, int(round(p / 100.0 * len(values) + 0.5)) - 1))
+    return values[k]
+
+
+def client(base_url, kind, paths, deadline, results, lock, rnd, window_days, bypass_cache):
+    while time.monotonic() < deadline:
+        path = rnd.choice(paths)
+        if kind == "reports":
+            end = int(time.time()) - rnd.randint(0, 365) * 86400
+            start = end - rnd.randint(1, window_days) * 86400
+            # Ferestre distincte ocolesc cache-ul de rapoarte, ca să măsurăm interogările reale
+            if bypass_cache:
+                start -= rnd.randint(0, 86399)
+            path = f"{path}?start={start}&end={end}"
+        else:
+            path = path.format(user_id=rnd.randint(1, 100))
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(base_url + path, timeout=60) as res:
+                res.read()
+                ok = 200 <= res.status < 300
+        except urllib.error.HTTPError as e:
+            ok = False
+            e.read()
+        except Exception:
+            ok = False
+        elapsed = time.perf_counter() - t0
+        with lock:
+            results[kind]["lat"].append(elapsed)
+            results[kind]["ok" if ok else "err"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--build", choices=sorted(OLTP_PATHS), default="mssql")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--report-clients", type=int, default=16)
+    parser.add_argument("--oltp-clients", type=int, default=16)
+    parser.add_argument("--window-days", type=int, default=90)
+    parser.add_argument("--use-cache", action="store_true", help="nu ocoli cache-ul de rapoarte")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    results = defaultdict(lambda: {"lat": [], "ok": 0, "err": 0})
+    lock = threading.Lock()
+    deadline = time.monotonic() + args.duration
+    threads = []
+    for i in range(args.report_clients):
+        threads.append(threading.Thread(target=client, args=(
+            args.url, "reports", REPORT_PATHS, deadline, results, lock,
+            random.Random(args.seed * 1000 + i), args.window_days, not args.use_cache)))
+    for i in range(args.oltp_clients):
+        threads.append(threading.Thread(target=client, args=(
+            args.url, "oltp", OLTP_PATHS[args.build], deadline, results, lock,
+            random.Random(args.seed * 2000 + i), args.window_days, False)))
+
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.monotonic() - started
+
+    print(f"Durată: {wall:.1f}s, clienți rapoarte={args.report_clients}, clienți OLTP={args.oltp_clients}")
+    print(f"{'clasă':<10}{'cereri':>8}{'erori':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for kind in ("reports", "oltp"):
+        r = results[kind]
+        lat = r["lat"]
+        print(f"{kind:<10}{r['ok']:>8}{r['err']:>8}{len(lat) / wall:>10.1f}"
+              f"{percentile(lat, 50) * 1000:>10.1f}{percentile(lat, 99) * 1000:>10.1f}"
+              f"{(max(lat) if lat else 0) * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
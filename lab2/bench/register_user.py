@@ -0,0 +1,149 @@
+"""Benchmark și test de concurență pentru /register-user: SELECT + INSERT vs upsert vs upsert + cache.
+
+Mai multe fire (fiecare cu conexiunea lui) înregistrează aceleași nume, suprapuse, ca un val
+de login-uri. Se compară:
+- drumul vechi: SELECT user_id, apoi INSERT dacă lipsește (cursa produce erori de cheie unică);
+- backend.upsert: o singură instrucțiune care întoarce user_id (backends.py);
+- backend.upsert + LRUCache (ca în api copy.py): login-urile repetate nu mai ating baza de date.
+După fiecare variantă se verifică: niciun nume duplicat, fiecare nume are un singur user_id,
+iar toate firele au primit același user_id pentru același nume.
+
+    python -m lab2.bench.register_user
+    python -m lab2.bench.register_user --threads 16 --logins 20000 --names 2000
+    python -m lab2.bench.register_user --dialect mysql
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from ..backends import get_backend, init_sqlite
+from ..lookup_cache import LRUCache
+
+
+def legacy(backend, cursor, name, cache):
+    cursor.execute(f"SELECT user_id FROM users_login_info WHERE name = {backend.ph}", (name,))
+    row = cursor.fetchone()
+    if row:
+        return row[0]
+    return backend.insert(cursor, "users_login_info", {"name": name, "created_at": int(time.time())},
+                          primary_key="user_id")
+
+
+def upsert(backend, cursor, name, cache):
+    return backend.upsert(cursor, "users_login_info", {"name": name, "created_at": int(time.time())},
+                          key="name", primary_key="user_id")
+
+
+def cached(backend, cursor, name, cache):
+    user_id = cache.get(name)
+    if user_id is None:
+        version = cache.version()
+        user_id = upsert(backend, cursor, name, cache)
+        cache.put(name, user_id, version=version)
+    return user_id
+
+
+VARIANTS = {"SELECT + INSERT": legacy, "upsert": upsert, "upsert + cache": cached}
+
+
+def run(backend, variant, workload, threads, cache_size):
+    """Rulează workload-ul (liste de nume, una pe fir); întoarce (secunde, erori, nume -> id-uri văzute)."""
+    cache = LRUCache(cache_size)
+    seen, errors = {}, []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(names):
+        conn = backend.connect()
+        cursor = conn.cursor()
+        local = []
+        barrier.wait()
+        for name in names:
+            try:
+                user_id = variant(backend, cursor, name, cache)
+                conn.commit()
+                local.append((name, user_id))
+            except backend.Error as e:
+                conn.rollback()
+                with lock:
+                    errors.append(str(e))
+        conn.close()
+        with lock:
+            for name, user_id in local:
+                seen.setdefault(name, set()).add(user_id)
+
+    workers = [threading.Thread(target=worker, args=(names,)) for names in workload]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for w in workers:
+        w.join()
+    return time.perf_counter() - started, errors, seen
+
+
+def check(backend, prefix, seen):
+    """Problemele găsite: nume duplicate în tabel sau fire care au primit id-uri diferite."""
+    conn = backend.connect()
+    try:
+        cursor = conn.cursor()
+        cursor.execute(f"SELECT name, COUNT(*), MIN(user_id) FROM users_login_info "
+                       f"WHERE name LIKE {backend.ph} GROUP BY name", (prefix + "%",))
+        rows = {name: (count, user_id) for name, count, user_id in cursor.fetchall()}
+    finally:
+        conn.close()
+    problems = [f"{name}: {count} rânduri" for name, (count, _) in rows.items() if count > 1]
+    for name, ids in seen.items():
+        if len(ids) > 1 or (name in rows and ids != {rows[name][1]}):
+            problems.append(f"{name}: id-uri {sorted(ids)} (în tabel {rows.get(name, (0, None))[1]})")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=("sqlite", "mysql"), default="sqlite",
+                        help="mysql folosește BACKEND_CONFIG / DB_CONFIG din mysql/db_config copy.py")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--logins", type=int, default=10_000, help="login-uri per fir")
+    parser.add_argument("--names", type=int, default=1000, help="nume distincte (comune tuturor firelor)")
+    parser.add_argument("--cache-size", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if args.dialect == "sqlite":
+        path = os.path.join(tempfile.mkdtemp(), "register_user.db")
+        init_sqlite(path, log=lambda _: None)
+        # timeout mare: firele SQLite se așteaptă pe lock-ul de scriere în loc să eșueze
+        backend = get_backend("sqlite", {"path": path, "timeout": 60, "pragmas": {"journal_mode": "WAL"}})
+    else:
+        from ..mysql.db_config import BACKEND_CONFIG, DB_CONFIG
+        backend = get_backend("mysql", BACKEND_CONFIG.get("mysql", DB_CONFIG))
+
+    rnd = random.Random(args.seed)
+    print(f"{args.dialect}: {args.threads} fire x {args.logins} login-uri, {args.names} nume")
+    print(f"{'variantă':<18}{'login/s':>10}{'erori':>8}{'nume':>8}  verificare")
+    failed = False
+    for i, (label, variant) in enumerate(VARIANTS.items()):
+        # Prefix nou per variantă: fiecare pornește cu toate numele neînregistrate
+        prefix = f"bench_{int(time.time())}_{i}_"
+        workload = [[f"{prefix}{rnd.randrange(args.names)}" for _ in range(args.logins)]
+                    for _ in range(args.threads)]
+        seconds, errors, seen = run(backend, variant, workload, args.threads, args.cache_size)
+        problems = check(backend, prefix, seen)
+        logins = args.threads * args.logins - len(errors)
+        status = "ok" if not problems else f"{len(problems)} probleme, ex. {problems[0]}"
+        print(f"{label:<18}{logins / seconds:>10.0f}{len(errors):>8}{len(seen):>8}  {status}")
+        if errors:
+            print(f"{'':<18}prima eroare: {errors[0][:100]}")
+        # Drumul vechi poate eșua (de aceea a fost înlocuit); upsert-ul trebuie să fie curat
+        if variant is not legacy and (problems or errors):
+            failed = True
+    if failed:
+        raise SystemExit("upsert: duplicate sau erori la înregistrări concurente")
+
+
+if __name__ == "__main__":
+    main()
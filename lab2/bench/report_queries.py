@@ -0,0 +1,163 @@
+"""Benchmark înainte/după pentru interogările rapoartelor DWH.
+
+Înainte: textul SQL construit cu f-string (DATEADD/datetime literal per timestamp) și JOIN
+pe DimTime doar pentru filtrarea pe full_date.
+După: REPORT_SQL din report_queries.py, parametrizat pe intervalul de time_id.
+
+Rulare (din rădăcina repo-ului):
+    python -m lab2.bench.report_queries                 # SQLite în memorie, date sintetice
+    python -m lab2.bench.report_queries --facts 500000 --windows 50
+    python -m lab2.bench.report_queries --mssql         # pe baza configurată în db_config.py
+"""
+import argparse
+import random
+import re
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from ..report_queries import REPORT_SQL, date_to_time_id, time_id_range
+
+# Interogările vechi (înainte de report_queries.py), cu {start}/{end} înlocuite textual
+OLD_SQL = {
+    "top_low_sales": """
+        SELECT FOI.product_id, SUM(FOI.sales_amount) AS TotalSales
+        FROM FactOrderItems FOI
+        JOIN DimTime DT ON FOI.time_id = DT.time_id
+        WHERE DT.full_date >= {start} AND DT.full_date <= {end}
+        GROUP BY FOI.product_id
+        ORDER BY TotalSales DESC;
+    """,
+    "top_10_users_orders": """
+        SELECT TOP 10 FOI.user_id, COUNT(DISTINCT FOI.order_id) AS DistinctOrderCount
+        FROM FactOrderItems FOI
+        JOIN DimTime DT ON FOI.time_id = DT.time_id
+        WHERE DT.full_date >= {start} AND DT.full_date <= {end}
+        GROUP BY FOI.user_id
+        ORDER BY DistinctOrderCount DESC;
+    """,
+    "top_quarter_profit": """
+        SELECT TOP 1 CONCAT(DT.year, '-Q', DT.quarter) AS Quarter,
+               SUM(FOI.sales_amount * FOI.profit_margin) AS TotalProfit
+        FROM FactOrderItems FOI
+        JOIN DimTime DT ON FOI.time_id = DT.time_id
+        WHERE DT.full_date >= {start} AND DT.full_date <= {end}
+        GROUP BY DT.year, DT.quarter
+        ORDER BY TotalProfit DESC;
+    """,
+}
+
+
+def to_sqlite(sql):
+    """Traducere minimă T-SQL -> SQLite pentru interogările de mai sus."""
+    m = re.search(r"SELECT TOP (\d+)", sql)
+    if m:
+        sql = sql.replace(m.group(0), "SELECT").rstrip().rstrip(";") + f" LIMIT {m.group(1)};"
+    sql = re.sub(r"CONCAT\(([^,]+), '([^']*)', ([^)]+)\)", r"\1 || '\2' || \3", sql)
+    return sql
+
+
+def build_sqlite(facts, days, seed, with_index=True):
+    rnd = random.Random(seed)
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE DimTime (time_id INTEGER PRIMARY KEY, full_date TEXT NOT NULL UNIQUE, "
+                 "quarter INTEGER NOT NULL, year INTEGER NOT NULL, is_weekend INTEGER NOT NULL)")
+    conn.execute("CREATE TABLE FactOrderItems (fact_id INTEGER PRIMARY KEY, order_id INTEGER, user_id INTEGER, "
+                 "product_id INTEGER, time_id INTEGER, sales_amount REAL, profit_margin REAL, discount_amount REAL)")
+    first = date.today() - timedelta(days=days)
+    dim = []
+    for i in range(days):
+        d = first + timedelta(days=i)
+        dim.append((date_to_time_id(d), d.isoformat(), (d.month - 1) // 3 + 1, d.year, int(d.weekday() >= 5)))
+    conn.executemany("INSERT INTO DimTime VALUES (?, ?, ?, ?, ?)", dim)
+    time_ids = [row[0] for row in dim]
+    rows = (
+        (i, i // 3, rnd.randint(1, 5000), rnd.randint(1, 200), rnd.choice(time_ids),
+         round(rnd.uniform(5, 500), 2), rnd.uniform(0.05, 0.4), round(rnd.uniform(0, 20), 2))
+        for i in range(1, facts + 1)
+    )
+    conn.executemany("INSERT INTO FactOrderItems VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+    if with_index:
+        conn.execute("CREATE INDEX IX_FactOrderItems_time_id ON FactOrderItems (time_id)")
+    conn.execute("ANALYZE")
+    conn.commit()
+    return conn, first
+
+
+def random_windows(first, days, count, seed):
+    rnd = random.Random(seed)
+    epoch = date(1970, 1, 1)
+    base = (first - epoch).days * 86400
+    windows = []
+    for _ in range(count):
+        a = base + rnd.randint(0, (days - 14) * 86400)
+        b = a + rnd.randint(1, 14) * 86400 + rnd.randint(0, 86399)
+        windows.append((a, b))
+    return windows
+
+
+def run(conn, windows, sqlite_mode):
+    if sqlite_mode:
+        date_expr = lambda ts: f"datetime({ts}, 'unixepoch')"
+        old_filter = lambda sql: sql.replace("DT.full_date >=", "DT.full_date || ' 00:00:00' >=") \
+                                    .replace("DT.full_date <=", "DT.full_date || ' 00:00:00' <=")
+        conv = to_sqlite
+    else:
+        date_expr = lambda ts: f"DATEADD(second, {ts}, '1970-01-01')"
+        old_filter = lambda sql: sql
+        conv = lambda sql: sql
+
+    cursor = conn.cursor()
+    print(f"{'raport':<24}{'înainte (ms)':>14}{'după (ms)':>12}{'speedup':>10}")
+    for name, old_sql in OLD_SQL.items():
+        old_t = new_t = 0.0
+        new_sql = conv(REPORT_SQL[name])
+        for start, end in windows:
+            q = conv(old_filter(old_sql.format(start=date_expr(start), end=date_expr(end))))
+            t0 = time.perf_counter()
+            old_rows = cursor.execute(q).fetchall()
+            old_t += time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            new_rows = cursor.execute(new_sql, time_id_range(start, end)).fetchall()
+            new_t += time.perf_counter() - t0
+
+            # Același rezultat (ordinea poate diferi doar la egalitate de agregat)
+            if sorted(map(tuple, old_rows)) != sorted(map(tuple, new_rows)) and "TOP" not in old_sql:
+                raise AssertionError(f"{name}: rezultate diferite pentru fereastra {start}-{end}")
+        n = len(windows)
+        print(f"{name:<24}{old_t / n * 1000:>14.2f}{new_t / n * 1000:>12.2f}{old_t / max(new_t, 1e-9):>9.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--facts", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--windows", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--mssql", action="store_true", help="rulează pe SQL Server din db_config.py")
+    args = parser.parse_args()
+
+    if args.mssql:
+        import pyodbc
+        from ..db_config import DB_CONFIG
+        conn = pyodbc.connect(
+            f"DRIVER={DB_CONFIG['DRIVER']};SERVER={DB_CONFIG['SERVER']};"
+            f"DATABASE={DB_CONFIG['DATABASE']};UID={DB_CONFIG['UID']};PWD={DB_CONFIG['PWD']}"
+        )
+        cursor = conn.cursor()
+        first_id, days = cursor.execute("SELECT MIN(time_id), COUNT(*) FROM DimTime").fetchone()
+        s = str(first_id)
+        first = date(int(s[:4]), int(s[4:6]), int(s[6:]))
+        windows = random_windows(first, max(days, 15), args.windows, args.seed)
+        run(conn, windows, sqlite_mode=False)
+    else:
+        t0 = time.perf_counter()
+        conn, first = build_sqlite(args.facts, args.days, args.seed)
+        print(f"Date generate: {args.facts} fapte, {args.days} zile ({time.perf_counter() - t0:.1f}s)")
+        windows = random_windows(first, args.days, args.windows, args.seed)
+        run(conn, windows, sqlite_mode=True)
+
+
+if __name__ == "__main__":
+    main()
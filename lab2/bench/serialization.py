@@ -0,0 +1,83 @@
+"""Benchmark pentru serializarea rapoartelor: dict per rând + json vs tupluri + orjson.
+
+Simulează rezultatul unui raport mare (id, nume, sume DECIMAL, procente) și măsoară timpul
+de CPU (time.process_time) pentru drumul vechi - dict(zip()) pe fiecare rând, apoi
+jsonable_encoder + json.dumps - și pentru drumurile din results.py (Rows + orjson, ca
+listă de obiecte sau ?shape=columnar). Se verifică și că JSON-ul decodat este identic.
+
+    python -m lab2.bench.serialization
+    python -m lab2.bench.serialization --rows 500000 --repeat 5
+"""
+import argparse
+import json
+import random
+import time
+from decimal import Decimal
+
+from .. import results
+from ..results import Rows
+
+COLUMNS = ("product_id", "ProductName", "TotalSales", "TotalProfit", "AvgDiscount", "OrderCount")
+
+
+def make_rows(n, seed):
+    rnd = random.Random(seed)
+    return [
+        (i, f"Produs {i}", Decimal(rnd.randint(0, 10**8)) / 100, Decimal(rnd.randint(0, 10**7)) / 100,
+         rnd.random() * 30, rnd.randint(1, 5000))
+        for i in range(n)
+    ]
+
+
+def legacy(data):
+    # Drumul vechi: dict per rând, apoi encoder-ul FastAPI (Decimal -> float) și json.dumps
+    rows = [dict(zip(COLUMNS, row)) for row in data]
+    encoded = [{k: float(v) if isinstance(v, Decimal) else v for k, v in row.items()} for row in rows]
+    return json.dumps(encoded, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_rows(data):
+    return results.dumps(Rows(COLUMNS, data).dicts())
+
+
+def fast_columnar(data):
+    return results.dumps(Rows(COLUMNS, data).columnar())
+
+
+def measure(func, data, repeat):
+    best = float("inf")
+    body = b""
+    for _ in range(repeat):
+        t0 = time.process_time()
+        body = func(data)
+        best = min(best, time.process_time() - t0)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    if results.orjson is None:
+        print("orjson nu este instalat: results.py folosește json (pip install orjson)")
+    data = make_rows(args.rows, args.seed)
+    base, expected = measure(legacy, data, args.repeat)
+    expected = json.loads(expected)
+
+    print(f"{'variantă':<28}{'CPU (ms)':>10}{'KB':>10}{'speedup':>10}")
+    print(f"{'dict + json':<28}{base * 1000:>10.1f}{len(legacy(data)) / 1024:>10.0f}{1.0:>9.1f}x")
+    for name, func in (("Rows + orjson (rows)", fast_rows), ("Rows + orjson (columnar)", fast_columnar)):
+        cpu, body = measure(func, data, args.repeat)
+        decoded = json.loads(body)
+        if "columns" in decoded:
+            decoded = [dict(zip(decoded["columns"], row)) for row in decoded["data"]]
+        if decoded != expected:
+            raise AssertionError(f"{name}: JSON diferit de varianta veche")
+        print(f"{name:<28}{cpu * 1000:>10.1f}{len(body) / 1024:>10.0f}{base / max(cpu, 1e-9):>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
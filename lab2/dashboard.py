@@ -0,0 +1,74 @@
+from .dimtime import resolver
+
+# Dashboard-ul DWH: cele cinci rapoarte calculate în memorie din agregatele parțiale
+# aduse de o singură interogare (REPORT_SQL["dashboard"] / AGG_REPORT_SQL["dashboard"]).
+# Fiecare rând are forma (grp, key_id, sales_sum, profit_sum, ratio_sum, ratio_count, order_count):
+#   grp = 'P' -> key_id = product_id, 'U' -> user_id, 'D' -> time_id (YYYYMMDD)
+
+
+def _quarter(time_id):
+    year, quarter, _ = resolver().attributes(time_id)
+    return f"{year}-Q{quarter}"
+
+
+def _is_weekend(time_id):
+    # Aceeași regulă ca DimTime.is_weekend (sâmbătă / duminică), fără JOIN pe DimTime
+    return resolver().attributes(time_id)[2] == 1
+
+
+def _add(totals, key, value):
+    if value is not None:
+        totals[key] = totals[key] + value if key in totals else value
+
+
+def _sorted_desc(totals, limit=None):
+    items = sorted(totals.items(), key=lambda kv: kv[1], reverse=True)
+    return items[:limit] if limit else items
+
+
+def summarize(rows):
+    """Agregatele parțiale -> rezultatele celor cinci rapoarte (cu id-uri, fără nume).
+
+    Returnează un dicționar cu cheile: sales (product_id, TotalSales) desc, top_quarter
+    (Quarter, TotalProfit) sau None, top_users (user_id, DistinctOrderCount) primii 10,
+    discount [(Perioada, Procent_Mediu_Discount)], classification (product_id, TotalSales, Classification).
+    """
+    sales, orders, quarters, ratios = {}, {}, {}, {}
+    for grp, key, sales_sum, profit_sum, ratio_sum, ratio_count, order_count in rows:
+        if grp == "P":
+            _add(sales, key, sales_sum)
+        elif grp == "U":
+            _add(orders, key, order_count)
+        else:
+            _add(quarters, _quarter(key), profit_sum)
+            if ratio_count:
+                weekend = _is_weekend(key)
+                s, c = ratios.get(weekend, (0, 0))
+                ratios[weekend] = (s + (ratio_sum or 0), c + ratio_count)
+
+    by_sales = _sorted_desc(sales)
+    top_quarter = _sorted_desc(quarters, 1)
+
+    classification = []
+    if by_sales:
+        avg = sum(v for _, v in by_sales) / len(by_sales)
+        top_threshold = avg + (by_sales[0][1] - avg) / 2
+        for product_id, total in by_sales:
+            if total >= top_threshold:
+                label = "Top Seller"
+            elif total >= avg:
+                label = "Average Seller"
+            else:
+                label = "Low Seller"
+            classification.append({"product_id": product_id, "TotalSales": total, "Classification": label})
+
+    return {
+        "sales": [{"product_id": k, "TotalSales": v} for k, v in by_sales],
+        "top_quarter": {"Quarter": top_quarter[0][0], "TotalProfit": top_quarter[0][1]} if top_quarter else None,
+        "top_users": [{"user_id": k, "DistinctOrderCount": v} for k, v in _sorted_desc(orders, 10)],
+        "discount": [
+            {"Perioada": "Weekend" if weekend else "Zi de Saptamana", "Procent_Mediu_Discount": s / c * 100}
+            for weekend, (s, c) in sorted(ratios.items(), reverse=True)
+        ],
+        "classification": classification,
+    }
@@ -0,0 +1,380 @@
+"""Generator de date sintetice pentru schema stea (DimTime, DimLocation, DimStatus, DimProduct,
+DimUser, DimOrder, FactOrderItems), pentru teste de capacitate.
+
+--scale 1 = 100.000 rânduri în FactOrderItems (scale 1000 = 100M). Datele sunt deterministe:
+același --seed, --scale, --end-date și --chunk-size produc aceleași rânduri, indiferent de --workers.
+
+Distribuții:
+- utilizatorii și produsele urmează o lege Zipf (câțiva clienți / produse fac mare parte din vânzări);
+- zilele au sezonalitate: weekend-ul are mai multe comenzi, iar decembrie este vârful anului;
+- o comandă are 1-4 rânduri de fapte, toate în aceeași zi (presupunerea din aggregates.py).
+
+Faptele sunt generate vectorizat cu NumPy pe bucăți de --chunk-size rânduri, în procese separate.
+Pe MySQL / SQL Server fiecare proces își încarcă bucățile pe conexiunea proprie (INSERT multi-rând,
+respectiv fast_executemany); SQLite are un singur scriitor, deci procesele doar generează.
+
+    python -m lab2.datagen --dialect sqlite --db lab2/dwh.db --scale 1
+    python -m lab2.datagen --dialect mssql --scale 100 --workers 8 --replace
+    python -m lab2.datagen --dialect mysql --scale 10 --seed 7 --end-date 2025-12-31
+
+După încărcare: python -m lab2.migrations --scope dwh (indexuri) și python -m lab2.aggregates --rebuild.
+"""
+import argparse
+import functools
+import json
+import math
+import multiprocessing
+import time
+import uuid
+from datetime import date, timedelta
+
+import numpy as np
+
+from .backends import BACKENDS, get_backend
+from .migrations import connect, table_exists
+from .dimtime import calendar_columns, calendar_rows
+from .star_schema import COLUMNS, TABLES
+
+FACTS_PER_SCALE = 100_000
+USERS_PER_SCALE = 2_000
+ZIPF_EXPONENT = 1.1
+WEEKEND_FACTOR = 1.6
+# Amplitudinea sezonalității anuale (vârf în jurul zilei 350 = mijlocul lui decembrie)
+SEASON_AMPLITUDE = 0.3
+METADATA_SHARE = 0.2
+
+# Fluxurile RNG: dimensiunile și fiecare bucată de fapte au semințe derivate independente
+_DIM_STREAM, _FACT_STREAM = 0, 1
+
+STATUSES = [(1, "pending", 0), (2, "completed", 1), (3, "cancelled", 1)]
+STATUS_WEIGHTS = [0.05, 0.9, 0.05]
+COUNTRIES = {
+    "Romania": ["Bucuresti", "Cluj", "Iasi", "Timis", "Constanta", "Brasov", "Sibiu", "Bihor"],
+    "Moldova": ["Chisinau", "Balti", "Cahul", "Orhei"],
+    "Germany": ["Bayern", "Berlin", "Hessen", "Sachsen"],
+    "Italy": ["Lazio", "Lombardia", "Veneto"],
+    "France": ["Ile-de-France", "Provence", "Bretagne"],
+    "Spain": ["Madrid", "Catalunya", "Valencia"],
+    "United Kingdom": ["London", "Scotland", "Wales"],
+    "USA": ["California", "New York", "Texas", "Florida"],
+}
+SERVICES = ["Caricature", "Voiceover", "Song", "Portrait", "Logo", "Jingle", "Animation", "Translation"]
+BROWSERS = ["Chrome", "Firefox", "Safari", "Edge"]
+SYSTEMS = ["Windows", "macOS", "Android", "iOS", "Linux"]
+SOURCES = ["Direct", "Google", "Facebook", "Instagram", "Newsletter"]
+# FactOrderItems.metadata, în formatul citit de lab3/rezultate_numerice.py
+METADATA_VALUES = [
+    json.dumps({"browser": b, "os": o, "source": s}) for b in BROWSERS for o in SYSTEMS for s in SOURCES
+]
+
+
+def plan(scale, days, end_date):
+    """Dimensiunile setului de date pentru un factor de scală."""
+    facts = int(FACTS_PER_SCALE * scale)
+    return {
+        "facts": facts,
+        "users": max(100, int(USERS_PER_SCALE * scale)),
+        "products": max(len(SERVICES), int(40 * math.sqrt(scale))),
+        "days": days,
+        "first_day": end_date - timedelta(days=days - 1),
+    }
+
+
+def _rng(seed, stream, index=0):
+    return np.random.default_rng([seed, stream, index])
+
+
+@functools.lru_cache(maxsize=4)
+def _zipf_table(n, seed, salt):
+    """(CDF pe ranguri, permutare rang -> id): id-urile populare sunt împrăștiate, nu 1, 2, 3..."""
+    weights = 1.0 / np.arange(1, n + 1, dtype=np.float64) ** ZIPF_EXPONENT
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    ids = _rng(seed, _DIM_STREAM, salt).permutation(n) + 1
+    return cdf, ids
+
+
+def zipf_ids(rng, n, size, seed, salt):
+    cdf, ids = _zipf_table(n, seed, salt)
+    return ids[np.minimum(np.searchsorted(cdf, rng.random(size), side="right"), n - 1)]
+
+
+@functools.lru_cache(maxsize=4)
+def _day_table(first_day, days):
+    """Ponderi cumulative pe zile (weekend + sezonalitate anuală), time_id și începutul zilei (UTC)."""
+    offset = (first_day - date(1970, 1, 1)).days
+    day_numbers = np.arange(offset, offset + days, dtype=np.int64)
+    dates = day_numbers.astype("datetime64[D]")
+    weekday = (day_numbers + 3) % 7  # 1970-01-01 a fost joi; 0 = luni
+    day_of_year = (dates - dates.astype("datetime64[Y]")).astype(np.int64)
+    weights = np.where(weekday >= 5, WEEKEND_FACTOR, 1.0)
+    weights = weights * (1.0 + SEASON_AMPLITUDE * np.cos(2 * np.pi * (day_of_year - 350) / 365.25))
+    cdf = np.cumsum(weights)
+    cdf /= cdf[-1]
+    time_ids = np.array(calendar_columns(first_day, first_day + timedelta(days=days - 1))[0], dtype=np.int64)
+    return cdf, time_ids, day_numbers * 86400
+
+
+# ==========================================
+# DIMENSIUNI
+# ==========================================
+
+def dim_time(spec):
+    return calendar_rows(spec["first_day"], spec["first_day"] + timedelta(days=spec["days"] - 1))
+
+
+def dim_location():
+    return [
+        (i, country, region)
+        for i, (country, region) in enumerate(((c, r) for c, regions in COUNTRIES.items() for r in regions), 1)
+    ]
+
+
+def dim_product(spec, seed):
+    rng = _rng(seed, _DIM_STREAM, 1)
+    n = spec["products"]
+    prices = np.round(rng.lognormal(mean=3.8, sigma=0.6, size=n), 2) + 4.99
+    return [
+        (i + 1, SERVICES[i] if i < len(SERVICES) else f"{SERVICES[i % len(SERVICES)]} #{i // len(SERVICES) + 1}",
+         round(float(prices[i]), 2))
+        for i in range(n)
+    ]
+
+
+def dim_user_locations(spec, seed, locations):
+    """location_id pentru fiecare utilizator (index = user_id - 1); regiunile au și ele o distribuție Zipf."""
+    rng = _rng(seed, _DIM_STREAM, 2)
+    return zipf_ids(rng, locations, spec["users"], seed, 3)
+
+
+def dim_user_rows(spec, seed, user_locations, lo, hi):
+    rng = _rng(seed, _DIM_STREAM, 4)
+    first_ts = (spec["first_day"] - date(1970, 1, 1)).days * 86400
+    created = first_ts - rng.integers(0, 365 * 86400, size=spec["users"])
+    return [
+        (user_id, f"user{user_id}", int(user_locations[user_id - 1]), int(created[user_id - 1]))
+        for user_id in range(lo + 1, hi + 1)
+    ]
+
+
+# ==========================================
+# FAPTE + COMENZI (o bucată = chunk_size fapte)
+# ==========================================
+
+def generate_chunk(spec, index):
+    """Comenzile și faptele bucății `index`: (rânduri DimOrder, rânduri FactOrderItems).
+
+    fact_id acoperă [index * chunk_size + 1, ...]; order_id folosește același interval
+    (o comandă are cel puțin un rând), deci id-urile sunt unice fără coordonare între procese.
+    """
+    seed, chunk_size = spec["seed"], spec["chunk_size"]
+    lo = index * chunk_size
+    n = min(chunk_size, spec["facts"] - lo)
+    rng = _rng(seed, _FACT_STREAM, index)
+
+    # Rânduri per comandă: 1-4, trunchiat la n
+    sizes = rng.integers(1, 5, size=n)
+    ends = np.cumsum(sizes)
+    k = int(np.searchsorted(ends, n)) + 1
+    sizes = sizes[:k]
+    sizes[-1] -= int(ends[k - 1]) - n
+    order_ids = lo + 1 + np.arange(k)
+
+    users = zipf_ids(rng, spec["users"], k, seed, 5)
+    day_cdf, time_ids, day_starts = _day_table(spec["first_day"], spec["days"])
+    day = np.minimum(np.searchsorted(day_cdf, rng.random(k), side="right"), spec["days"] - 1)
+    created_at = day_starts[day] + rng.integers(0, 86400, size=k)
+    order_time = time_ids[day]
+    status = rng.choice(len(STATUSES), size=k, p=STATUS_WEIGHTS) + 1
+    locations = spec["user_locations"][users - 1]
+    public_ids = rng.bytes(16 * k)
+
+    # Atributele comenzii repetate pe rândurile ei
+    fact_order = np.repeat(order_ids, sizes)
+    fact_user = np.repeat(users, sizes)
+    fact_time = np.repeat(order_time, sizes)
+    fact_status = np.repeat(status, sizes)
+    fact_location = np.repeat(locations, sizes)
+
+    products = zipf_ids(rng, spec["products"], n, seed, 6)
+    prices = spec["prices"][products - 1]
+    discounted = rng.random(n) < 0.3
+    discount = np.where(discounted, np.round(prices * rng.uniform(0.05, 0.25, size=n), 2), 0.0)
+    sales = np.round(prices - discount, 2)
+    margin = np.round(rng.uniform(0.05, 0.4, size=n), 4)
+    with_meta = rng.random(n) < METADATA_SHARE
+    meta_choice = rng.integers(0, len(METADATA_VALUES), size=n)
+    metadata = [METADATA_VALUES[m] if w else None for m, w in zip(meta_choice.tolist(), with_meta.tolist())]
+
+    facts = list(zip(
+        range(lo + 1, lo + n + 1), fact_order.tolist(), fact_user.tolist(), products.tolist(), fact_time.tolist(),
+        fact_status.tolist(), fact_location.tolist(), sales.tolist(), margin.tolist(),
+        discount.tolist(), metadata,
+    ))
+
+    product_lists = np.split(products, np.cumsum(sizes)[:-1])
+    status_names = [name for _, name, _ in STATUSES]
+    orders = [
+        (oid, uid, json.dumps(items.tolist()), status_names[st - 1], st,
+         str(uuid.UUID(bytes=public_ids[16 * i:16 * i + 16], version=4)), ts, tid)
+        for i, (oid, uid, items, st, ts, tid) in enumerate(zip(
+            order_ids.tolist(), users.tolist(), product_lists, status.tolist(), created_at.tolist(),
+            order_time.tolist(),
+        ))
+    ]
+    return orders, facts
+
+
+# ==========================================
+# ÎNCĂRCARE
+# ==========================================
+
+def prepare_cursor(conn, dialect):
+    """Cursorul de încărcare: verificări dezactivate pe MySQL, fără fsync pe SQLite."""
+    cursor = conn.cursor()
+    if dialect == "mysql":
+        cursor.execute("SET unique_checks = 0, foreign_key_checks = 0")
+    elif dialect == "sqlite":
+        cursor.execute("PRAGMA synchronous = OFF")
+        cursor.execute("PRAGMA journal_mode = MEMORY")
+    return cursor
+
+
+def load(cursor, dialect, table, rows, batch=10_000):
+    backend = get_backend(dialect)
+    # Pe SQL Server, tabelele create de DDL-ul aplicației au IDENTITY: id-urile generate se păstrează
+    with backend.explicit_keys(cursor, table):
+        # Calea rapidă a driverului: fast_executemany / VALUES pe mai multe rânduri / executemany
+        backend.bulk_insert(cursor, table, COLUMNS[table], rows, chunk_size=batch)
+    return len(rows)
+
+
+# Starea procesului de lucru (setată de _init_worker)
+_WORKER = {}
+
+
+def _init_worker(spec):
+    _WORKER["spec"] = spec
+    if spec["dialect"] != "sqlite":
+        conn = connect(spec["dialect"], spec["db"])
+        _WORKER["conn"] = conn
+        _WORKER["cursor"] = prepare_cursor(conn, spec["dialect"])
+
+
+def _run_chunk(index):
+    """Generează bucata; pe MySQL / SQL Server o și încarcă (o tranzacție per bucată)."""
+    spec = _WORKER["spec"]
+    orders, facts = generate_chunk(spec, index)
+    if spec["dialect"] == "sqlite":
+        return orders, facts
+    cursor = _WORKER["cursor"]
+    load(cursor, spec["dialect"], "DimOrder", orders)
+    load(cursor, spec["dialect"], "FactOrderItems", facts)
+    _WORKER["conn"].commit()
+    return len(orders), len(facts)
+
+
+def existing_rows(cursor, dialect):
+    """Tabelele generate care au deja date."""
+    busy = []
+    for table, columns in COLUMNS.items():
+        if table_exists(cursor, dialect, table):
+            cursor.execute(f"SELECT MAX({columns[0]}) FROM {table}")
+            row = cursor.fetchone()
+            if (next(iter(row.values())) if isinstance(row, dict) else row[0]) is not None:
+                busy.append(table)
+    return busy
+
+
+def generate(dialect, db_path=None, scale=1.0, seed=42, days=730, end_date=None, workers=None,
+             chunk_size=100_000, replace=False, log=print):
+    """Creează tabelele lipsă și încarcă setul de date; întoarce {tabelă: rânduri}."""
+    spec = plan(scale, days, end_date or date.today())
+    spec.update(dialect=dialect, db=db_path, seed=seed, chunk_size=chunk_size)
+    workers = workers or multiprocessing.cpu_count()
+    log(f"Plan: {spec['facts']} fapte, {spec['users']} utilizatori, {spec['products']} produse, "
+        f"{days} zile până la {spec['first_day'] + timedelta(days=days - 1)}; {workers} procese")
+
+    conn = connect(dialect, db_path)
+    cursor = prepare_cursor(conn, dialect)
+    busy = existing_rows(cursor, dialect)
+    if busy and not replace:
+        conn.close()
+        raise SystemExit(f"Tabelele {', '.join(busy)} au deja date: folosiți --replace pentru a le goli")
+    for table in reversed(list(COLUMNS)):
+        if table in busy:
+            cursor.execute(f"DELETE FROM {table}" if dialect == "sqlite" else f"TRUNCATE TABLE {table}")
+        TABLES[table].apply(cursor, dialect)
+    conn.commit()
+
+    counts = {}
+
+    def report(table, rows, started):
+        elapsed = time.perf_counter() - started
+        counts[table] = rows
+        log(f"  {table}: {rows} rânduri în {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rânduri/s)")
+
+    t0 = time.perf_counter()
+    locations = dim_location()
+    products = dim_product(spec, seed)
+    spec["prices"] = np.array([p[2] for p in products])
+    spec["user_locations"] = dim_user_locations(spec, seed, len(locations))
+    for table, rows in (("DimTime", dim_time(spec)), ("DimLocation", locations),
+                        ("DimStatus", STATUSES), ("DimProduct", products)):
+        started = time.perf_counter()
+        report(table, load(cursor, dialect, table, rows), started)
+    started = time.perf_counter()
+    users = 0
+    for lo in range(0, spec["users"], chunk_size):
+        users += load(cursor, dialect, "DimUser",
+                      dim_user_rows(spec, seed, spec["user_locations"], lo, min(lo + chunk_size, spec["users"])))
+    report("DimUser", users, started)
+    conn.commit()
+
+    chunks = math.ceil(spec["facts"] / chunk_size)
+    started = time.perf_counter()
+    orders = facts = 0
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(spec,)) as pool:
+        for done, result in enumerate(pool.imap_unordered(_run_chunk, range(chunks)), 1):
+            if dialect == "sqlite":
+                order_rows, fact_rows = result
+                load(cursor, dialect, "DimOrder", order_rows)
+                load(cursor, dialect, "FactOrderItems", fact_rows)
+                conn.commit()
+                result = len(order_rows), len(fact_rows)
+            orders += result[0]
+            facts += result[1]
+            if done % max(1, chunks // 10) == 0 or done == chunks:
+                elapsed = time.perf_counter() - started
+                log(f"  bucata {done}/{chunks}: {facts} fapte ({facts / max(elapsed, 1e-9):,.0f} fapte/s)")
+    report("DimOrder", orders, started)
+    report("FactOrderItems", facts, started)
+    conn.close()
+
+    total = sum(counts.values())
+    elapsed = time.perf_counter() - t0
+    log(f"Total: {total} rânduri în {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rânduri/s)")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=sorted(BACKENDS), required=True)
+    parser.add_argument("--db", help="fișierul SQLite (obligatoriu pentru --dialect sqlite)")
+    parser.add_argument("--scale", type=float, default=1.0, help="1 = 100.000 fapte")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--end-date", type=date.fromisoformat, help="ultima zi (YYYY-MM-DD, implicit azi)")
+    parser.add_argument("--workers", type=int, help="procese de generare (implicit numărul de CPU-uri)")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--replace", action="store_true", help="golește tabelele generate dacă au date")
+    args = parser.parse_args()
+    if args.dialect == "sqlite" and not args.db:
+        # Implicitul din migrations.connect este baza OLTP din lab1, nu un depozit de date
+        parser.error("--db este obligatoriu pentru SQLite")
+    generate(args.dialect, args.db, args.scale, args.seed, args.days, args.end_date, args.workers,
+             args.chunk_size, args.replace)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Numărarea rândurilor pe zile calendaristice, calculată în SQL, într-un fus orar explicit.
+
+Ziua locală a unui timestamp UNIX este (ts + offset(ts)) / 86400, unde offset este decalajul
+față de UTC în acel moment. Pe intervalul cerut, decalajul este constant pe segmente (se schimbă
+doar la trecerile DST), deci expresia SQL este un CASE pe granițele segmentelor:
+
+    (created_at + CASE WHEN created_at < t1 THEN o0 WHEN created_at < t2 THEN o1 ELSE o2 END) / 86400
+
+Baza de date întoarce doar (zi, număr) - câteva zeci de rânduri în loc de toate timestamp-urile.
+Când numărarea trebuie făcută pe client (ex. DAY_BUCKETS_CONFIG["mode"] = "client"), aceleași
+segmente sunt aplicate vectorizat cu NumPy (datetime64), sau în Python dacă NumPy lipsește.
+"""
+import bisect
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from fastapi import HTTPException
+
+from .backends import BACKENDS
+
+_EPOCH = date(1970, 1, 1)
+
+# Pasul de eșantionare pentru găsirea trecerilor DST (apoi căutare binară la secundă)
+_PROBE_STEP = 6 * 3600
+
+
+def resolve_tz(name):
+    """Numele IANA (ex. "Europe/Bucharest") -> ZoneInfo; None = fusul orar local al serverului."""
+    if not name:
+        return None
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise HTTPException(status_code=400, detail=f"Fus orar necunoscut: {name}")
+
+
+def utc_offset(ts, tz):
+    if tz is None:
+        return time.localtime(ts).tm_gmtoff
+    return int(datetime.fromtimestamp(ts, tz).utcoffset().total_seconds())
+
+
+def day_of(ts, tz):
+    """Ziua locală a timestamp-ului, ca "YYYY-MM-DD" (identic cu datetime.fromtimestamp(ts).strftime)."""
+    return datetime.fromtimestamp(ts, tz).strftime("%Y-%m-%d")
+
+
+def day_string(day_number):
+    return (_EPOCH + timedelta(days=day_number)).isoformat()
+
+
+def offset_segments(start, end, tz):
+    """Segmentele cu decalaj constant din [start, end]: (granițe, decalaje), len(decalaje) = len(granițe) + 1.
+
+    Decalajul decalaje[i] se aplică pentru ts < granițe[i] (și după granițele anterioare).
+    """
+    bounds, offsets = [], [utc_offset(start, tz)]
+    prev_ts, prev_off = start, offsets[0]
+    ts = start
+    while ts < end:
+        ts = min(ts + _PROBE_STEP, end)
+        off = utc_offset(ts, tz)
+        if off != prev_off:
+            # Prima secundă cu noul decalaj, între prev_ts și ts
+            lo, hi = prev_ts, ts
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if utc_offset(mid, tz) == prev_off:
+                    lo = mid
+                else:
+                    hi = mid
+            bounds.append(hi)
+            offsets.append(off)
+        prev_ts, prev_off = ts, off
+    return bounds, offsets
+
+
+def bucket_sql(dialect, table, column, bounds):
+    """SELECT zi, număr pentru `table` filtrat pe [?, ?]; parametrii: start, end, apoi segmentele."""
+    backend = BACKENDS[dialect]
+    ph = backend.ph
+    if bounds:
+        whens = " ".join(f"WHEN {column} < {ph} THEN {ph}" for _ in bounds)
+        offset_expr = f"CASE {whens} ELSE {ph} END"
+    else:
+        offset_expr = ph
+    # Împărțirea întreagă a backend-ului (timestamp-urile sunt pozitive, trunchierea = floor)
+    day_expr = backend.int_div(f"{column} + {offset_expr}", 86400)
+    # Tabelă derivată: SQL Server nu acceptă parametri în expresia din GROUP BY
+    return f"""
+        SELECT day_number, COUNT(*) AS cnt
+        FROM (
+            SELECT {day_expr} AS day_number
+            FROM {table}
+            WHERE {column} >= {ph} AND {column} <= {ph}
+        ) buckets
+        GROUP BY day_number
+        ORDER BY day_number
+    """
+
+
+def _segment_params(bounds, offsets):
+    params = []
+    for bound, off in zip(bounds, offsets):
+        params += [bound, off]
+    params.append(offsets[-1])
+    return params
+
+
+def count_timestamps(timestamps, bounds, offsets):
+    """Numărare pe client: {"YYYY-MM-DD": n}, ordonat crescător."""
+    try:
+        import numpy as np
+    except ImportError:
+        counts = {}
+        for ts in timestamps:
+            day = (ts + offsets[bisect.bisect_right(bounds, ts)]) // 86400
+            counts[day] = counts.get(day, 0) + 1
+        return {day_string(d): counts[d] for d in sorted(counts)}
+
+    ts = np.asarray(timestamps, dtype=np.int64)
+    if ts.size == 0:
+        return {}
+    local = ts + np.asarray(offsets, dtype=np.int64)[np.searchsorted(np.asarray(bounds, dtype=np.int64), ts, side="right")]
+    days, counts = np.unique(local.astype("datetime64[s]").astype("datetime64[D]"), return_counts=True)
+    return dict(zip(np.datetime_as_string(days, unit="D").tolist(), counts.tolist()))
+
+
+def count_by_day(cursor, dialect, table, column, start, end, tz=None, mode="sql"):
+    """Numărul de rânduri din `table` pe zile locale (în `tz`) pentru column în [start, end].
+
+    Întoarce {"YYYY-MM-DD": n} doar pentru zilele cu rânduri, ordonat crescător.
+    """
+    bounds, offsets = offset_segments(start, end, tz)
+    if mode == "client":
+        ph = BACKENDS[dialect].ph
+        cursor.execute(f"SELECT {column} FROM {table} WHERE {column} >= {ph} AND {column} <= {ph}", (start, end))
+        rows = cursor.fetchall()
+        return count_timestamps([r[column] if isinstance(r, dict) else r[0] for r in rows], bounds, offsets)
+
+    params = _segment_params(bounds, offsets) + [start, end]
+    cursor.execute(bucket_sql(dialect, table, column, bounds), params)
+    result = {}
+    for row in cursor.fetchall():
+        day_number, cnt = (row["day_number"], row["cnt"]) if isinstance(row, dict) else (row[0], row[1])
+        result[day_string(int(day_number))] = cnt
+    return result
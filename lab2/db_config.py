@@ -1,3 +1,8 @@
+import os
+
+# Directorul pachetului lab2: fișierele generate (loguri, rezultate) nu depind de directorul curent
+LAB2_DIR = os.path.dirname(os.path.abspath(__file__))
+
 
 DB_CONFIG = {
     "DRIVER": "{ODBC Driver 17 for SQL Server}", 
@@ -6,3 +11,54 @@ DB_CONFIG = {
     "UID": "victor", 
     "PWD": "victor",
 }
+
+# Configurare pool de conexiuni (vezi db_pool.py)
+POOL_CONFIG = {
+    "min_size": 2,          # conexiuni deschise la prima utilizare
+    "max_size": 12,         # >= report_workers + oltp_workers + max_streams (+ refresh_workers ale ReportCache fără executor)
+    "timeout": 5.0,         # secunde de așteptare pentru o conexiune liberă
+    "max_age": 1800.0,      # secunde după care o conexiune este reciclată
+    "validate_idle": 5.0,   # ping la împrumut dacă a stat liberă mai mult de atât
+}
+
+# Executoare DB (vezi db_executor.py). Fiecare thread ține cel mult o conexiune; api.py refuză
+# pornirea dacă report_workers + oltp_workers + EXPORT_CONFIG["max_streams"] (+ thread-urile proprii
+# ale ReportCache) > POOL_CONFIG["max_size"]; job-urile din REPORT_JOBS_CONFIG și recalculările
+# cache-ului de rapoarte rulează pe thread-urile report_workers
+EXECUTOR_CONFIG = {
+    "report_workers": 4,    # rapoarte DWH și statistici pe intervale
+    "oltp_workers": 6,      # CRUD și citiri punctuale
+    "max_queue": 100,       # cereri în așteptare per executor înainte de 503
+}
+
+# Produsele comenzilor normalizate (vezi order_items.py); read_mode: json -> dual -> table
+ORDER_ITEMS_CONFIG = {
+    "read_mode": "json",
+}
+
+# Statistici pe zile (vezi day_buckets.py): "sql" = GROUP BY pe server, "client" = NumPy
+DAY_BUCKETS_CONFIG = {
+    "mode": "sql",
+}
+
+# Jurnalul interogărilor lente (vezi slow_queries.py); path = None dezactivează fișierul JSONL.
+# Căile sunt relative la lab2/, nu la directorul din care pornește serverul
+SLOW_QUERY_CONFIG = {
+    "threshold_ms": 500,
+    "path": os.path.join(LAB2_DIR, "logs", "slow_queries.jsonl"),
+    "max_bytes": 10 * 1024 * 1024,  # rotire la 10 MB
+    "backups": 5,
+}
+
+# Rapoarte rulate ca job-uri în fundal (vezi report_jobs.py); rezultatele stau pe disc ttl secunde
+REPORT_JOBS_CONFIG = {
+    "directory": os.path.join(LAB2_DIR, "report_jobs"),
+    "workers": 2,           # job-uri rulate simultan, din thread-urile report_workers
+    "max_pending": 20,      # job-uri neterminate înainte de 503
+    "ttl": 3600.0,
+}
+
+# Exporturi streaming (vezi streaming.py); fiecare export activ ține o conexiune cât se descarcă
+EXPORT_CONFIG = {
+    "max_streams": 2,       # exporturi simultane înainte de 503
+}
@@ -0,0 +1,112 @@
+import asyncio
+import contextvars
+import functools
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+
+class DBExecutor:
+    """Executor dedicat pentru apelurile blocante la baza de date (pyodbc / pymysql).
+
+    Fiecare clasă de trafic (rapoarte, OLTP) are propriul executor, deci propria limită de
+    concurență: rapoartele lente nu pot ocupa thread-urile căilor ieftine. Dacă sunt deja
+    `max_queue` apeluri în așteptare, cererea nouă este respinsă imediat cu 503.
+    """
+
+    def __init__(self, name, max_workers, max_queue=100):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"db-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._running = 0
+        self._counters = {"submitted": 0, "rejected": 0}
+
+    def _call(self, ctx, func, args, kwargs):
+        with self._lock:
+            self._running += 1
+        try:
+            # Contextul cererii (contextvars) este propagat în thread-ul executorului
+            return ctx.run(func, *args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._pending -= 1
+
+    async def _submit(self, func, args, kwargs, bounded):
+        with self._lock:
+            if bounded and self._pending >= self.max_workers + self.max_queue:
+                self._counters["rejected"] += 1
+                raise HTTPException(status_code=503, detail=f"Prea multe cereri în coada '{self.name}'.")
+            self._pending += 1
+            self._counters["submitted"] += 1
+        loop = asyncio.get_running_loop()
+        ctx = contextvars.copy_context()
+        return await loop.run_in_executor(self._executor, self._call, ctx, func, args, kwargs)
+
+    async def run(self, func, *args, **kwargs):
+        return await self._submit(func, args, kwargs, bounded=True)
+
+    async def run_always(self, func, *args, **kwargs):
+        """Ca run(), dar fără limita de coadă (ex. returnarea conexiunii în pool)."""
+        return await self._submit(func, args, kwargs, bounded=False)
+
+    def submit_nowait(self, func, *args, **kwargs):
+        """Trimite un apel fără a-l aștepta (ex. curățenie după o cerere anulată)."""
+        with self._lock:
+            self._pending += 1
+            self._counters["submitted"] += 1
+        self._executor.submit(self._call, contextvars.copy_context(), func, args, kwargs)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                **self._counters,
+            }
+
+
+def offload(executor, get_db=None):
+    """Decorator: transformă o rută sincronă într-una async care rulează pe `executor`.
+
+    Cu `get_db`, ruta primește parametrul `conn`: conexiunea este împrumutată, folosită și
+    returnată în pool în același apel pe executor. Un apel care ține o conexiune nu mai
+    așteaptă niciodată în coada executorului (altfel, la trafic mare, toate thread-urile pot
+    aștepta în db_pool.acquire() conexiuni ținute de rute blocate în coadă în spatele lor).
+
+    Semnătura originală este păstrată (functools.wraps), fără `conn`, deci FastAPI vede
+    doar parametrii cererii.
+    """
+    def decorator(func):
+        if get_db is None:
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                return await executor.run(func, *args, **kwargs)
+            return wrapper
+
+        def call(*args, **kwargs):
+            conn = get_db()
+            try:
+                return func(*args, conn=conn, **kwargs)
+            finally:
+                conn.close()
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            return await executor.run(call, *args, **kwargs)
+
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(
+            parameters=[p for p in signature.parameters.values() if p.name != "conn"])
+        return wrapper
+    return decorator
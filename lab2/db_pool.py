@@ -0,0 +1,257 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolTimeout(Exception):
+    """Nu s-a putut obține o conexiune din pool în timpul permis."""
+
+
+def check_pool_size(max_size, **holders):
+    """Refuză pornirea dacă pool-ul nu acoperă toate conexiunile care pot fi ținute simultan.
+
+    holders: consumator -> conexiuni ținute deodată (thread-uri de executor, exporturi, thread-ul
+    group commit etc.). Cu mai puține conexiuni, un consumator ar aștepta una ținută de un altul
+    care la rândul lui așteaptă un thread: timeout-uri sub sarcină în loc de o eroare la pornire.
+    """
+    needed = sum(holders.values())
+    if needed > max_size:
+        detail = ", ".join(f"{name}={count}" for name, count in holders.items())
+        raise ValueError(f"POOL_CONFIG['max_size'] = {max_size} este sub {needed} conexiuni "
+                         f"ținute simultan ({detail}); mărește max_size sau micșorează consumatorii")
+
+
+class PooledConnection:
+    """Conexiune împrumutată din pool. close() o returnează în pool în loc să o închidă."""
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+        self._released = False
+        self._broken = False
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def discard(self):
+        """Marchează conexiunea ca defectă; la close() va fi închisă, nu returnată."""
+        self._broken = True
+
+    def close(self):
+        if self._released:
+            return
+        self._released = True
+        self._pool.release(self)
+
+    def __getattr__(self, name):
+        # cursor(), commit(), rollback() etc. sunt delegate conexiunii reale
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ConnectionPool:
+    """Pool de conexiuni thread-safe, independent de driver (pyodbc / pymysql).
+
+    connect: funcție fără argumente care deschide o conexiune nouă.
+    ping: funcție(conn) care ridică excepție dacă conexiunea nu mai e validă.
+    """
+
+    def __init__(self, connect, ping=None, min_size=1, max_size=10, timeout=5.0,
+                 max_age=1800.0, validate_idle=5.0):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Configurare pool invalidă: 0 <= min_size <= max_size, max_size >= 1")
+        self._connect = connect
+        self._ping = ping
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_age = max_age
+        self.validate_idle = validate_idle
+
+        self._cond = threading.Condition()
+        self._idle = deque()  # (raw, created_at, returned_at)
+        self._in_use = 0
+        self._opening = 0
+        self._waiting = 0
+        self._warmed = False
+        self._counters = {
+            "acquired": 0,
+            "created": 0,
+            "recycled": 0,
+            "failed_validations": 0,
+            "timeouts": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    # --- Ciclul de viață al conexiunilor ---
+
+    def _open(self):
+        raw = self._connect()
+        with self._cond:
+            self._counters["created"] += 1
+        return raw, time.monotonic()
+
+    def _close_raw(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, created_at, now):
+        return self.max_age is not None and now - created_at >= self.max_age
+
+    def _validate(self, raw, returned_at, now):
+        if self._ping is None or now - returned_at < self.validate_idle:
+            return True
+        try:
+            self._ping(raw)
+            return True
+        except Exception:
+            with self._cond:
+                self._counters["failed_validations"] += 1
+            return False
+
+    def _warm_up(self):
+        # Umple pool-ul până la min_size la prima utilizare (nu la import)
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = self.min_size - len(self._idle) - self._in_use - self._opening
+            self._opening += max(missing, 0)
+        for _ in range(max(missing, 0)):
+            try:
+                raw, created_at = self._open()
+            except Exception:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                continue
+            with self._cond:
+                self._opening -= 1
+                self._idle.append((raw, created_at, created_at))
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Împrumută o conexiune validă; așteaptă cel mult `timeout` secunde dacă pool-ul e plin."""
+        if not self._warmed:
+            self._warm_up()
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        while True:
+            candidate = None
+            must_open = False
+            with self._cond:
+                self._waiting += 1
+                try:
+                    while not self._idle and self._in_use + self._opening >= self.max_size:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._counters["timeouts"] += 1
+                            raise PoolTimeout(
+                                f"Nicio conexiune liberă după {timeout:.1f}s "
+                                f"(max_size={self.max_size})"
+                            )
+                        self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+                if self._idle:
+                    # LIFO: conexiunea folosită cel mai recent e cel mai probabil încă validă
+                    candidate = self._idle.pop()
+                    self._in_use += 1
+                else:
+                    self._opening += 1
+                    must_open = True
+
+            if must_open:
+                try:
+                    raw, created_at = self._open()
+                except Exception:
+                    with self._cond:
+                        self._opening -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._opening -= 1
+                    self._in_use += 1
+                return self._checked_out(raw, created_at, started)
+
+            raw, created_at, returned_at = candidate
+            now = time.monotonic()
+            if self._is_expired(created_at, now) or not self._validate(raw, returned_at, now):
+                if self._is_expired(created_at, now):
+                    with self._cond:
+                        self._counters["recycled"] += 1
+                self._close_raw(raw)
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                continue
+            return self._checked_out(raw, created_at, started)
+
+    def _checked_out(self, raw, created_at, started):
+        waited = time.monotonic() - started
+        with self._cond:
+            self._counters["acquired"] += 1
+            self._counters["wait_time_total"] += waited
+            if waited > self._counters["wait_time_max"]:
+                self._counters["wait_time_max"] = waited
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, pooled):
+        """Returnează conexiunea în pool; tranzacția deschisă (dacă există) este anulată."""
+        raw = pooled.raw
+        keep = not pooled._broken and not self._is_expired(pooled._created_at, time.monotonic())
+        if keep:
+            try:
+                raw.rollback()
+            except Exception:
+                keep = False
+        if not keep:
+            self._close_raw(raw)
+        with self._cond:
+            self._in_use -= 1
+            if keep:
+                self._idle.append((raw, pooled._created_at, time.monotonic()))
+            elif self._is_expired(pooled._created_at, time.monotonic()):
+                self._counters["recycled"] += 1
+            self._cond.notify()
+
+    def close_all(self):
+        """Închide conexiunile libere (cele împrumutate se închid la returnare)."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._warmed = False
+        for raw, _, _ in idle:
+            self._close_raw(raw)
+
+    def stats(self):
+        with self._cond:
+            acquired = self._counters["acquired"]
+            return {
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "opening": self._opening,
+                "waiting": self._waiting,
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                "acquired_total": acquired,
+                "created_total": self._counters["created"],
+                "recycled_total": self._counters["recycled"],
+                "failed_validations": self._counters["failed_validations"],
+                "timeouts": self._counters["timeouts"],
+                "wait_time_avg_ms": round(self._counters["wait_time_total"] / acquired * 1000, 3) if acquired else 0.0,
+                "wait_time_max_ms": round(self._counters["wait_time_max"] * 1000, 3),
+            }
@@ -0,0 +1,171 @@
+"""Calendarul DimTime: generare vectorizată și rezolvare în proces (timestamp -> time_id).
+
+Atributele unei zile (time_id YYYYMMDD, trimestru, an, weekend) sunt funcții pure de dată, deci:
+- calendar_rows() generează rândurile DimTime pentru orice interval dintr-o singură trecere NumPy
+  (în Python dacă NumPy lipsește), iar load() le inserează doar pe cele lipsă;
+- TimeResolver ține aceleași atribute în tablouri compacte (6 octeți pe zi) pentru un interval,
+  astfel încât încărcătoarele (datagen.py, etl.py) și rapoartele (dashboard.py) nu mai au nevoie
+  de o căutare în DimTime sau de un JOIN doar pentru trimestru / weekend.
+
+Zilele sunt zile UTC, ca în report_queries.time_id_range.
+
+    python -m lab2.dimtime --dialect mssql --from 2020-01-01 --to 2030-12-31
+    python -m lab2.dimtime --dialect sqlite --db lab2/dwh.db --from 2024-01-01 --to 2025-12-31
+"""
+import argparse
+import functools
+from array import array
+from datetime import date, timedelta
+
+from .backends import BACKENDS, get_backend
+from .migrations import connect
+from .star_schema import COLUMNS, TABLES, time_row
+
+EPOCH = date(1970, 1, 1)
+# Intervalul rezolvorului implicit (~110 KB); zilele din afara lui se calculează direct
+DEFAULT_RANGE = (date(2000, 1, 1), date(2049, 12, 31))
+
+
+def day_number(d):
+    return (d - EPOCH).days
+
+
+def calendar_columns(first_day, last_day):
+    """Coloanele DimTime pentru [first_day, last_day]: (time_id, full_date, quarter, year, is_weekend)."""
+    days = (last_day - first_day).days + 1
+    if days <= 0:
+        return [], [], [], [], []
+    try:
+        import numpy as np
+    except ImportError:
+        return [list(c) for c in zip(*(time_row(first_day + timedelta(days=i)) for i in range(days)))]
+
+    numbers = np.arange(day_number(first_day), day_number(first_day) + days, dtype=np.int64)
+    dates = numbers.astype("datetime64[D]")
+    years = dates.astype("datetime64[Y]").astype(np.int64) + 1970
+    months = dates.astype("datetime64[M]").astype(np.int64) % 12 + 1
+    day_of_month = (dates - dates.astype("datetime64[M]")).astype(np.int64) + 1
+    # 1970-01-01 a fost joi: (zi + 3) % 7 -> 0 = luni, 5 / 6 = sâmbătă / duminică
+    weekend = ((numbers + 3) % 7 >= 5).astype(np.int64)
+    return (
+        (years * 10000 + months * 100 + day_of_month).tolist(),
+        np.datetime_as_string(dates, unit="D").tolist(),
+        ((months + 2) // 3).tolist(),
+        years.tolist(),
+        weekend.tolist(),
+    )
+
+
+def calendar_rows(first_day, last_day):
+    """Rândurile DimTime (ordinea din COLUMNS["DimTime"]) pentru [first_day, last_day]."""
+    return list(zip(*calendar_columns(first_day, last_day)))
+
+
+def load(cursor, dialect, first_day, last_day, batch=10_000):
+    """Inserează zilele din interval care lipsesc din DimTime; întoarce numărul de rânduri noi."""
+    backend = get_backend(dialect)
+    TABLES["DimTime"].apply(cursor, dialect)
+    first_id, last_id = time_row(first_day)[0], time_row(last_day)[0]
+    cursor.execute(f"SELECT time_id FROM DimTime WHERE time_id >= {backend.ph} AND time_id <= {backend.ph}",
+                   (first_id, last_id))
+    existing = {(row.get("time_id") if isinstance(row, dict) else row[0]) for row in cursor.fetchall()}
+    rows = [row for row in calendar_rows(first_day, last_day) if row[0] not in existing]
+    if rows:
+        backend.bulk_insert(cursor, "DimTime", COLUMNS["DimTime"], rows, chunk_size=batch)
+    return len(rows)
+
+
+class TimeResolver:
+    """time_id, trimestrul și weekend-ul unei zile, din tablouri compacte indexate pe zi.
+
+    resolve(ts) este o împărțire și trei citiri de tablou; resolve_many() face același lucru
+    vectorizat (NumPy) pentru o listă de timestamp-uri.
+    """
+
+    def __init__(self, first_day, last_day):
+        time_ids, _, quarters, _, weekends = calendar_columns(first_day, last_day)
+        self.first_day = first_day
+        self.last_day = last_day
+        self._offset = day_number(first_day)
+        self.time_ids = array("i", time_ids)
+        self.quarters = bytes(quarters)
+        self.weekends = bytes(weekends)
+
+    def __len__(self):
+        return len(self.time_ids)
+
+    def __contains__(self, ts):
+        return 0 <= ts // 86400 - self._offset < len(self.time_ids)
+
+    def resolve(self, ts):
+        """Timestamp UNIX -> (time_id, quarter, is_weekend)."""
+        i = ts // 86400 - self._offset
+        if 0 <= i < len(self.time_ids):
+            return self.time_ids[i], self.quarters[i], self.weekends[i]
+        # În afara intervalului: calcul direct (mai lent, același rezultat)
+        time_id, _, quarter, _, weekend = time_row(EPOCH + timedelta(days=ts // 86400))
+        return time_id, quarter, weekend
+
+    def time_id(self, ts):
+        return self.resolve(ts)[0]
+
+    def resolve_many(self, timestamps):
+        """Timestamp-uri -> (time_ids, quarters, is_weekend), tablouri NumPy (liste fără NumPy)."""
+        try:
+            import numpy as np
+        except ImportError:
+            resolved = [self.resolve(ts) for ts in timestamps]
+            return tuple(list(c) for c in zip(*resolved)) if resolved else ([], [], [])
+        index = np.asarray(timestamps, dtype=np.int64) // 86400 - self._offset
+        inside = (index >= 0) & (index < len(self.time_ids))
+        safe = np.where(inside, index, 0)
+        time_ids = np.frombuffer(self.time_ids, dtype=np.int32)[safe].astype(np.int64)
+        quarters = np.frombuffer(self.quarters, dtype=np.uint8)[safe].astype(np.int64)
+        weekends = np.frombuffer(self.weekends, dtype=np.uint8)[safe].astype(np.int64)
+        for pos in np.flatnonzero(~inside).tolist():
+            time_ids[pos], quarters[pos], weekends[pos] = self.resolve(int(timestamps[pos]))
+        return time_ids, quarters, weekends
+
+    def attributes(self, time_id):
+        """time_id (YYYYMMDD) -> (year, quarter, is_weekend), fără construirea unei date."""
+        year, month, day = time_id // 10000, (time_id // 100) % 100, time_id % 100
+        return year, (month + 2) // 3, int((_days_from_civil(year, month, day) + 3) % 7 >= 5)
+
+
+def _days_from_civil(year, month, day):
+    # Zile de la 1970-01-01 pentru o dată gregoriană (algoritmul lui H. Hinnant, doar aritmetică întreagă)
+    year -= month <= 2
+    era = year // 400
+    yoe = year - era * 400
+    doy = (153 * (month + (-3 if month > 2 else 9)) + 2) // 5 + day - 1
+    doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+    return era * 146097 + doe - 719468
+
+
+@functools.lru_cache(maxsize=1)
+def resolver():
+    """Rezolvorul partajat al procesului, pentru DEFAULT_RANGE."""
+    return TimeResolver(*DEFAULT_RANGE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=sorted(BACKENDS), required=True)
+    parser.add_argument("--db", help="fișierul SQLite (obligatoriu pentru --dialect sqlite)")
+    parser.add_argument("--from", dest="first", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    parser.add_argument("--to", dest="last", type=date.fromisoformat, required=True, help="YYYY-MM-DD")
+    args = parser.parse_args()
+    if args.dialect == "sqlite" and not args.db:
+        parser.error("--dialect sqlite necesită --db")
+
+    conn = connect(args.dialect, args.db)
+    try:
+        added = load(conn.cursor(), args.dialect, args.first, args.last)
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"DimTime: {added} zile noi în [{args.first}, {args.last}]")
+
+
+if __name__ == "__main__":
+    main()
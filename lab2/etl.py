@@ -0,0 +1,342 @@
+"""ETL incremental OLTP -> DWH: comenzile noi din orders devin DimOrder + FactOrderItems.
+
+Comenzile se citesc în ordinea (created_at, order_id), în loturi de --batch-size, după
+watermark-ul persistat în etl_watermark (în baza DWH). Pentru fiecare lot, într-o singură
+tranzacție pe DWH:
+- membrii lipsă din DimUser (după nume), DimProduct (după nume), DimStatus și DimTime (după zi)
+  sunt adăugați; cheile surogat sunt rezolvate prin hărțile din memorie;
+- orders.products (JSON) este explodat într-un rând de fapte per produs;
+- comenzile și faptele sunt inserate pe calea bulk a backend-ului (backends.py), sumarele zilelor
+  sunt recalculate (SQL Server, aggregates.py), iar watermark-ul este avansat.
+
+O cădere înainte de commit anulează tot lotul, inclusiv watermark-ul, deci reluarea pornește de
+la ultimul lot complet; comenzile deja încărcate (același order_public_id în DimOrder) sunt sărite.
+Comenzile mai noi decât acum - --lag secunde nu sunt citite încă: o tranzacție OLTP încă deschisă
+poate comite mai târziu o comandă cu created_at mai mic decât watermark-ul.
+
+    python -m lab2.etl --source mysql --target mssql
+    python -m lab2.etl --source sqlite --source-db lab2/oltp.db --target sqlite --target-db lab2/dwh.db
+    python -m lab2.etl --target mssql --status
+"""
+import argparse
+import json
+import time
+from datetime import date, timedelta
+
+from .aggregates import AggregateStore
+from .backends import BACKENDS, get_backend
+from .migrations import FACT_INDEXES, Table, connect, table_exists
+from .order_items import parse_products
+from .dimtime import resolver
+from .star_schema import COLUMNS, TABLES, time_row
+
+# Marja de profit nu există în OLTP (nu avem costuri): valoarea implicită a faptelor încărcate
+DEFAULT_PROFIT_MARGIN = 0.25
+FINAL_STATUSES = ("completed", "cancelled", "finalizat")
+# Membrul "necunoscut" din DimLocation (OLTP nu are locația utilizatorului)
+UNKNOWN_LOCATION = (0, "Necunoscut", "Necunoscut")
+
+# Parametri per IN (...) (SQL Server: 2100 per instrucțiune)
+_IN_CHUNK = 1000
+
+WATERMARK_TABLE = Table("etl_watermark", """
+    CREATE TABLE etl_watermark (
+        source_table VARCHAR(100) NOT NULL PRIMARY KEY,
+        last_created_at INT NOT NULL,
+        last_order_id INT NOT NULL,
+        updated_at INT NOT NULL
+    )
+""")
+
+
+def _tuple(row):
+    # pymysql cu DictCursor întoarce dicționare, pyodbc / sqlite3 tupluri
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+
+def _day(ts):
+    # Ziua UTC, ca în datagen.py și report_queries.time_id_range
+    return date(1970, 1, 1) + timedelta(days=ts // 86400)
+
+
+def _chunks(values, size=_IN_CHUNK):
+    values = list(values)
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+class OrderETL:
+    """Încărcarea incrementală a comenzilor dintr-o bază OLTP într-un depozit cu schema stea."""
+
+    def __init__(self, source, source_dialect, target, target_dialect, source_table="orders",
+                 batch_size=5000, lag=60, log=print):
+        self.source, self.target = source, target
+        self.src = get_backend(source_dialect)
+        self.dst = get_backend(target_dialect)
+        self.source_table = source_table
+        self.batch_size = batch_size
+        self.lag = lag
+        self.log = log
+        self.aggregates = AggregateStore(enabled=target_dialect == "mssql")
+        # time_id fără calcul de dată per comandă (vezi dimtime.py)
+        self.calendar = resolver()
+        # Hărțile dimensiunilor: cheie naturală -> cheie surogat (completate doar după commit)
+        self.users = {}        # nume -> DimUser.user_id
+        self.products = {}     # nume -> DimProduct.product_id
+        self.statuses = {}     # nume -> DimStatus.status_id
+        self.days = set()      # DimTime.time_id existente
+        # OLTP: product_id -> (nume, preț) și user_id -> DimUser.user_id
+        self.source_products = {}
+        self.source_users = {}
+
+    # --- Pregătire ---
+
+    def prepare(self):
+        """Creează tabelele lipsă (cu indexurile faptelor), membrul necunoscut din DimLocation
+        și rândul de watermark."""
+        cursor = self.target.cursor()
+        dialect, ph = self.dst.dialect, self.dst.ph
+        for table in TABLES.values():
+            table.apply(cursor, dialect)
+        for index in FACT_INDEXES:
+            index.apply(cursor, dialect)
+        WATERMARK_TABLE.apply(cursor, dialect)
+        cursor.execute(f"SELECT 1 FROM DimLocation WHERE location_id = {ph}", (UNKNOWN_LOCATION[0],))
+        if cursor.fetchone() is None:
+            self._insert(cursor, "DimLocation", [UNKNOWN_LOCATION])
+        cursor.execute(f"SELECT 1 FROM etl_watermark WHERE source_table = {ph}", (self.source_table,))
+        if cursor.fetchone() is None:
+            cursor.execute(
+                f"INSERT INTO etl_watermark (source_table, last_created_at, last_order_id, updated_at) "
+                f"VALUES ({ph}, {ph}, {ph}, {ph})", (self.source_table, 0, 0, int(time.time())),
+            )
+        self.target.commit()
+
+    def load_maps(self):
+        """Citește o dată dimensiunile DWH și produsele OLTP în memorie."""
+        cursor = self.target.cursor()
+        cursor.execute("SELECT nume, user_id FROM DimUser")
+        self.users = dict(map(_tuple, cursor.fetchall()))
+        cursor.execute("SELECT name, product_id FROM DimProduct")
+        self.products = dict(map(_tuple, cursor.fetchall()))
+        cursor.execute("SELECT status_name, status_id FROM DimStatus")
+        self.statuses = dict(map(_tuple, cursor.fetchall()))
+        cursor.execute("SELECT time_id FROM DimTime")
+        self.days = {row[0] for row in map(_tuple, cursor.fetchall())}
+        self.target.commit()
+
+        cursor = self.source.cursor()
+        cursor.execute("SELECT product_id, name, price FROM products")
+        self.source_products = {pid: (name, float(price)) for pid, name, price in map(_tuple, cursor.fetchall())}
+        self.source.commit()
+
+    def watermark(self, cursor, lock=False):
+        """(last_created_at, last_order_id); cu lock, rândul rămâne blocat până la commit."""
+        ph = self.dst.ph
+        if lock:
+            # UPDATE-ul ia blocajul pe rând: două rulări simultane nu pot încărca același lot
+            cursor.execute(f"UPDATE etl_watermark SET updated_at = {ph} WHERE source_table = {ph}",
+                           (int(time.time()), self.source_table))
+        cursor.execute(f"SELECT last_created_at, last_order_id FROM etl_watermark WHERE source_table = {ph}",
+                       (self.source_table,))
+        row = cursor.fetchone()
+        return _tuple(row) if row else (0, 0)
+
+    # --- Extragere ---
+
+    def _read_orders(self, after, until):
+        ph = self.src.ph
+        sql, params = self.src.limit(
+            f"SELECT order_id, order_public_id, user_id, products, order_status, created_at "
+            f"FROM {self.source_table} "
+            f"WHERE (created_at > {ph} OR (created_at = {ph} AND order_id > {ph})) AND created_at <= {ph} "
+            f"ORDER BY created_at, order_id",
+            (after[0], after[0], after[1], until), self.batch_size,
+        )
+        cursor = self.source.cursor()
+        cursor.execute(sql, params)
+        rows = [_tuple(r) for r in cursor.fetchall()]
+        self.source.commit()
+        return rows
+
+    def _read_users(self, user_ids):
+        """OLTP user_id -> (nume, created_at) pentru utilizatorii încă nerezolvați."""
+        found = {}
+        cursor = self.source.cursor()
+        for chunk in _chunks(user_ids):
+            cursor.execute(
+                f"SELECT user_id, name, created_at FROM users_login_info "
+                f"WHERE user_id IN ({self.src.placeholders(len(chunk))})", chunk,
+            )
+            found.update((uid, (name, created_at)) for uid, name, created_at in map(_tuple, cursor.fetchall()))
+        self.source.commit()
+        return found
+
+    def _loaded(self, cursor, public_ids):
+        loaded = set()
+        for chunk in _chunks(public_ids):
+            cursor.execute(
+                f"SELECT order_public_id FROM DimOrder WHERE order_public_id IN ({self.dst.placeholders(len(chunk))})",
+                chunk,
+            )
+            loaded.update(row[0] for row in map(_tuple, cursor.fetchall()))
+        return loaded
+
+    # --- Încărcare ---
+
+    def _insert(self, cursor, table, rows):
+        if rows:
+            with self.dst.explicit_keys(cursor, table):
+                self.dst.bulk_insert(cursor, table, COLUMNS[table], rows, chunk_size=self.batch_size)
+
+    def _next_id(self, cursor, table):
+        cursor.execute(f"SELECT MAX({COLUMNS[table][0]}) FROM {table}")
+        return (_tuple(cursor.fetchone())[0] or 0) + 1
+
+    def _batch(self, cursor, orders):
+        """Transformă și inserează un lot (în tranzacția deschisă); întoarce (comenzi, fapte, hărți noi)."""
+        loaded = self._loaded(cursor, [o[1] for o in orders])
+        orders = [o for o in orders if o[1] not in loaded]
+        new = {"users": {}, "products": {}, "statuses": {}, "days": set(), "source_users": {}}
+        if not orders:
+            return 0, 0, new
+
+        # Utilizatorii OLTP încă nerezolvați -> DimUser (după nume)
+        missing = sorted({o[2] for o in orders if o[2] is not None and o[2] not in self.source_users})
+        user_rows = []
+        next_user = self._next_id(cursor, "DimUser")
+        for uid, (name, created_at) in sorted(self._read_users(missing).items()):
+            user_id = self.users.get(name) or new["users"].get(name)
+            if user_id is None:
+                user_id = new["users"][name] = next_user
+                next_user += 1
+                user_rows.append((user_id, name, UNKNOWN_LOCATION[0], created_at))
+            new["source_users"][uid] = user_id
+
+        product_rows, status_rows, time_rows = [], [], []
+        next_product = self._next_id(cursor, "DimProduct")
+        next_status = self._next_id(cursor, "DimStatus")
+        next_order = self._next_id(cursor, "DimOrder")
+        next_fact = self._next_id(cursor, "FactOrderItems")
+        order_rows, fact_rows = [], []
+        for source_id, public_id, source_user, products, status, created_at in orders:
+            user_id = self.source_users.get(source_user) or new["source_users"].get(source_user)
+            if user_id is None:
+                self.log(f"  comanda {source_id}: utilizatorul {source_user} lipsește din OLTP, sărită")
+                continue
+            status_id = self.statuses.get(status) or new["statuses"].get(status)
+            if status_id is None:
+                status_id = new["statuses"][status] = next_status
+                next_status += 1
+                status_rows.append((status_id, status, int(status in FINAL_STATUSES)))
+            time_id = self.calendar.time_id(created_at)
+            if time_id not in self.days and time_id not in new["days"]:
+                new["days"].add(time_id)
+                time_rows.append(time_row(_day(created_at)))
+
+            order_id = next_order
+            next_order += 1
+            counts = parse_products(products)
+            order_rows.append((order_id, user_id, json.dumps(list(counts.elements())), status, status_id,
+                               public_id, created_at, time_id))
+            for source_product, qty in sorted(counts.items()):
+                name, price = self.source_products.get(source_product, (f"ID {source_product}", 0.0))
+                product_id = self.products.get(name) or new["products"].get(name)
+                if product_id is None:
+                    product_id = new["products"][name] = next_product
+                    next_product += 1
+                    product_rows.append((product_id, name, price))
+                for _ in range(qty):
+                    fact_rows.append((next_fact, order_id, user_id, product_id, time_id, status_id,
+                                      UNKNOWN_LOCATION[0], price, DEFAULT_PROFIT_MARGIN, 0.0, None))
+                    next_fact += 1
+
+        for table, rows in (("DimTime", time_rows), ("DimStatus", status_rows), ("DimProduct", product_rows),
+                            ("DimUser", user_rows), ("DimOrder", order_rows), ("FactOrderItems", fact_rows)):
+            self._insert(cursor, table, rows)
+        self.aggregates.refresh_days(cursor, {row[4] for row in fact_rows})
+        return len(order_rows), len(fact_rows), new
+
+    def run(self, max_batches=None):
+        """Încarcă loturi până la epuizarea comenzilor; întoarce statisticile rulării."""
+        self.prepare()
+        self.load_maps()
+        until = int(time.time()) - self.lag
+        totals = {"batches": 0, "orders": 0, "facts": 0, "skipped": 0}
+        t0 = time.perf_counter()
+        cursor = self.target.cursor()
+        while max_batches is None or totals["batches"] < max_batches:
+            try:
+                after = self.watermark(cursor, lock=True)
+                orders = self._read_orders(after, until)
+                if not orders:
+                    self.target.commit()
+                    break
+                loaded_orders, loaded_facts, new = self._batch(cursor, orders)
+                last = orders[-1]
+                cursor.execute(
+                    f"UPDATE etl_watermark SET last_created_at = {self.dst.ph}, last_order_id = {self.dst.ph} "
+                    f"WHERE source_table = {self.dst.ph}", (last[5], last[0], self.source_table),
+                )
+                self.target.commit()
+            except BaseException:
+                self.target.rollback()
+                raise
+            # Hărțile se actualizează doar după commit (un lot anulat nu lasă chei inexistente)
+            self.users.update(new["users"])
+            self.products.update(new["products"])
+            self.statuses.update(new["statuses"])
+            self.days |= new["days"]
+            self.source_users.update(new["source_users"])
+
+            totals["batches"] += 1
+            totals["orders"] += loaded_orders
+            totals["facts"] += loaded_facts
+            totals["skipped"] += len(orders) - loaded_orders
+            elapsed = time.perf_counter() - t0
+            self.log(f"  lot {totals['batches']}: watermark ({last[5]}, {last[0]}), {totals['orders']} comenzi, "
+                     f"{totals['facts']} fapte ({(totals['orders'] + totals['facts']) / max(elapsed, 1e-9):,.0f} rânduri/s)")
+        totals["seconds"] = round(time.perf_counter() - t0, 3)
+        totals["rows_per_sec"] = round((totals["orders"] + totals["facts"]) / max(totals["seconds"], 1e-9), 1)
+        return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--source", choices=sorted(BACKENDS), default="mysql", help="baza OLTP")
+    parser.add_argument("--source-db", help="fișierul SQLite OLTP (ex. lab2/oltp.db)")
+    parser.add_argument("--target", choices=sorted(BACKENDS), default="mssql", help="depozitul de date")
+    parser.add_argument("--target-db", help="fișierul SQLite DWH (ex. lab2/dwh.db)")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--lag", type=int, default=60, help="secunde: comenzile mai noi așteaptă următoarea rulare")
+    parser.add_argument("--max-batches", type=int, help="oprire după N loturi (reluarea continuă de la watermark)")
+    parser.add_argument("--status", action="store_true", help="afișează watermark-ul și iese")
+    args = parser.parse_args()
+    for side, dialect, db in (("source", args.source, args.source_db), ("target", args.target, args.target_db)):
+        if dialect == "sqlite" and not db:
+            parser.error(f"--{side} sqlite necesită --{side}-db")
+
+    target = connect(args.target, args.target_db)
+    try:
+        if args.status:
+            cursor = target.cursor()
+            if not table_exists(cursor, args.target, "etl_watermark"):
+                print("Niciun lot încărcat (etl_watermark lipsește)")
+                return
+            created_at, order_id = OrderETL(None, args.source, target, args.target).watermark(cursor)
+            print(f"Watermark orders: created_at = {created_at}, order_id = {order_id}")
+            return
+        source = connect(args.source, args.source_db)
+        try:
+            etl = OrderETL(source, args.source, target, args.target, batch_size=args.batch_size, lag=args.lag)
+            totals = etl.run(args.max_batches)
+        finally:
+            source.close()
+        print(f"ETL terminat: {totals['orders']} comenzi, {totals['facts']} fapte, {totals['skipped']} sărite, "
+              f"{totals['seconds']}s ({totals['rows_per_sec']:,.0f} rânduri/s)")
+    finally:
+        target.close()
+
+
+if __name__ == "__main__":
+    main()
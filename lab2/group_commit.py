@@ -0,0 +1,170 @@
+"""Group commit: scrieri mici din cereri concurente, grupate într-o singură tranzacție.
+
+Cererile pun rândul într-o coadă din proces și primesc un Future; un thread de fundal
+golește coada cu un singur apel flush(rânduri) (un INSERT pe mai multe rânduri și un singur
+COMMIT), fie la `max_batch` rânduri, fie la `max_delay_ms` după cel mai vechi rând din coadă,
+oricare vine primul. Future-ul se rezolvă abia după COMMIT, deci cererea răspunde doar cu
+date scrise durabil. Dacă lotul eșuează înainte de COMMIT, rândurile se reîncearcă unul câte
+unul: un rând invalid (ex. cheie străină) nu trage după el tot lotul. Dacă eșuează chiar
+COMMIT-ul (flush ridică CommitUncertain: conexiune pierdută, timeout), serverul poate să-l fi
+aplicat deja, deci lotul nu se reîncearcă: toate Future-urile lui primesc eroarea.
+
+    GET /admin/db/group-commit-stats   -> configurare, adâncimea cozii, loturi, rânduri
+    GET /metrics                       -> group_commit_batch_size, group_commit_flush_seconds,
+                                          group_commit_queue_depth
+"""
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from .metrics import LATENCY_BUCKETS, Histogram
+
+BATCH_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class GroupCommitFull(Exception):
+    """Coada este plină (max_queue rânduri în așteptare)."""
+
+
+class CommitUncertain(Exception):
+    """COMMIT-ul a eșuat fără să se știe dacă serverul l-a aplicat; rândurile nu se rescriu."""
+
+
+class GroupCommitWriter:
+    """Coada și thread-ul de scriere.
+
+    flush: funcție(rânduri) care scrie și face COMMIT, apelată doar din thread-ul de scriere;
+    întoarce un rezultat per rând (ex. cheile generate), în ordinea rândurilor. O eroare a
+    COMMIT-ului trebuie ridicată ca CommitUncertain (orice altă eroare = nimic scris).
+    """
+
+    def __init__(self, name, flush, max_batch=100, max_delay_ms=5.0, max_queue=1000):
+        if max_batch < 1 or max_queue < 1 or max_delay_ms < 0:
+            raise ValueError("Configurare group commit invalidă: max_batch, max_queue >= 1, max_delay_ms >= 0")
+        self.name = name
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000.0
+        self.max_queue = max_queue
+        self._flush = flush
+        self._cond = threading.Condition()
+        self._queue = deque()  # (rând, Future, momentul intrării în coadă)
+        self._closed = False
+        self._counters = {"submitted": 0, "rejected": 0, "batches": 0, "committed": 0, "failed": 0,
+                          "batch_retries": 0, "commit_uncertain": 0, "flush_time_total": 0.0}
+        self.batch_sizes = Histogram("group_commit_batch_size", "Rânduri per COMMIT de grup",
+                                     buckets=BATCH_BUCKETS, labels=("writer",))
+        self.flush_seconds = Histogram("group_commit_flush_seconds", "Durata unui flush (INSERT + COMMIT)",
+                                       buckets=LATENCY_BUCKETS, labels=("writer",))
+        self._thread = threading.Thread(target=self._run, name=f"group-commit-{name}", daemon=True)
+        self._thread.start()
+
+    def submit(self, row):
+        """Pune rândul în coadă; Future-ul primește rezultatul rândului după COMMIT."""
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise GroupCommitFull(f"Scriitorul '{self.name}' este oprit")
+            if len(self._queue) >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise GroupCommitFull(f"{len(self._queue)} rânduri în așteptare în '{self.name}'")
+            self._queue.append((row, future, time.monotonic()))
+            self._counters["submitted"] += 1
+            # Thread-ul așteaptă fie primul rând, fie un lot complet
+            if len(self._queue) == 1 or len(self._queue) >= self.max_batch:
+                self._cond.notify()
+        return future
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            if not self._queue:
+                return None
+            deadline = self._queue[0][2] + self.max_delay
+            while len(self._queue) < self.max_batch and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        try:
+            results = self._flush([row for row, _, _ in batch])
+        except BaseException as e:
+            if isinstance(e, CommitUncertain):
+                with self._cond:
+                    self._counters["commit_uncertain"] += len(batch)
+                self._finish(batch, error=e)
+            elif len(batch) == 1:
+                self._finish(batch, error=e)
+            else:
+                with self._cond:
+                    self._counters["batch_retries"] += 1
+                for item in batch:
+                    self._write([item])
+            return
+        seconds = time.perf_counter() - started
+        self.batch_sizes.observe(len(batch), self.name)
+        self.flush_seconds.observe(seconds, self.name)
+        with self._cond:
+            self._counters["flush_time_total"] += seconds
+        self._finish(batch, results=results)
+
+    def _finish(self, batch, results=None, error=None):
+        with self._cond:
+            if error is None:
+                self._counters["batches"] += 1
+                self._counters["committed"] += len(batch)
+            else:
+                self._counters["failed"] += len(batch)
+        for i, (_, future, _) in enumerate(batch):
+            if error is None:
+                future.set_result(results[i])
+            else:
+                future.set_exception(error)
+
+    def close(self, timeout=10.0):
+        """Oprește primirea de rânduri; ce este deja în coadă se scrie înainte de oprire."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    def queue_depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self):
+        with self._cond:
+            counters = dict(self._counters)
+            depth = len(self._queue)
+        batches = counters["batches"]
+        return {
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+            "max_queue": self.max_queue,
+            "queue_depth": depth,
+            **counters,
+            "avg_batch_size": round(counters["committed"] / batches, 2) if batches else None,
+            "avg_flush_ms": round(counters["flush_time_total"] * 1000 / batches, 2) if batches else None,
+        }
+
+    def render(self):
+        """Liniile Prometheus ale scriitorului (pentru /metrics)."""
+        return [
+            *self.batch_sizes.render(),
+            *self.flush_seconds.render(),
+            "# HELP group_commit_queue_depth Rânduri în așteptarea unui COMMIT de grup",
+            "# TYPE group_commit_queue_depth gauge",
+            f'group_commit_queue_depth{{writer="{self.name}"}} {self.queue_depth()}',
+        ]
@@ -0,0 +1,141 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class LookupCache:
+    """Cache în memorie (la nivel de proces) pentru tabelele mici de tip dimensiune/lookup.
+
+    tables: {nume_tabelă: (coloană_cheie, coloană_etichetă)}
+    Fiecare tabelă se încarcă integral, cu o singură interogare, la primul acces
+    și se reîncarcă după `ttl` secunde sau după invalidate() (apelat la scrieri CRUD).
+    O cheie cerută care lipsește din hartă (rând adăugat de ETL / altă instanță) reîncarcă
+    tabela o dată, cel mult o dată la `miss_reload_after` secunde, înainte de eticheta implicită.
+    """
+
+    def __init__(self, tables, ttl=300.0, miss_reload_after=5.0):
+        self.tables = dict(tables)
+        self.ttl = ttl
+        self.miss_reload_after = miss_reload_after
+        self._lock = threading.Lock()
+        self._maps = {}       # tabelă -> {cheie: etichetă}
+        self._loaded_at = {}  # tabelă -> time.monotonic() la încărcare
+        self._versions = {t: 0 for t in self.tables}
+        self._counters = {"hits": 0, "loads": 0, "miss_reloads": 0, "invalidations": 0}
+
+    def _load(self, table, conn):
+        key_col, label_col = self.tables[table]
+        with self._lock:
+            version = self._versions[table]
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"SELECT {key_col}, {label_col} FROM {table}")
+            rows = cursor.fetchall()
+            if rows and isinstance(rows[0], dict):  # pymysql DictCursor
+                mapping = {row[key_col]: row[label_col] for row in rows}
+            else:
+                mapping = {row[0]: row[1] for row in rows}
+        finally:
+            cursor.close()
+        with self._lock:
+            self._counters["loads"] += 1
+            # Dacă tabela a fost invalidată între timp, nu publicăm datele vechi
+            if self._versions[table] == version:
+                self._maps[table] = mapping
+                self._loaded_at[table] = time.monotonic()
+        return mapping
+
+    def get_map(self, table, conn, keys=()):
+        """Returnează dicționarul {cheie: etichetă}; încarcă tabela dacă lipsește/a expirat
+        sau dacă lipsește vreuna din `keys` (cheile pe care apelantul urmează să le caute)."""
+        if table not in self.tables:
+            raise KeyError(f"Tabelă necunoscută în cache: {table}")
+        with self._lock:
+            mapping = self._maps.get(table)
+            if mapping is not None:
+                age = time.monotonic() - self._loaded_at[table]
+                if age < self.ttl:
+                    if age < self.miss_reload_after or all(k in mapping for k in keys):
+                        self._counters["hits"] += 1
+                        return mapping
+                    self._counters["miss_reloads"] += 1
+        return self._load(table, conn)
+
+    def name(self, table, key, conn, default=None):
+        return self.get_map(table, conn, keys=(key,)).get(key, default)
+
+    def names(self, table, keys, conn, missing="ID Necunoscut {}"):
+        keys = list(keys)
+        mapping = self.get_map(table, conn, keys=keys)
+        return [mapping.get(k, missing.format(k)) for k in keys]
+
+    def invalidate(self, table=None):
+        """Invalidează o tabelă (sau toate); următorul acces o reîncarcă."""
+        with self._lock:
+            targets = [table] if table is not None else list(self.tables)
+            for t in targets:
+                if t in self.tables:
+                    self._versions[t] += 1
+                    self._maps.pop(t, None)
+                    self._loaded_at.pop(t, None)
+                    self._counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "tables": {t: len(m) for t, m in self._maps.items()},
+            }
+
+
+class LRUCache:
+    """Cache cheie -> valoare cu dimensiune limitată; la depășire se elimină cea mai veche utilizare.
+
+    Pentru mapări prea mari pentru a fi încărcate integral (ex. nume -> user_id): se completează
+    pe măsură ce cheile sunt cerute, iar invalidate() este apelat la scrierile CRUD.
+    """
+
+    def __init__(self, max_size=10_000):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+        self._version = 0
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._items.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def version(self):
+        """Versiunea curentă; put(..., version=v) nu publică o valoare citită înaintea unei invalidări."""
+        with self._lock:
+            return self._version
+
+    def put(self, key, value, version=None):
+        with self._lock:
+            if version is not None and version != self._version:
+                return
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._items.clear()
+            else:
+                self._items.pop(key, None)
+            self._version += 1
+            self._counters["invalidations"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "size": len(self._items), "max_size": self.max_size}
@@ -0,0 +1,195 @@
+"""Metrici de latență în format Prometheus și antetul Server-Timing.
+
+Pe durata unei cereri, hook-urile (get_db, execute_query, execute_rows, randarea JSON) adaugă
+măsurătorile într-un obiect per cerere, ținut într-un ContextVar; executoarele DB copiază
+contextul în thread-urile lor (db_executor.py), deci măsurătorile ajung în aceeași cerere.
+La trimiterea răspunsului, middleware-ul le înregistrează în histograme cu eticheta rutei
+(șablonul, ex. /admin/crud/{table_name}/{action}) și scrie totalurile în Server-Timing.
+
+    GET /metrics    -> text Prometheus (http_request_duration_seconds, db_execute_seconds, ...)
+"""
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ROW_BUCKETS = (0, 1, 10, 100, 1_000, 10_000, 100_000, 1_000_000)
+
+# Fazele măsurate în interiorul unei cereri: numele histogramei, descrierea, numele din Server-Timing
+PHASES = {
+    "acquire": ("db_acquire_seconds", "Timpul de împrumut al conexiunii din pool", "db-acquire"),
+    "execute": ("db_execute_seconds", "Timpul de execuție al interogărilor", "db-exec"),
+    "fetch": ("db_fetch_seconds", "Timpul de citire a rândurilor", "db-fetch"),
+    "group_commit": ("group_commit_wait_seconds", "Așteptarea COMMIT-ului de grup (group_commit.py)", "group-commit"),
+    "serialize": ("response_serialize_seconds", "Timpul de serializare JSON a răspunsului", "serialize"),
+}
+
+
+class Histogram:
+    """Histogramă cumulativă cu etichete, thread-safe."""
+
+    def __init__(self, name, description, buckets=LATENCY_BUCKETS, labels=("route",)):
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+        self._series = {}  # valorile etichetelor -> [numărători per bucket..., sum, count]
+
+    def observe(self, value, *label_values):
+        pos = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * (len(self.buckets) + 2)
+            if pos < len(self.buckets):
+                series[pos] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for label_values, series in items:
+            labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labels, label_values))
+            sep = "," if labels else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{labels}{sep}le="+Inf"}} {series[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {series[-2]}")
+            lines.append(f"{self.name}_count{{{labels}}} {series[-1]}")
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestTimings:
+    """Măsurătorile unei cereri: (fază, secunde) și numărul de rânduri per interogare."""
+
+    __slots__ = ("scope", "phases", "rows")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.phases = []
+        self.rows = []
+
+    def route(self):
+        # Șablonul rutei este pus în scope de router (FastAPI), după potrivirea cererii
+        route = (self.scope or {}).get("route")
+        return getattr(route, "path", None) or "(necunoscută)"
+
+    def total(self, phase):
+        return sum(seconds for name, seconds in self.phases if name == phase)
+
+
+_current = contextvars.ContextVar("request_timings", default=None)
+
+
+# --- Hook-uri apelate din codul DB / serializare (fără efect în afara unei cereri) ---
+
+def record(phase, seconds):
+    timings = _current.get()
+    if timings is not None:
+        timings.phases.append((phase, seconds))
+
+
+def record_rows(count):
+    timings = _current.get()
+    if timings is not None:
+        timings.rows.append(count)
+
+
+def current_route():
+    """Șablonul rutei cererii curente (ex. pentru jurnalul de interogări lente); None în afara unei cereri."""
+    timings = _current.get()
+    return timings.route() if timings is not None else None
+
+
+@contextmanager
+def timed(phase):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(phase, time.perf_counter() - started)
+
+
+class Metrics:
+    """Registrul de histograme al aplicației."""
+
+    def __init__(self):
+        self.requests = Histogram("http_request_duration_seconds", "Latența cererilor HTTP per rută",
+                                  labels=("method", "route", "status"))
+        self.phases = {phase: Histogram(name, description) for phase, (name, description, _) in PHASES.items()}
+        self.rows = Histogram("db_rows_returned", "Rânduri întoarse per interogare", buckets=ROW_BUCKETS)
+        self.collectors = []
+
+    def register(self, collector):
+        """Obiect cu render() -> linii Prometheus, adăugat la /metrics (ex. GroupCommitWriter)."""
+        self.collectors.append(collector)
+
+    def observe_request(self, scope, timings, status, elapsed):
+        template = timings.route()
+        self.requests.observe(elapsed, scope.get("method", ""), template, str(status))
+        for phase, seconds in timings.phases:
+            self.phases[phase].observe(seconds, template)
+        for count in timings.rows:
+            self.rows.observe(count, template)
+
+    def render(self):
+        lines = self.requests.render()
+        for histogram in self.phases.values():
+            lines += histogram.render()
+        lines += self.rows.render()
+        for collector in self.collectors:
+            lines += collector.render()
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Middleware ASGI pur: rulează în același task ca ruta, deci hook-urile văd ContextVar-ul."""
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                header = server_timing(timings, time.perf_counter() - started)
+                message["headers"] = [*message.get("headers", []), (b"server-timing", header.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            self.metrics.observe_request(scope, timings, status, time.perf_counter() - started)
+
+
+def server_timing(timings, elapsed):
+    """Antetul Server-Timing: totalurile per fază, în milisecunde (până la începutul răspunsului)."""
+    parts = [f"app;dur={elapsed * 1000:.1f}"]
+    for phase, (_, _, label) in PHASES.items():
+        count = sum(1 for name, _ in timings.phases if name == phase)
+        if count:
+            parts.append(f'{label};dur={timings.total(phase) * 1000:.1f};desc="{count}x"')
+    if timings.rows:
+        parts.append(f'db-rows;desc="{sum(timings.rows)}"')
+    return ", ".join(parts)
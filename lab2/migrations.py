@@ -0,0 +1,252 @@
+"""Migrări de schemă versionate și idempotente (SQLite, MySQL, SQL Server).
+
+Fiecare migrare are o versiune; versiunile aplicate sunt scrise în tabela schema_version,
+deci rularea repetată nu face nimic. Pașii verifică și ei existența obiectelor (DDL-ul din
+MySQL nu este tranzacțional), așa că o migrare întreruptă poate fi reluată.
+
+Fiecare migrare ține de o bază: "oltp" (orders, order_items) sau "dwh" (FactOrderItems).
+Se aplică doar migrările bazelor cerute cu --scope; un index pe o tabelă care lipsește oprește
+migrarea cu eroare, iar versiunea nu se înregistrează (se reia la rularea următoare).
+
+    python -m lab2.migrations --dialect sqlite --db lab1/lab1.db                 # oltp
+    python -m lab2.migrations --dialect sqlite --db lab2/dwh.db --scope dwh
+    python -m lab2.migrations --dialect mssql            # baza din db_config.py (oltp + dwh)
+    python -m lab2.migrations --dialect mysql --status   # doar versiunile aplicate
+"""
+import argparse
+import time
+
+DIALECTS = {
+    "sqlite": {
+        "placeholder": "?",
+        "version_table": """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at INTEGER NOT NULL
+            )
+        """,
+        "table_exists": "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+        "index_exists": "SELECT 1 FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND name = ?",
+    },
+    "mysql": {
+        "placeholder": "%s",
+        "version_table": """
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INT PRIMARY KEY,
+                description VARCHAR(255) NOT NULL,
+                applied_at INT NOT NULL
+            )
+        """,
+        "table_exists": "SELECT 1 FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = %s",
+        "index_exists": "SELECT 1 FROM information_schema.statistics "
+                        "WHERE table_schema = DATABASE() AND table_name = %s AND index_name = %s",
+    },
+    "mssql": {
+        "placeholder": "?",
+        "version_table": """
+            IF OBJECT_ID('dbo.schema_version', 'U') IS NULL
+            CREATE TABLE schema_version (
+                version INT PRIMARY KEY,
+                description NVARCHAR(255) NOT NULL,
+                applied_at INT NOT NULL
+            )
+        """,
+        "table_exists": "SELECT 1 FROM sys.tables WHERE name = ?",
+        "index_exists": "SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID(?) AND name = ?",
+    },
+}
+
+
+SCOPES = ("oltp", "dwh")
+
+
+class MigrationError(Exception):
+    """Un pas nu se poate aplica (ex. tabela indexului lipsește); migrarea nu se înregistrează."""
+
+
+def _exists(cursor, dialect, check, *params):
+    cursor.execute(DIALECTS[dialect][check], params)
+    return cursor.fetchone() is not None
+
+
+def table_exists(cursor, dialect, table):
+    return _exists(cursor, dialect, "table_exists", table)
+
+
+class Table:
+    """Tabelă nouă; DDL-ul folosește doar tipuri comune celor trei dialecte."""
+
+    def __init__(self, name, ddl):
+        self.name = name
+        self.ddl = ddl
+
+    def apply(self, cursor, dialect):
+        if table_exists(cursor, dialect, self.name):
+            return f"{self.name}: există deja"
+        cursor.execute(self.ddl)
+        return f"{self.name}: creată"
+
+
+class Index:
+    """Index secundar; `include` sunt coloanele purtate doar pentru acoperire.
+
+    SQL Server le pune în INCLUDE (în afara cheii); SQLite și MySQL nu au INCLUDE,
+    așa că sunt adăugate la finalul cheii (indexul rămâne acoperitor, ordinea nu se schimbă).
+    """
+
+    def __init__(self, name, table, columns, include=()):
+        self.name = name
+        self.table = table
+        self.columns = tuple(columns)
+        self.include = tuple(include)
+
+    def sql(self, dialect):
+        if dialect == "mssql":
+            sql = f"CREATE INDEX {self.name} ON {self.table} ({', '.join(self.columns)})"
+            if self.include:
+                sql += f" INCLUDE ({', '.join(self.include)})"
+            return sql
+        return f"CREATE INDEX {self.name} ON {self.table} ({', '.join(self.columns + self.include)})"
+
+    def apply(self, cursor, dialect):
+        """Creează indexul dacă lipsește; întoarce un mesaj. MigrationError dacă tabela lipsește."""
+        if not table_exists(cursor, dialect, self.table):
+            raise MigrationError(f"{self.name}: tabela {self.table} nu există")
+        if _exists(cursor, dialect, "index_exists", self.table, self.name):
+            return f"{self.name}: există deja"
+        cursor.execute(self.sql(dialect))
+        return f"{self.name}: creat"
+
+
+# Indexurile tabelei de fapte; folosite de migrarea 3 și de ETL (etl.py) la crearea tabelelor
+FACT_INDEXES = [
+    # rapoartele DWH și dashboard-ul: filtru pe time_id, acoperitor pentru toate agregatele
+    Index("IX_FactOrderItems_time", "FactOrderItems", ["time_id"],
+          include=["product_id", "user_id", "order_id", "sales_amount", "profit_margin", "discount_amount"]),
+    # lab3: subinterogarea corelată pe user_id + fereastra pe time_id
+    Index("IX_FactOrderItems_user_time", "FactOrderItems", ["user_id", "time_id"]),
+    # JOIN-urile pe DimProduct și filtrele pe produs
+    Index("IX_FactOrderItems_product_time", "FactOrderItems", ["product_id", "time_id"], include=["sales_amount"]),
+]
+
+# Lista completă a migrărilor, în ordine: (versiune, bază, descriere, pași).
+# O migrare aplicată nu se mai modifică. Excepție: indexurile FactOrderItems stăteau în migrarea 1
+# și erau sărite pe orice bază fără ambele tabele; au fost mutate în migrarea 3 (idempotentă)
+MIGRATIONS = [
+    (1, "oltp", "Indexuri secundare pe orders pentru predicatele din lab2/api.py și lab3", [
+        # /get-orders, /admin/stats/user-orders (paginare keyset), lab1/select.py
+        Index("IX_orders_user_created", "orders", ["user_id", "created_at", "order_id"], include=["order_status"]),
+        # /admin/completed-orders, /admin/pending-orders (paginare keyset)
+        Index("IX_orders_status_created", "orders", ["order_status", "created_at", "order_id"]),
+        # intervale pe created_at: orders-last-week, stats/order-status, stats/daily-orders, export
+        Index("IX_orders_created", "orders", ["created_at"], include=["order_status", "user_id"]),
+    ]),
+    (2, "oltp", "order_items: produsele comenzilor normalizate din orders.products (vezi order_items.py)", [
+        Table("order_items", """
+            CREATE TABLE order_items (
+                order_id INT NOT NULL,
+                product_id INT NOT NULL,
+                qty INT NOT NULL,
+                PRIMARY KEY (order_id, product_id)
+            )
+        """),
+        # popularitatea pe produs și căutarea comenzilor care conțin un produs
+        Index("IX_order_items_product", "order_items", ["product_id", "order_id"], include=["qty"]),
+        # progresul backfill-ului, pentru reluare după întrerupere
+        Table("order_items_backfill", """
+            CREATE TABLE order_items_backfill (
+                source_table VARCHAR(64) NOT NULL PRIMARY KEY,
+                last_id INT NOT NULL,
+                updated_at INT NOT NULL
+            )
+        """),
+    ]),
+    (3, "dwh", "Indexuri pe FactOrderItems pentru rapoartele DWH, dashboard și lab3", FACT_INDEXES),
+]
+
+
+def applied_versions(conn, dialect):
+    """Versiunile înregistrate în schema_version (creată dacă lipsește)."""
+    cursor = conn.cursor()
+    cursor.execute(DIALECTS[dialect]["version_table"])
+    conn.commit()
+    cursor.execute("SELECT version FROM schema_version")
+    return {row[0] if not isinstance(row, dict) else next(iter(row.values())) for row in cursor.fetchall()}
+
+
+def migrate(conn, dialect, target=None, log=print, scopes=SCOPES):
+    """Aplică migrările neaplicate ale bazelor din `scopes` (până la `target`); întoarce versiunile aplicate.
+
+    Versiunile se urmăresc individual, nu ca maxim: o migrare dwh neaplicată nu este ascunsă de
+    una oltp mai nouă. MigrationError oprește rularea fără a înregistra migrarea curentă.
+    """
+    if dialect not in DIALECTS:
+        raise ValueError(f"Dialect necunoscut: {dialect}")
+    unknown = set(scopes) - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Bază necunoscută: {', '.join(sorted(unknown))} (oltp sau dwh)")
+    done = applied_versions(conn, dialect)
+    ph = DIALECTS[dialect]["placeholder"]
+    applied = []
+    cursor = conn.cursor()
+    for number, scope, description, steps in MIGRATIONS:
+        if number in done or scope not in scopes or (target is not None and number > target):
+            continue
+        log(f"[{number}] ({scope}) {description}")
+        try:
+            for step in steps:
+                log(f"    {step.apply(cursor, dialect)}")
+        except MigrationError:
+            conn.rollback()
+            raise
+        cursor.execute(
+            f"INSERT INTO schema_version (version, description, applied_at) VALUES ({ph}, {ph}, {ph})",
+            (number, description, int(time.time())),
+        )
+        conn.commit()
+        applied.append(number)
+    return applied
+
+
+def connect(dialect, db_path=None):
+    from .backends import get_backend
+    if dialect == "sqlite":
+        return get_backend("sqlite", {"path": db_path or "lab1/lab1.db"}).connect()
+    if dialect == "mysql":
+        from .mysql.db_config import DB_CONFIG
+    else:
+        from .db_config import DB_CONFIG
+    return get_backend(dialect, DB_CONFIG).connect()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), required=True)
+    parser.add_argument("--db", help="fișierul SQLite (implicit lab1/lab1.db)")
+    parser.add_argument("--target", type=int, help="aplică migrările doar până la această versiune")
+    parser.add_argument("--scope", choices=(*SCOPES, "all"),
+                        help="baza migrată (implicit: all pentru mssql, unde stau ambele, oltp în rest)")
+    parser.add_argument("--status", action="store_true", help="afișează versiunile aplicate și iese")
+    args = parser.parse_args()
+    scope = args.scope or ("all" if args.dialect == "mssql" else "oltp")
+    scopes = SCOPES if scope == "all" else (scope,)
+
+    conn = connect(args.dialect, args.db)
+    try:
+        if args.status:
+            done = applied_versions(conn, args.dialect)
+            pending = [n for n, s, _, _ in MIGRATIONS if n not in done and s in scopes]
+            print(f"Versiuni aplicate: {sorted(done) or 'niciuna'}; în așteptare ({scope}): {pending or 'niciuna'}")
+            return
+        try:
+            applied = migrate(conn, args.dialect, args.target, scopes=scopes)
+        except MigrationError as e:
+            raise SystemExit(f"Migrare oprită: {e} (verifică --db / --scope)")
+        print(f"Migrări aplicate: {applied or 'niciuna'}; versiuni: {sorted(applied_versions(conn, args.dialect))}")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
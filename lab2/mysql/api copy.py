@@ -1,25 +1,80 @@
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, HTTPException, Query, Body
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import pymysql
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, ValidationError
+import asyncio
 import uuid
 import time
 from datetime import datetime, timedelta
 import json
-from .db_config import DB_CONFIG
-
-app = FastAPI()
+from .db_config import DB_CONFIG, BACKEND_CONFIG, POOL_CONFIG, EXECUTOR_CONFIG, ORDER_ITEMS_CONFIG, DAY_BUCKETS_CONFIG, SLOW_QUERY_CONFIG, USER_CACHE_CONFIG, GROUP_COMMIT_CONFIG
+from ..backends import get_backend
+from ..db_pool import ConnectionPool, PoolTimeout, check_pool_size
+from ..db_executor import DBExecutor, offload
+from ..group_commit import CommitUncertain, GroupCommitFull, GroupCommitWriter
+from ..lookup_cache import LookupCache, LRUCache
+from ..order_items import OrderItems
+from ..results import FastJSONResponse
+from ..metrics import Metrics, MetricsMiddleware, timed
+from ..slow_queries import SlowQueryLog
+from ..day_buckets import count_by_day, day_of, resolve_tz
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, ORDER_BY, keyset_filter, split_page
+
+# orjson pentru toate răspunsurile JSON (vezi results.py)
+app = FastAPI(default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Histograme de latență per rută (/metrics) și antetul Server-Timing
+metrics = Metrics()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+
+
+# Placeholder-ul, LIMIT, cheile generate și inserările bulk vin din backend (vezi backends.py);
+# rândurile sunt dicționare pe oricare backend
+DIALECT = BACKEND_CONFIG["dialect"]
+backend = get_backend(DIALECT, BACKEND_CONFIG.get(DIALECT, DB_CONFIG), dict_rows=True)
+ph = backend.ph
+
+db_pool = ConnectionPool(backend.connect, ping=backend.ping, **POOL_CONFIG)
 
 def get_db():
-    return pymysql.connect(**DB_CONFIG)
+    # conn.close() returnează conexiunea în pool
+    try:
+        with timed("acquire"):
+            return db_pool.acquire()
+    except PoolTimeout as ex:
+        raise HTTPException(status_code=503, detail=f"Pool de conexiuni epuizat: {ex}")
+
+# Rapoartele/statisticile și căile OLTP au executoare (și limite) separate
+report_executor = DBExecutor("reports", EXECUTOR_CONFIG["report_workers"], EXECUTOR_CONFIG["max_queue"])
+oltp_executor = DBExecutor("oltp", EXECUTOR_CONFIG["oltp_workers"], EXECUTOR_CONFIG["max_queue"])
+
+@app.on_event("shutdown")
+def close_db_pool():
+    report_executor.shutdown()
+    oltp_executor.shutdown()
+    if order_writer is not None:
+        order_writer.close()
+    db_pool.close_all()
+
+@app.get("/admin/db/pool-stats")
+async def pool_stats():
+    return db_pool.stats()
+
+@app.get("/admin/db/executor-stats")
+async def executor_stats():
+    return {"reports": report_executor.stats(), "oltp": oltp_executor.stats()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 # --- Modele Pydantic ---
 class OrderRequest(BaseModel):
@@ -64,26 +119,101 @@ TABLE_MODELS = {
     "orders": {"add": OrderCreate, "update": OrderUpdate, "primary_key": "order_id"}
 }
 
-@app.post("/register-user")
-def register_user(req: RegisterRequest):
-    conn = get_db()
-    cursor = conn.cursor()
+# Cache id -> nume produs; invalidat la scrierile CRUD pe products
+dim_cache = LookupCache({"products": ("product_id", "name")})
 
-    cursor.execute("SELECT user_id FROM users_login_info WHERE name = %s", (req.name,))
-    row = cursor.fetchone()
+# Cache nume -> user_id pentru /register-user (login-urile repetate nu ating baza de date)
+user_ids = LRUCache(USER_CACHE_CONFIG["max_size"])
 
-    if row:
-        user_id = row["user_id"]
-    else:
-        created_at = int(time.time())
-        cursor.execute(
-            "INSERT INTO users_login_info (name, created_at) VALUES (%s, %s)",
-            (req.name, created_at)
-        )
-        conn.commit()
-        user_id = cursor.lastrowid
+def invalidate_caches(table_name):
+    if table_name in dim_cache.tables: dim_cache.invalidate(table_name)
+    if table_name == "users_login_info": user_ids.invalidate()
+
+@app.get("/admin/db/cache-stats")
+async def cache_stats():
+    return {"lookup": dim_cache.stats(), "user_ids": user_ids.stats()}
+
+# order_items ține produsele fiecărei comenzi ca rânduri (scrisă odată cu orders)
+order_items = OrderItems(DIALECT, read_mode=ORDER_ITEMS_CONFIG["read_mode"])
+
+ORDER_COLUMNS = ("order_public_id", "user_id", "products", "order_status", "created_at")
+
+def insert_orders(rows):
+    """Comenzile (tupluri în ordinea ORDER_COLUMNS) și produsele lor, într-o singură tranzacție."""
+    conn = get_db()
+    try:
+        cursor = conn.cursor()
+        try:
+            order_ids = backend.bulk_insert(cursor, "orders", ORDER_COLUMNS, rows, primary_key="order_id")
+            order_items.write(cursor, [(order_id, row[2]) for order_id, row in zip(order_ids, rows)], replace=False)
+        except BaseException:
+            conn.rollback()
+            raise
+        try:
+            conn.commit()
+        except backend.Error as e:
+            # Serverul poate să fi aplicat COMMIT-ul: comenzile nu se rescriu, conexiunea nu se refolosește
+            conn.discard()
+            raise CommitUncertain(f"COMMIT eșuat pentru {len(rows)} comenzi, starea lor este necunoscută: {e}") from e
+        return order_ids
+    finally:
+        conn.close()
+
+# Group commit opțional pentru /process-order: un singur INSERT + COMMIT pentru comenzile
+# sosite în aceeași fereastră (vezi group_commit.py)
+order_writer = None
+if GROUP_COMMIT_CONFIG["enabled"]:
+    order_writer = GroupCommitWriter("orders", insert_orders, max_batch=GROUP_COMMIT_CONFIG["max_batch"],
+                                     max_delay_ms=GROUP_COMMIT_CONFIG["max_delay_ms"],
+                                     max_queue=GROUP_COMMIT_CONFIG["max_queue"])
+    metrics.register(order_writer)
+
+# Thread-ul group commit ține și el o conexiune cât scrie un lot
+check_pool_size(POOL_CONFIG["max_size"], reports=report_executor.max_workers, oltp=oltp_executor.max_workers,
+                group_commit=0 if order_writer is None else 1)
+
+@app.get("/admin/db/group-commit-stats")
+async def group_commit_stats():
+    if order_writer is None:
+        return {"enabled": False}
+    return {"enabled": True, **order_writer.stats()}
+
+@app.get("/admin/db/order-items-stats")
+async def order_items_stats():
+    return order_items.stats()
+
+# Instrucțiunile CRUD peste prag, cu planul EXPLAIN la prima depășire (vezi slow_queries.py)
+slow_queries = SlowQueryLog(DIALECT, **SLOW_QUERY_CONFIG)
+
+@app.get("/admin/diagnostics/slow-queries")
+async def slow_query_stats(fingerprint: str | None = Query(None)):
+    if fingerprint is None:
+        return slow_queries.summary()
+    details = slow_queries.details(fingerprint)
+    if details is None:
+        raise HTTPException(status_code=404, detail=f"Amprentă necunoscută: {fingerprint}")
+    return details
 
-    conn.close()
+@app.post("/register-user")
+@offload(oltp_executor)
+def register_user(req: RegisterRequest):
+    user_id = user_ids.get(req.name)
+    if user_id is None:
+        # Upsert într-o singură instrucțiune: două înregistrări simultane ale aceluiași nume
+        # primesc același user_id (vezi backends.py); conexiunea se împrumută doar la miss
+        version = user_ids.version()
+        conn = get_db()
+        try:
+            user_id = backend.upsert(conn.cursor(), "users_login_info",
+                                     {"name": req.name, "created_at": int(time.time())},
+                                     key="name", primary_key="user_id")
+            conn.commit()
+        except backend.Error as e:
+            conn.rollback()
+            raise HTTPException(status_code=500, detail=f"Eroare SQL: {e}")
+        finally:
+            conn.close()
+        user_ids.put(req.name, user_id, version=version)
 
     return {
         "status": "ok",
@@ -91,39 +221,40 @@ def register_user(req: RegisterRequest):
     }
 
 @app.get("/admin/stats/user-orders")
+@offload(oltp_executor, get_db)
 def get_user_orders_by_name(
     name: str, 
     start: int = Query(..., description="Start Timestamp"), 
-    end: int = Query(..., description="End Timestamp")
+    end: int = Query(..., description="End Timestamp"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
 ):
-    """Obiectiv 1: Comenzi utilizator după NUME și Interval de Timp"""
-    conn = get_db()
+    """Obiectiv 1: Comenzi utilizator după NUME și Interval de Timp (paginat keyset)"""
     cursor = conn.cursor()
     
     # 1. Găsim ID-ul utilizatorului pe baza numelui
-    cursor.execute("SELECT user_id FROM users_login_info WHERE name = %s", (name,))
+    cursor.execute(f"SELECT user_id FROM users_login_info WHERE name = {ph}", (name,))
     user = cursor.fetchone()
     
     if not user:
-        conn.close()
         raise HTTPException(status_code=404, detail="Utilizatorul nu a fost găsit.")
     
     user_id = user['user_id']
 
-    # 2. Luăm comenzile în intervalul de timp
-    cursor.execute("""
+    # 2. Luăm o pagină de comenzi din intervalul de timp
+    after_sql, after_params = keyset_filter(after, placeholder=ph)
+    cursor.execute(*backend.limit(f"""
         SELECT order_id, order_public_id, products, order_status, created_at 
         FROM orders 
-        WHERE user_id = %s AND created_at >= %s AND created_at <= %s
-        ORDER BY created_at DESC
-    """, (user_id, start, end))
+        WHERE user_id = {ph} AND created_at >= {ph} AND created_at <= {ph}{after_sql}
+        {ORDER_BY.format(p="")}
+    """, (user_id, start, end, *after_params), limit + 1))
     
-    orders = cursor.fetchall()
+    orders, next_cursor = split_page(cursor.fetchall(), limit)
     
-    # 3. Rezolvăm numele produselor
-    cursor.execute("SELECT product_id, name FROM products")
-    product_lookup = {row["product_id"]: row["name"] for row in cursor.fetchall()}
-    conn.close()
+    # 3. Rezolvăm numele produselor (din cache)
+    product_lookup = dim_cache.get_map("products", conn)
 
     result = []
     for r in orders:
@@ -142,176 +273,250 @@ def get_user_orders_by_name(
             "date": datetime.fromtimestamp(r["created_at"]).strftime("%Y-%m-%d %H:%M")
         })
 
-    return {"user": name, "count": len(result), "orders": result}
+    return {"user": name, "count": len(result), "orders": result, "next_cursor": next_cursor}
 
 
 @app.get("/admin/stats/order-status")
+@offload(report_executor, get_db)
 def stats_order_status(
     start: int = Query(...), 
-    end: int = Query(...)
+    end: int = Query(...),
+    conn=None
 ):
     """Obiectiv 2: Statistica Status Comenzi în interval"""
-    conn = get_db()
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT order_status, COUNT(*) as count 
         FROM orders 
-        WHERE created_at >= %s AND created_at <= %s
+        WHERE created_at >= {ph} AND created_at <= {ph}
         GROUP BY order_status
     """, (start, end))
     rows = cursor.fetchall()
-    conn.close()
     
     return {row['order_status']: row['count'] for row in rows}
 
 
 @app.get("/admin/stats/daily-orders")
+@offload(report_executor, get_db)
 def stats_daily_orders(
     start: int = Query(...), 
-    end: int = Query(...)
+    end: int = Query(...),
+    tz: str | None = Query(None, description="Fus orar IANA (ex. Europe/Bucharest); implicit fusul serverului"),
+    conn=None
 ):
     """Obiectiv 3: Comenzi zilnice în interval flexibil"""
-    conn = get_db()
     cursor = conn.cursor()
+    zone = resolve_tz(tz)
     
-    cursor.execute("""
-        SELECT created_at FROM orders 
-        WHERE created_at >= %s AND created_at <= %s
-    """, (start, end))
-    rows = cursor.fetchall()
-    conn.close()
+    # GROUP BY pe ziua locală direct în SQL (vezi day_buckets.py)
+    by_day = count_by_day(cursor, DIALECT, "orders", "created_at", start, end, zone, DAY_BUCKETS_CONFIG["mode"])
 
     # Generăm dicționarul cu toate zilele din interval (pentru a avea 0 acolo unde nu sunt comenzi)
     counts = {}
     current_ts = start
     while current_ts <= end:
-        day_str = datetime.fromtimestamp(current_ts).strftime("%Y-%m-%d")
-        counts[day_str] = 0
+        counts[day_of(current_ts, zone)] = 0
         current_ts += 86400 # +1 zi în secunde
 
-    # Populăm cu datele reale
-    for row in rows:
-        day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-        if day in counts:
-            counts[day] += 1
-        else:
-            # Caz limită (fus orar etc), adăugăm cheia
-            counts[day] = counts.get(day, 0) + 1
+    # Populăm cu datele reale (zilele din afara pașilor de mai sus se adaugă la final)
+    for day, n in by_day.items():
+        counts[day] = counts.get(day, 0) + n
 
     return {"dates": list(counts.keys()), "counts": list(counts.values())}
 
 
 @app.get("/admin/stats/new-users")
+@offload(report_executor, get_db)
 def stats_new_users(
     start: int = Query(...), 
-    end: int = Query(...)
+    end: int = Query(...),
+    tz: str | None = Query(None, description="Fus orar IANA (ex. Europe/Bucharest); implicit fusul serverului"),
+    conn=None
 ):
     """Obiectiv 4: Utilizatori noi în interval"""
-    conn = get_db()
     cursor = conn.cursor()
+    zone = resolve_tz(tz)
     
-    cursor.execute("""
-        SELECT created_at FROM users_login_info 
-        WHERE created_at >= %s AND created_at <= %s
-    """, (start, end))
-    rows = cursor.fetchall()
-    conn.close()
+    by_day = count_by_day(cursor, DIALECT, "users_login_info", "created_at", start, end, zone, DAY_BUCKETS_CONFIG["mode"])
 
     counts = {}
     current_ts = start
     while current_ts <= end:
-        day_str = datetime.fromtimestamp(current_ts).strftime("%Y-%m-%d")
-        counts[day_str] = 0
+        counts[day_of(current_ts, zone)] = 0
         current_ts += 86400
 
-    for row in rows:
-        day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-        if day in counts:
-            counts[day] += 1
-        else:
-            counts[day] = counts.get(day, 0) + 1
+    for day, n in by_day.items():
+        counts[day] = counts.get(day, 0) + n
 
     return {"dates": list(counts.keys()), "counts": list(counts.values())}
 
 
 @app.get("/admin/stats/products-popularity")
+@offload(report_executor, get_db)
 def stats_products(
     start: int = Query(...), 
-    end: int = Query(...)
+    end: int = Query(...),
+    conn=None
 ):
     """Obiectiv 5: Produse populare în interval"""
-    conn = get_db()
     cursor = conn.cursor()
     
-    # Selectăm doar comenzile din interval
-    cursor.execute("""
-        SELECT products FROM orders 
-        WHERE created_at >= %s AND created_at <= %s
-    """, (start, end))
-    orders = cursor.fetchall()
+    # Numărul de apariții per produs (JSON sau GROUP BY pe order_items, după read_mode)
+    counts = order_items.popularity(cursor, start, end)
     
-    cursor.execute("SELECT product_id, name FROM products")
-    products_db = cursor.fetchall()
-    product_map = {p['product_id']: p['name'] for p in products_db}
-    conn.close()
+    product_map = dim_cache.get_map("products", conn, keys=counts)
 
     product_counts = {}
-
-    for order in orders:
-        try:
-            prod_ids = json.loads(order['products'])
-            if isinstance(prod_ids, int): prod_ids = [prod_ids]
-            
-            for pid in prod_ids:
-                p_name = product_map.get(pid, f"ID {pid}")
-                product_counts[p_name] = product_counts.get(p_name, 0) + 1
-        except:
-            continue
+    for pid, count in counts.items():
+        p_name = product_map.get(pid, f"ID {pid}")
+        product_counts[p_name] = product_counts.get(p_name, 0) + count
 
     return product_counts
 
 # --- RESTUL RUTELOR EXISTENTE (Păstrate pentru compatibilitate) ---
 
+def apply_add_defaults(table_name, data_dict):
+    if table_name == "orders":
+        if not data_dict.get('order_public_id'): data_dict['order_public_id'] = str(uuid.uuid4())
+        if not data_dict.get('created_at'): data_dict['created_at'] = int(time.time())
+    elif table_name == "users_login_info":
+        if not data_dict.get('created_at'): data_dict['created_at'] = int(time.time())
+    return data_dict
+
+def validate_rows(schema, rows, exclude_none):
+    # Validare într-o singură trecere; erorile sunt raportate per rând
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors.append({"index": index, "detail": "Rândul trebuie să fie un obiect JSON."})
+            continue
+        try:
+            valid.append((index, schema(**row).model_dump(exclude_none=exclude_none)))
+        except ValidationError as e:
+            errors.append({"index": index, "detail": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()]})
+    return valid, errors
+
+def id_ranges(ids):
+    """Cheile generate -> [{"first_id", "count"}] pe secvențe consecutive."""
+    ranges = []
+    for pk in ids:
+        if ranges and ranges[-1]["first_id"] + ranges[-1]["count"] == pk:
+            ranges[-1]["count"] += 1
+        else:
+            ranges.append({"first_id": pk, "count": 1})
+    return ranges
+
+def bulk_operation(table_name, action, rows, chunk_size):
+    """bulk_add (calea bulk a backend-ului), bulk_update, bulk_delete - o singură tranzacție."""
+    if not isinstance(rows, list) or not rows:
+        raise HTTPException(status_code=400, detail="Acțiunile bulk necesită o listă nevidă de rânduri.")
+    model_config = TABLE_MODELS[table_name]
+    primary_key = model_config["primary_key"]
+
+    if action == "bulk_add":
+        items, errors = validate_rows(model_config["add"], rows, exclude_none=False)
+        items = [(i, apply_add_defaults(table_name, d)) for i, d in items]
+    elif action == "bulk_update":
+        items, errors = validate_rows(model_config["update"], rows, exclude_none=True)
+        errors += [{"index": i, "detail": "Fara date de actualizat."} for i, d in items if len(d) < 2]
+        items = [(i, d) for i, d in items if len(d) >= 2]
+    else:
+        items, errors = [], []
+        for index, row in enumerate(rows):
+            value = row.get(primary_key) if isinstance(row, dict) else row
+            if isinstance(value, int) and not isinstance(value, bool) and value > 0:
+                items.append((index, value))
+            else:
+                errors.append({"index": index, "detail": "ID necesar."})
+    errors.sort(key=lambda e: e["index"])
+    if not items:
+        raise HTTPException(status_code=400, detail={"message": "Niciun rând valid.", "errors": errors})
+
+    conn = get_db()
+    cursor = slow_queries.cursor(conn.cursor())
+    written = 0
+    inserted = []
+    try:
+        if action == "bulk_delete":
+            for start in range(0, len(items), chunk_size):
+                chunk = items[start:start + chunk_size]
+                cursor.execute(f"DELETE FROM {table_name} WHERE {primary_key} IN ({backend.placeholders(len(chunk))})",
+                               [v for _, v in chunk])
+                written += cursor.rowcount
+                if table_name == "orders" and order_items.available(cursor, recheck=True): order_items.delete(cursor, [v for _, v in chunk])
+        else:
+            groups = {}
+            for index, data in items:
+                groups.setdefault(tuple(data), []).append(data)
+            for cols, group in groups.items():
+                for start in range(0, len(group), chunk_size):
+                    chunk = group[start:start + chunk_size]
+                    if action == "bulk_add":
+                        ids = backend.bulk_insert(cursor, table_name, cols, [tuple(d.values()) for d in chunk],
+                                                  chunk_size, primary_key=primary_key)
+                        inserted += id_ranges(ids)
+                        if table_name == "orders":
+                            order_items.write(cursor, [(pk, d["products"]) for pk, d in zip(ids, chunk)], replace=False)
+                    else:
+                        set_cols = [c for c in cols if c != primary_key]
+                        cursor.executemany(f"UPDATE {table_name} SET {', '.join(f'{c} = {ph}' for c in set_cols)} WHERE {primary_key} = {ph}",
+                                           [tuple(d[c] for c in set_cols) + (d[primary_key],) for d in chunk])
+                        if table_name == "orders" and "products" in cols:
+                            order_items.write(cursor, [(d[primary_key], d["products"]) for d in chunk])
+                    written += len(chunk)
+        conn.commit()
+        invalidate_caches(table_name)
+    except backend.Error as e:
+        conn.rollback()
+        raise HTTPException(status_code=400, detail={"message": f"Eroare SQL: {e}. Tranzacția a fost anulată.", "errors": errors})
+    finally:
+        conn.close()
+
+    result = {"status": "success" if not errors else "partial", "action": action, "requested": len(rows), "written": written, "errors": errors}
+    if action == "bulk_add":
+        result["inserted"] = inserted
+    return result
+
 @app.post("/admin/crud/{table_name}/{action}")
-def crud_operation(table_name: str, action: str, payload: dict):
+@offload(oltp_executor)
+def crud_operation(table_name: str, action: str, payload: dict | list = Body(...),
+                   chunk_size: int = Query(1000, ge=1, le=10000)):
     if table_name not in TABLE_MODELS:
         raise HTTPException(status_code=404, detail=f"Tabelă necunoscută: {table_name}")
+    if action in ["bulk_add", "bulk_update", "bulk_delete"]:
+        return bulk_operation(table_name, action, payload.get("rows") if isinstance(payload, dict) else payload, chunk_size)
     if action not in ["add", "update", "delete"]:
         raise HTTPException(status_code=404, detail=f"Acțiune necunoscută: {action}")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Payload-ul trebuie să fie un obiect JSON.")
 
     model_config = TABLE_MODELS[table_name]
     primary_key = model_config["primary_key"]
     conn = get_db()
-    cursor = conn.cursor()
+    cursor = slow_queries.cursor(conn.cursor())
 
     try:
         if action == "delete":
             pk_value = payload.get(primary_key)
             if not pk_value:
                 raise HTTPException(status_code=400, detail=f"ID necesar.")
-            cursor.execute(f"DELETE FROM {table_name} WHERE {primary_key} = %s", (pk_value,))
+            cursor.execute(f"DELETE FROM {table_name} WHERE {primary_key} = {ph}", (pk_value,))
             if cursor.rowcount == 0: raise HTTPException(status_code=404, detail="Inregistrare negasita.")
+            if table_name == "orders" and order_items.available(cursor, recheck=True): order_items.delete(cursor, [pk_value])
             conn.commit()
+            invalidate_caches(table_name)
             return {"status": "success", "action": "deleted"}
 
         elif action == "add":
             AddSchema = model_config["add"]
             validated_data = AddSchema(**payload)
-            data_dict = validated_data.model_dump()
-            
-            # Defaults
-            if table_name == "orders":
-                if not data_dict.get('order_public_id'): data_dict['order_public_id'] = str(uuid.uuid4())
-                if not data_dict.get('created_at'): data_dict['created_at'] = int(time.time())
-            elif table_name == "users_login_info":
-                if not data_dict.get('created_at'): data_dict['created_at'] = int(time.time())
-
-            fields = ", ".join(data_dict.keys())
-            placeholders = ", ".join(["%s"] * len(data_dict))
-            values = tuple(data_dict.values())
-            cursor.execute(f"INSERT INTO {table_name} ({fields}) VALUES ({placeholders})", values)
+            data_dict = apply_add_defaults(table_name, validated_data.model_dump())
+
+            new_id = backend.insert(cursor, table_name, data_dict, primary_key=primary_key)
+            if table_name == "orders": order_items.write(cursor, [(new_id, data_dict["products"])], replace=False)
             conn.commit()
-            return {"status": "success", "action": "added", "id": cursor.lastrowid}
+            invalidate_caches(table_name)
+            return {"status": "success", "action": "added", "id": new_id}
 
         elif action == "update":
             UpdateSchema = model_config["update"]
@@ -322,42 +527,58 @@ def crud_operation(table_name: str, action: str, payload: dict):
             if not pk_value: raise HTTPException(status_code=400, detail="ID necesar.")
             if not data_dict: raise HTTPException(status_code=400, detail="Fara date de actualizat.")
             
-            set_clauses = [f"{key} = %s" for key in data_dict.keys()]
+            set_clauses = [f"{key} = {ph}" for key in data_dict.keys()]
             values = list(data_dict.values())
             values.append(pk_value)
             
-            cursor.execute(f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE {primary_key} = %s", tuple(values))
+            cursor.execute(f"UPDATE {table_name} SET {', '.join(set_clauses)} WHERE {primary_key} = {ph}", tuple(values))
+            if table_name == "orders" and "products" in data_dict: order_items.write(cursor, [(pk_value, data_dict["products"])])
             conn.commit()
+            invalidate_caches(table_name)
             return {"status": "success", "action": "updated"}
 
-    except pymysql.Error as e:
+    except backend.Error as e:
         conn.rollback()
         raise HTTPException(status_code=500, detail=f"Eroare SQL: {e}")
     finally:
         conn.close()
 
 @app.post("/process-order")
-def process_order(order: OrderRequest):
-    conn = get_db()
-    cursor = conn.cursor()
+async def process_order(order: OrderRequest):
+    # order_public_id se generează înainte de scriere, în ambele moduri
     order_public_id = str(uuid.uuid4())
-    created_at = int(time.time())
-    cursor.execute("INSERT INTO orders (order_public_id, user_id, products, order_status, created_at) VALUES (%s, %s, %s, %s, %s)", 
-                   (order_public_id, order.user_id, json.dumps(order.products), "completed", created_at))
-    conn.commit()
-    conn.close()
+    row = (order_public_id, order.user_id, json.dumps(order.products), "completed", int(time.time()))
+    try:
+        if order_writer is None:
+            await oltp_executor.run(insert_orders, [row])
+        else:
+            try:
+                future = order_writer.submit(row)
+            except GroupCommitFull as e:
+                raise HTTPException(status_code=503, detail=f"Coada de comenzi este plină: {e}")
+            # Răspunsul pleacă doar după COMMIT-ul lotului din care face parte comanda
+            with timed("group_commit"):
+                await asyncio.wrap_future(future)
+    except CommitUncertain as e:
+        # Nu 503: o reîncercare automată ar putea dubla comanda; clientul verifică order_public_id
+        raise HTTPException(status_code=500, detail={"message": str(e), "order_public_id": order_public_id})
     return {"status": "success", "order_public_id": order_public_id}
 
 @app.get("/get-orders")
-def get_orders(userId: int):
-    conn = get_db()
+@offload(oltp_executor, get_db)
+def get_orders(
+    userId: int,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
+):
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM orders WHERE user_id = %s ORDER BY created_at DESC", (userId,))
-    rows = cursor.fetchall()
+    after_sql, after_params = keyset_filter(after, placeholder=ph)
+    cursor.execute(*backend.limit(f"SELECT * FROM orders WHERE user_id = {ph}{after_sql} {ORDER_BY.format(p='')}",
+                                  (userId, *after_params), limit + 1))
+    rows, next_cursor = split_page(cursor.fetchall(), limit)
     
-    cursor.execute("SELECT product_id, name FROM products")
-    product_lookup = {row["product_id"]: row["name"] for row in cursor.fetchall()}
-    conn.close()
+    product_lookup = dim_cache.get_map("products", conn)
 
     data = []
     for r in rows:
@@ -373,48 +594,56 @@ def get_orders(userId: int):
             "order_status": r["order_status"],
             "created_at": r["created_at"]
         })
-    return data
+    return {"count": len(data), "orders": data, "next_cursor": next_cursor}
 
 @app.get("/admin/latest-order")
-def latest_order():
-    conn = get_db()
+@offload(oltp_executor, get_db)
+def latest_order(conn=None):
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM orders ORDER BY created_at DESC LIMIT 1")
+    cursor.execute(*backend.limit("SELECT * FROM orders ORDER BY created_at DESC", (), 1))
     row = cursor.fetchone()
-    conn.close()
     return row
 
-@app.get("/admin/completed-orders")
-def completed_orders():
-    conn = get_db()
+def get_orders_by_status(conn, status, limit, after):
     cursor = conn.cursor()
-    cursor.execute("SELECT * FROM orders WHERE order_status = 'completed'")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+    after_sql, after_params = keyset_filter(after, placeholder=ph)
+    cursor.execute(*backend.limit(f"SELECT * FROM orders WHERE order_status = {ph}{after_sql} {ORDER_BY.format(p='')}",
+                                  (status, *after_params), limit + 1))
+    rows, next_cursor = split_page(cursor.fetchall(), limit)
+    return {"status": status, "count": len(rows), "orders": rows, "next_cursor": next_cursor}
+
+@app.get("/admin/completed-orders")
+@offload(oltp_executor, get_db)
+def completed_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
+):
+    return get_orders_by_status(conn, "completed", limit, after)
 
 @app.get("/admin/pending-orders")
-def pending_orders():
-    conn = get_db()
-    cursor = conn.cursor()
-    cursor.execute("SELECT * FROM orders WHERE order_status = 'pending'")
-    rows = cursor.fetchall()
-    conn.close()
-    return rows
+@offload(oltp_executor, get_db)
+def pending_orders(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: str | None = Query(None, alias="cursor", description="next_cursor din pagina anterioară"),
+    conn=None
+):
+    return get_orders_by_status(conn, "pending", limit, after)
 
 @app.get("/admin/orders-last-week")
-def orders_last_week():
-    conn = get_db()
+@offload(report_executor, get_db)
+def orders_last_week(
+    tz: str | None = Query(None, description="Fus orar IANA (ex. Europe/Bucharest); implicit fusul serverului"),
+    conn=None
+):
     cursor = conn.cursor()
-    one_week_ago = int(time.time()) - 7 * 86400
-    cursor.execute("SELECT created_at FROM orders WHERE created_at >= %s", (one_week_ago,))
-    rows = cursor.fetchall()
-    conn.close()
+    zone = resolve_tz(tz)
+    now = int(time.time())
+    one_week_ago = now - 7 * 86400
+    # Limita de sus acoperă restul zilei curente (înainte nu exista), deci nimic din "azi" nu se pierde
+    by_day = count_by_day(cursor, DIALECT, "orders", "created_at", one_week_ago, now + 86400, zone, DAY_BUCKETS_CONFIG["mode"])
     counts = {}
     for i in range(7):
-        day = (datetime.now() - timedelta(days=i)).strftime("%Y-%m-%d")
-        counts[day] = 0
-    for row in rows:
-        day = datetime.fromtimestamp(row["created_at"]).strftime("%Y-%m-%d")
-        if day in counts: counts[day] += 1
+        day = (datetime.now(zone) - timedelta(days=i)).strftime("%Y-%m-%d")
+        counts[day] = by_day.get(day, 0)
     return {"dates": list(reversed(list(counts.keys()))), "counts": list(reversed(list(counts.values())))}
\ No newline at end of file
@@ -1,9 +1,66 @@
-import pymysql
+import os
+
+LAB2_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 DB_CONFIG = {
     "host": "localhost",
     "user": "root",
     "password": "",
     "database": "lab3",
-    "cursorclass": pymysql.cursors.DictCursor
+}
+
+# Backend-ul build-ului (vezi backends.py): "mysql" folosește DB_CONFIG, "sqlite" fișierul local
+# creat cu: python -m lab2.backends --init-sqlite lab2/oltp.db
+BACKEND_CONFIG = {
+    "dialect": "mysql",
+    "sqlite": {
+        "path": os.path.join(LAB2_DIR, "oltp.db"),
+        "pragmas": {"journal_mode": "WAL", "synchronous": "NORMAL", "foreign_keys": "ON"},
+    },
+}
+
+# max_size >= report_workers + oltp_workers (+1 pentru thread-ul group commit, dacă este activ);
+# api copy.py refuză pornirea altfel
+POOL_CONFIG = {
+    "min_size": 2,
+    "max_size": 11,
+    "timeout": 5.0,
+    "max_age": 1800.0,
+    "validate_idle": 5.0,
+}
+
+EXECUTOR_CONFIG = {
+    "report_workers": 4,
+    "oltp_workers": 6,
+    "max_queue": 100,
+}
+
+ORDER_ITEMS_CONFIG = {
+    "read_mode": "json",
+}
+
+# Cache-ul nume -> user_id din /register-user (la depășire iese cea mai veche utilizare)
+USER_CACHE_CONFIG = {
+    "max_size": 10_000,
+}
+
+# Group commit pentru /process-order: flush la max_batch comenzi sau după max_delay_ms,
+# oricare vine primul; peste max_queue comenzi în așteptare se răspunde cu 503
+GROUP_COMMIT_CONFIG = {
+    "enabled": False,
+    "max_batch": 100,
+    "max_delay_ms": 5,
+    "max_queue": 1000,
+}
+
+DAY_BUCKETS_CONFIG = {
+    "mode": "sql",
+}
+
+# Aceeași locație ca build-ul SQL Server: lab2/logs/, indiferent de directorul curent
+SLOW_QUERY_CONFIG = {
+    "threshold_ms": 500,
+    "path": os.path.join(LAB2_DIR, "logs", "slow_queries_mysql.jsonl"),
+    "max_bytes": 10 * 1024 * 1024,
+    "backups": 5,
 }
@@ -0,0 +1,203 @@
+"""Produsele comenzilor normalizate: order_items(order_id, product_id, qty).
+
+orders.products rămâne sursa de adevăr (text JSON cu id-uri de produs, ex. "[1, 3, 3]");
+order_items este scrisă în aceeași tranzacție la fiecare scriere pe orders, iar comenzile
+existente sunt migrate de backfill (pe bucăți, reluabil din order_items_backfill).
+Scrierile verifică existența tabelei la fiecare apel cât timp lipsește (fără rezultat negativ
+memorat), deci orice comandă scrisă după crearea tabelei are și rândurile ei. Comenzile scrise
+înainte de creare le acoperă backfill-ul: rulează-l (din nou) după ce tabela există.
+
+Modul de citire (ORDER_ITEMS_CONFIG["read_mode"]):
+    json  - rutele parsează orders.products (comportamentul vechi)
+    dual  - se calculează ambele variante, se servește cea JSON, diferențele sunt numărate
+    table - GROUP BY pe order_items (după ce backfill-ul s-a terminat și dual nu mai vede diferențe)
+
+Backfill:
+    python -m lab2.order_items --dialect mysql --chunk-size 5000
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+
+from .migrations import DIALECTS, table_exists
+
+READ_MODES = ("json", "dual", "table")
+
+# SELECT-ul unei bucăți de backfill; blocajul pe rânduri împiedică o scriere concurentă
+# pe aceeași comandă să fie suprascrisă cu date vechi
+BACKFILL_SELECT = {
+    "sqlite": "SELECT order_id, products FROM {table} WHERE order_id > ? ORDER BY order_id LIMIT {n}",
+    "mysql": "SELECT order_id, products FROM {table} WHERE order_id > %s ORDER BY order_id LIMIT {n} FOR UPDATE",
+    "mssql": "SELECT TOP ({n}) order_id, products FROM {table} WITH (UPDLOCK, ROWLOCK) WHERE order_id > ? ORDER BY order_id",
+}
+
+POPULARITY_SQL = """
+    SELECT oi.product_id, SUM(oi.qty) AS cnt
+    FROM orders o
+    JOIN order_items oi ON oi.order_id = o.order_id
+    WHERE o.created_at >= {ph} AND o.created_at <= {ph}
+    GROUP BY oi.product_id
+"""
+
+
+def _tuple(row):
+    # pymysql cu DictCursor întoarce dicționare, pyodbc / sqlite3 tupluri
+    return tuple(row.values()) if isinstance(row, dict) else tuple(row)
+
+
+def parse_products(products):
+    """Textul JSON (sau lista) din orders.products -> Counter {product_id: qty}; {} dacă e invalid."""
+    try:
+        ids = json.loads(products) if isinstance(products, (str, bytes)) else products
+    except ValueError:
+        return Counter()
+    if isinstance(ids, int):
+        ids = [ids]
+    if not isinstance(ids, list):
+        return Counter()
+    return Counter(pid for pid in ids if isinstance(pid, int) and not isinstance(pid, bool))
+
+
+class OrderItems:
+    """Scrierea și citirea order_items pentru un dialect dat."""
+
+    def __init__(self, dialect, read_mode="json", recheck_after=60.0):
+        if read_mode not in READ_MODES:
+            raise ValueError(f"Mod de citire necunoscut: {read_mode}")
+        self.dialect = dialect
+        self.read_mode = read_mode
+        self.recheck_after = recheck_after
+        self.ph = DIALECTS[dialect]["placeholder"]
+        self._lock = threading.Lock()
+        self._available = None
+        self._checked_at = 0.0
+        self._stats = {"dual_reads": 0, "dual_mismatches": 0, "last_mismatch": None}
+
+    def available(self, cursor, recheck=False):
+        """order_items există? True se memorează definitiv; False se reverifică periodic la citire
+        și mereu cu recheck=True (scrierile nu pot sări peste rânduri pe baza unui răspuns vechi)."""
+        with self._lock:
+            if self._available:
+                return True
+            if (not recheck and self._available is False
+                    and time.monotonic() - self._checked_at < self.recheck_after):
+                return False
+        found = table_exists(cursor, self.dialect, "order_items")
+        with self._lock:
+            self._available = found
+            self._checked_at = time.monotonic()
+        return found
+
+    def delete(self, cursor, order_ids):
+        order_ids = list(order_ids)
+        for i in range(0, len(order_ids), 1000):
+            chunk = order_ids[i:i + 1000]
+            cursor.execute(f"DELETE FROM order_items WHERE order_id IN ({', '.join([self.ph] * len(chunk))})", chunk)
+
+    def write(self, cursor, orders, replace=True):
+        """orders = [(order_id, products)]; înlocuiește rândurile comenzilor în tranzacția curentă."""
+        orders = list(orders)
+        if not orders or not self.available(cursor, recheck=True):
+            return 0
+        if replace:
+            self.delete(cursor, [order_id for order_id, _ in orders])
+        rows = [
+            (order_id, product_id, qty)
+            for order_id, products in orders
+            for product_id, qty in sorted(parse_products(products).items())
+        ]
+        if rows:
+            cursor.executemany(
+                f"INSERT INTO order_items (order_id, product_id, qty) VALUES ({self.ph}, {self.ph}, {self.ph})", rows
+            )
+        return len(rows)
+
+    def popularity(self, cursor, start, end):
+        """{product_id: număr de apariții} pentru comenzile din [start, end], după read_mode."""
+        if self.read_mode == "json" or not self.available(cursor):
+            return self._popularity_json(cursor, start, end)
+        cursor.execute(POPULARITY_SQL.format(ph=self.ph), (start, end))
+        from_table = {pid: int(cnt) for pid, cnt in map(_tuple, cursor.fetchall())}
+        if self.read_mode == "table":
+            return from_table
+        from_json = self._popularity_json(cursor, start, end)
+        with self._lock:
+            self._stats["dual_reads"] += 1
+            if from_json != from_table:
+                self._stats["dual_mismatches"] += 1
+                self._stats["last_mismatch"] = {"start": start, "end": end, "at": int(time.time())}
+        return from_json
+
+    def _popularity_json(self, cursor, start, end):
+        cursor.execute(f"SELECT products FROM orders WHERE created_at >= {self.ph} AND created_at <= {self.ph}",
+                       (start, end))
+        counts = Counter()
+        for (products,) in map(_tuple, cursor.fetchall()):
+            counts.update(parse_products(products))
+        return dict(counts)
+
+    def stats(self):
+        with self._lock:
+            return {"read_mode": self.read_mode, "available": bool(self._available), **self._stats}
+
+    def backfill(self, conn, source_table="orders", chunk_size=5000, log=print):
+        """Migrează comenzile existente pe bucăți; fiecare bucată și progresul ei într-o tranzacție."""
+        cursor = conn.cursor()
+        ph = self.ph
+        cursor.execute(f"SELECT last_id FROM order_items_backfill WHERE source_table = {ph}", (source_table,))
+        row = cursor.fetchone()
+        last_id = _tuple(row)[0] if row else 0
+        if row is None:
+            cursor.execute(
+                f"INSERT INTO order_items_backfill (source_table, last_id, updated_at) VALUES ({ph}, {ph}, {ph})",
+                (source_table, 0, int(time.time())),
+            )
+            conn.commit()
+        log(f"Backfill {source_table}: reluare de la order_id > {last_id}")
+
+        total_orders = total_rows = 0
+        t0 = time.perf_counter()
+        select = BACKFILL_SELECT[self.dialect].format(table=source_table, n=int(chunk_size))
+        while True:
+            cursor.execute(select, (last_id,))
+            orders = [_tuple(r) for r in cursor.fetchall()]
+            if not orders:
+                conn.commit()
+                break
+            total_rows += self.write(cursor, orders)
+            last_id = orders[-1][0]
+            cursor.execute(
+                f"UPDATE order_items_backfill SET last_id = {ph}, updated_at = {ph} WHERE source_table = {ph}",
+                (last_id, int(time.time()), source_table),
+            )
+            conn.commit()
+            total_orders += len(orders)
+            elapsed = time.perf_counter() - t0
+            log(f"  order_id <= {last_id}: {total_orders} comenzi, {total_rows} rânduri "
+                f"({total_orders / max(elapsed, 1e-9):.0f} comenzi/s)")
+        log(f"Backfill {source_table} terminat: {total_orders} comenzi, {total_rows} rânduri")
+        return total_orders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dialect", choices=sorted(DIALECTS), required=True)
+    parser.add_argument("--db", help="fișierul SQLite (implicit lab1/lab1.db)")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    from .migrations import connect
+    conn = connect(args.dialect, args.db)
+    try:
+        items = OrderItems(args.dialect)
+        if not items.available(conn.cursor()):
+            raise SystemExit("Tabela order_items lipsește: rulați întâi python -m lab2.migrations")
+        items.backfill(conn, chunk_size=args.chunk_size)
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
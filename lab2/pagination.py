@@ -0,0 +1,56 @@
+import base64
+import binascii
+import json
+
+from fastapi import HTTPException
+
+# Paginare keyset pe (created_at, order_id), ordine descrescătoare.
+# Cursorul este opac pentru client (base64 peste [created_at, order_id] al ultimului rând),
+# iar pagina N costă la fel ca pagina 1: indexul pe (..., created_at, order_id) este citit
+# direct de la poziția cursorului, fără OFFSET.
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Ordinea stabilă: order_id departajează comenzile create în aceeași secundă
+ORDER_BY = "ORDER BY {p}created_at DESC, {p}order_id DESC"
+
+
+def encode_cursor(created_at, order_id):
+    raw = json.dumps([created_at, order_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token):
+    """Token -> (created_at, order_id); 400 pentru un cursor modificat sau expirat."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        created_at, order_id = json.loads(raw)
+        if not isinstance(created_at, int) or not isinstance(order_id, int):
+            raise ValueError
+    except (ValueError, TypeError, binascii.Error):
+        raise HTTPException(status_code=400, detail="Cursor de paginare invalid.")
+    return created_at, order_id
+
+
+def keyset_filter(token, placeholder="?", prefix=""):
+    """Condiția „după cursor” ca fragment ` AND ...` plus parametrii ei ("" și () fără cursor).
+
+    Forma `created_at <= x AND (created_at < x OR order_id < y)` păstrează un predicat de
+    interval pe created_at, deci SQL Server și MySQL fac seek pe index.
+    """
+    if not token:
+        return "", ()
+    created_at, order_id = decode_cursor(token)
+    p, ph = prefix, placeholder
+    sql = f" AND {p}created_at <= {ph} AND ({p}created_at < {ph} OR {p}order_id < {ph})"
+    return sql, (created_at, created_at, order_id)
+
+
+def split_page(rows, limit):
+    """Interogarea cere limit + 1 rânduri; al (limit+1)-lea arată doar că mai există o pagină."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last["created_at"], last["order_id"])
@@ -0,0 +1,169 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class _Entry:
+    __slots__ = ("value", "computed_at", "versions")
+
+    def __init__(self, value, computed_at, versions):
+        self.value = value
+        self.computed_at = computed_at
+        self.versions = versions
+
+
+class ReportCache:
+    """Cache LRU + TTL pentru rezultatele rapoartelor, cheie (raport, start, end).
+
+    - ttl: cât timp un rezultat e considerat proaspăt;
+    - stale_ttl: până la ce vârstă un rezultat expirat mai poate fi servit imediat,
+      în timp ce un thread din fundal îl recalculează (stale-while-revalidate);
+    - bump(tabelă) incrementează versiunea de date a tabelei; intrările calculate
+      pe o versiune veche a tabelelor de care depind nu mai sunt servite;
+    - cereri identice simultane așteaptă o singură interogare (single-flight).
+
+    Recalculările din fundal rulează pe `executor` (un DBExecutor, ex. cel de rapoarte), deci
+    intră în limita lui de thread-uri și conexiuni; fără executor, pe `refresh_workers` thread-uri
+    proprii (expuse ca refresh_workers, de numărat în dimensionarea pool-ului).
+    """
+
+    def __init__(self, max_entries=128, ttl=60.0, stale_ttl=600.0, refresh_workers=2, executor=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.executor = executor
+        self.refresh_workers = 0 if executor is not None else refresh_workers
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}   # cheie -> (Future, versiunile la pornirea calculului, recalculare din fundal)
+        self._versions = {}   # tabelă -> versiune
+        self._refresher = None
+        if executor is None:
+            self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="report-refresh")
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    # --- Versiuni de date ---
+
+    def bump(self, table):
+        """Marchează datele unei tabele ca modificate (apelat după scrierile CRUD)."""
+        with self._lock:
+            self._versions[table] = self._versions.get(table, 0) + 1
+
+    def _snapshot(self, depends_on):
+        return tuple(self._versions.get(t, 0) for t in depends_on)
+
+    # --- Calcul și stocare ---
+
+    def _store(self, key, value, versions):
+        with self._lock:
+            self._entries[key] = _Entry(value, time.monotonic(), versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _release_inflight(self, key, future):
+        with self._lock:
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+
+    def _run(self, key, compute, versions, future):
+        try:
+            value = compute()
+        except BaseException as e:
+            self._release_inflight(key, future)
+            future.set_exception(e)
+            return
+        self._store(key, value, versions)
+        self._release_inflight(key, future)
+        future.set_result(value)
+
+    def _refresh(self, key, compute, versions, future):
+        self._run(key, compute, versions, future)
+        if future.exception() is not None:
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+
+    def get(self, report, start, end, compute, depends_on=()):
+        key = (report, start, end)
+        now = time.monotonic()
+        with self._lock:
+            versions = self._snapshot(depends_on)
+            entry = self._entries.get(key)
+            if entry is not None and entry.versions != versions:
+                # Datele s-au schimbat de la calcul: intrarea nu mai e validă
+                del self._entries[key]
+                self._counters["invalidations"] += 1
+                entry = None
+
+            if entry is not None:
+                age = now - entry.computed_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return entry.value
+                if age < self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["stale_hits"] += 1
+                    if key not in self._inflight:
+                        future = Future()
+                        self._inflight[key] = (future, versions, True)
+                        self._counters["refreshes"] += 1
+                        if self._refresher is not None:
+                            self._refresher.submit(self._refresh, key, compute, versions, future)
+                        else:
+                            self.executor.submit_nowait(self._refresh, key, compute, versions, future)
+                    return entry.value
+
+            inflight = self._inflight.get(key)
+            # Ne alăturăm unui calcul în curs doar dacă a pornit pe aceeași versiune de date și
+            # rulează deja într-o cerere: o recalculare din fundal poate sta în coada executorului
+            # după chiar thread-urile care ar aștepta-o
+            if inflight is not None and inflight[1] == versions and not inflight[2]:
+                future = inflight[0]
+                self._counters["coalesced"] += 1
+                owner = False
+            else:
+                future = Future()
+                self._inflight[key] = (future, versions, False)
+                self._counters["misses"] += 1
+                owner = True
+
+        if owner:
+            self._run(key, compute, versions, future)
+        return future.result()
+
+    def cached(self, report, depends_on=()):
+        """Decorator pentru rutele de raport cu parametrii (start, end)."""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(start, end):
+                return self.get(report, start, end, lambda: func(start=start, end=end), depends_on)
+            return wrapper
+        return decorator
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "inflight": len(self._inflight),
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl,
+            }
@@ -0,0 +1,256 @@
+"""Rapoarte rulate în fundal: trimitere, interogare periodică, rezultat păstrat pe disc.
+
+Un raport pe un interval larg (ex. product_sales_classification pe un an) poate dura mai mult
+decât are răbdare browserul și ține ocupat un worker de rapoarte pe toată durata. Ca job:
+
+    POST /admin/reports/{name}/jobs?start=..&end=..  -> {"job_id", "status", "deduplicated"}
+    GET  /admin/jobs/{job_id}                        -> stare, progres, iar la final rezultatul
+    GET  /admin/jobs                                 -> statistici și job-urile cunoscute
+
+Job-urile rulează pe thread-urile executorului de rapoarte (db_executor.DBExecutor), cel mult
+`workers` deodată: nu au pool propriu și nu cer conexiuni în plus, iar restul thread-urilor
+rămân rapoartelor interactive. Peste `max_pending` job-uri neterminate se răspunde cu 503; un
+job identic (același raport, aceiași parametri) încă în coadă sau în rulare nu se mai pune o
+dată, se întoarce id-ul existent. Rezultatul (JSON) și metadatele se scriu în `directory` și expiră după `ttl` secunde;
+job-urile terminate supraviețuiesc unei reporniri, cele neterminate sunt marcate eșuate.
+Progresul este estimat din durata rulărilor anterioare ale aceluiași raport.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+
+from fastapi import HTTPException
+
+from .results import apply_shape, dumps
+
+STATUSES = ("queued", "running", "done", "failed")
+
+DEFAULT_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_jobs")
+
+
+def _write_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class ReportJobs:
+    """Registrul rapoartelor rulabile ca job-uri, coada lor și rezultatele de pe disc."""
+
+    def __init__(self, executor, directory=DEFAULT_DIRECTORY, workers=2, max_pending=20, ttl=3600.0, sweep_every=60.0):
+        if workers > executor.max_workers:
+            raise ValueError(f"Job-urile ({workers}) nu pot ocupa mai mult decât executorul '{executor.name}' "
+                             f"({executor.max_workers} thread-uri)")
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.sweep_every = sweep_every
+        self._reports = {}
+        self._lock = threading.Lock()
+        self._jobs = {}       # job_id -> metadate
+        self._active = {}     # (raport, parametri) -> job_id, pentru job-urile neterminate
+        self._durations = {}  # raport -> ultimele durate (secunde), pentru estimarea progresului
+        self._swept_at = 0.0
+        self._executor = executor
+        self._queue = deque()  # (job_id, cheie) în așteptarea unui loc
+        self._running = 0
+        self._closed = False
+        self._counters = {"submitted": 0, "deduplicated": 0, "rejected": 0, "done": 0, "failed": 0, "expired": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def register(self, name, func):
+        """func(**params) -> rezultatul raportului (obiect JSON sau răspuns cu .body)."""
+        self._reports[name] = func
+
+    def reports(self):
+        return sorted(self._reports)
+
+    # --- Fișiere ---
+
+    def _meta_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.meta.json")
+
+    def _result_path(self, job_id):
+        return os.path.join(self.directory, f"{job_id}.json")
+
+    def _save(self, job):
+        _write_atomic(self._meta_path(job["id"]), json.dumps(job, ensure_ascii=False).encode("utf-8"))
+
+    def _load(self):
+        for entry in os.listdir(self.directory):
+            if not entry.endswith(".meta.json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, entry), encoding="utf-8") as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if job.get("status") in ("queued", "running"):
+                # Procesul care îl rula s-a oprit
+                job.update(status="failed", error="Întrerupt de repornirea serverului",
+                           finished_at=time.time(), expires_at=time.time() + self.ttl)
+                self._save(job)
+            self._jobs[job["id"]] = job
+        self._sweep(force=True)
+
+    def _sweep(self, force=False):
+        now = time.time()
+        with self._lock:
+            if not force and now - self._swept_at < self.sweep_every:
+                return
+            self._swept_at = now
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job.get("expires_at") is not None and job["expires_at"] <= now]
+            for job_id in expired:
+                del self._jobs[job_id]
+            self._counters["expired"] += len(expired)
+        for job_id in expired:
+            for path in (self._meta_path(job_id), self._result_path(job_id)):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    # --- Trimitere și rulare ---
+
+    def submit(self, name, **params):
+        """(job_id, deduplicat): pune raportul în coadă sau întoarce job-ul identic încă neterminat."""
+        if name not in self._reports:
+            raise HTTPException(status_code=404, detail=f"Raport necunoscut: {name}")
+        self._sweep()
+        key = (name, json.dumps(params, sort_keys=True))
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id is not None:
+                self._counters["deduplicated"] += 1
+                return job_id, True
+            if len(self._active) >= self.max_pending:
+                self._counters["rejected"] += 1
+                raise HTTPException(status_code=503, detail=f"Prea multe job-uri în așteptare ({self.max_pending}).")
+            job = {
+                "id": uuid.uuid4().hex, "report": name, "params": params, "status": "queued",
+                "submitted_at": time.time(), "started_at": None, "finished_at": None, "expires_at": None,
+                "duration_ms": None, "result_bytes": None, "error": None,
+            }
+            self._jobs[job["id"]] = job
+            self._active[key] = job["id"]
+            self._counters["submitted"] += 1
+        self._save(job)
+        with self._lock:
+            self._queue.append((job["id"], key))
+        self._dispatch()
+        return job["id"], False
+
+    def _dispatch(self):
+        """Trimite job-uri din coadă pe executor cât timp sunt sub `workers` în rulare."""
+        with self._lock:
+            ready = []
+            while self._queue and self._running < self.workers and not self._closed:
+                ready.append(self._queue.popleft())
+                self._running += 1
+        for job_id, key in ready:
+            self._executor.submit_nowait(self._run, job_id, key)
+
+    def _run(self, job_id, key):
+        try:
+            self._execute(job_id, key)
+        finally:
+            with self._lock:
+                self._running -= 1
+            self._dispatch()
+
+    def _execute(self, job_id, key):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status="running", started_at=time.time())
+            snapshot = dict(job)
+        self._save(snapshot)
+        try:
+            result = self._reports[job["report"]](**job["params"])
+            # Rutele cu @shaped întorc deja răspunsul serializat; restul se serializează aici
+            body = result.body if hasattr(result, "body") else dumps(apply_shape(result, "rows"))
+            _write_atomic(self._result_path(job_id), body)
+            error = None
+        except Exception as e:
+            body, error = None, str(getattr(e, "detail", e))
+        finished = time.time()
+        with self._lock:
+            duration = finished - job["started_at"]
+            job.update(status="failed" if error else "done", finished_at=finished, expires_at=finished + self.ttl,
+                       duration_ms=round(duration * 1000, 1), error=error,
+                       result_bytes=None if body is None else len(body))
+            self._active.pop(key, None)
+            self._counters["failed" if error else "done"] += 1
+            if not error:
+                self._durations.setdefault(job["report"], deque(maxlen=20)).append(duration)
+            snapshot = dict(job)
+        self._save(snapshot)
+
+    # --- Interogare ---
+
+    def _progress(self, job, now):
+        if job["status"] in ("done", "failed"):
+            return {"fraction": 1.0}
+        if job["status"] == "queued":
+            ahead = sum(1 for other in self._jobs.values()
+                        if other["status"] == "queued" and other["submitted_at"] < job["submitted_at"])
+            return {"fraction": 0.0, "queue_position": ahead + 1}
+        elapsed = now - job["started_at"]
+        history = self._durations.get(job["report"])
+        estimate = sum(history) / len(history) if history else None
+        return {
+            "fraction": round(min(0.95, elapsed / estimate), 2) if estimate else None,
+            "elapsed_ms": round(elapsed * 1000, 1),
+            "estimated_ms": round(estimate * 1000, 1) if estimate else None,
+        }
+
+    def status(self, job_id):
+        """Metadatele job-ului, cu progresul; HTTPException 404 dacă nu există (sau a expirat)."""
+        self._sweep()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise HTTPException(status_code=404, detail=f"Job necunoscut sau expirat: {job_id}")
+            return {**job, "progress": self._progress(job, time.time())}
+
+    def result(self, job_id):
+        """JSON-ul rezultatului (bytes), citit de pe disc."""
+        try:
+            with open(self._result_path(job_id), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail=f"Rezultatul job-ului {job_id} a expirat")
+
+    def response_body(self, job_id):
+        """Starea job-ului ca JSON; la final include rezultatul, copiat fără decodare."""
+        job = self.status(job_id)
+        body = dumps(job)
+        if job["status"] != "done":
+            return body
+        return body[:-1] + b',"result":' + self.result(job_id) + b"}"
+
+    def stats(self):
+        self._sweep()
+        with self._lock:
+            jobs = sorted(self._jobs.values(), key=lambda j: j["submitted_at"], reverse=True)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "ttl": self.ttl,
+                "reports": self.reports(),
+                "by_status": {s: sum(1 for j in jobs if j["status"] == s) for s in STATUSES},
+                **self._counters,
+                "jobs": [{k: j[k] for k in ("id", "report", "params", "status", "submitted_at", "duration_ms")}
+                         for j in jobs[:50]],
+            }
+
+    def shutdown(self):
+        """Job-urile din coadă nu mai pornesc (la repornire sunt marcate eșuate)."""
+        with self._lock:
+            self._closed = True
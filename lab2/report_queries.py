@@ -0,0 +1,128 @@
+from datetime import datetime, timedelta
+
+# Interogările rapoartelor DWH: text SQL constant, parametrizat (?), filtrat direct pe
+# FactOrderItems.time_id (YYYYMMDD). Același text la fiecare apel => SQL Server refolosește
+# planul din cache (sp_prepexec), iar predicatul pe time_id poate folosi un index.
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _utc_date(ts):
+    return (_EPOCH + timedelta(seconds=ts)).date()
+
+
+def date_to_time_id(d):
+    """date(2024, 3, 9) -> 20240309"""
+    return d.year * 10000 + d.month * 100 + d.day
+
+
+def time_id_range(start, end):
+    """Convertește intervalul UNIX [start, end] în intervalul inclusiv (time_id_min, time_id_max).
+
+    Păstrează exact semantica vechiului filtru
+    `DT.full_date >= DATEADD(second, start, '1970-01-01') AND DT.full_date <= DATEADD(second, end, ...)`:
+    full_date este o dată (ora 00:00 UTC), deci ziua lui `start` intră doar dacă `start`
+    cade fix la miezul nopții, iar ziua lui `end` intră întotdeauna.
+    """
+    first = _utc_date(start)
+    if start % 86400:
+        first += timedelta(days=1)
+    last = _utc_date(end)
+    return date_to_time_id(first), date_to_time_id(last)
+
+
+REPORT_SQL = {
+    # 1. Vânzări per produs (numele vin din cache-ul de dimensiuni)
+    "top_low_sales": """
+        SELECT
+            FOI.product_id,
+            SUM(FOI.sales_amount) AS TotalSales
+        FROM FactOrderItems FOI
+        WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+        GROUP BY FOI.product_id
+        ORDER BY TotalSales DESC;
+    """,
+    # 2. Trimestrul cu cel mai mare profit (anul și trimestrul derivate din time_id, fără JOIN pe DimTime)
+    "top_quarter_profit": """
+        SELECT TOP 1
+            CONCAT(FOI.time_id / 10000, '-Q', ((FOI.time_id / 100) % 100 + 2) / 3) AS Quarter,
+            SUM(FOI.sales_amount * FOI.profit_margin) AS TotalProfit
+        FROM FactOrderItems FOI
+        WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+        GROUP BY FOI.time_id / 10000, ((FOI.time_id / 100) % 100 + 2) / 3
+        ORDER BY TotalProfit DESC;
+    """,
+    # 3. Top 10 utilizatori după comenzi distincte
+    "top_10_users_orders": """
+        SELECT TOP 10
+            FOI.user_id,
+            COUNT(DISTINCT FOI.order_id) AS DistinctOrderCount
+        FROM FactOrderItems FOI
+        WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+        GROUP BY FOI.user_id
+        ORDER BY DistinctOrderCount DESC;
+    """,
+    # 4. Discount mediu weekend vs zi lucrătoare (DimTime rămâne pentru is_weekend)
+    "avg_discount_weekend_vs_weekday": """
+        SELECT
+            CASE
+                WHEN DT.is_weekend = 1 THEN 'Weekend'
+                ELSE 'Zi de Saptamana'
+            END AS Perioada,
+            AVG(FOI.discount_amount / FOI.sales_amount) * 100 AS Procent_Mediu_Discount
+        FROM FactOrderItems FOI
+        JOIN DimTime DT ON FOI.time_id = DT.time_id
+        WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+        AND FOI.sales_amount > 0
+        GROUP BY DT.is_weekend
+        ORDER BY DT.is_weekend DESC;
+    """,
+    # 5. Clasificarea produselor (Top / Average / Low Seller)
+    "product_sales_classification": """
+        WITH ProductSales AS (
+            SELECT
+                FOI.product_id,
+                SUM(FOI.sales_amount) AS TotalSales
+            FROM FactOrderItems FOI
+            WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+            GROUP BY FOI.product_id
+        ),
+        SalesStats AS (
+            SELECT AVG(TotalSales) AS AvgSales, MAX(TotalSales) AS MaxSales FROM ProductSales
+        )
+        SELECT
+            PS.product_id,
+            PS.TotalSales,
+            CASE
+                WHEN PS.TotalSales >= (SS.AvgSales + (SS.MaxSales - SS.AvgSales) / 2) THEN 'Top Seller'
+                WHEN PS.TotalSales >= SS.AvgSales THEN 'Average Seller'
+                ELSE 'Low Seller'
+            END AS Classification
+        FROM ProductSales PS
+        CROSS JOIN SalesStats SS
+        ORDER BY PS.TotalSales DESC;
+    """,
+    # Dashboard: agregatele parțiale pentru toate cele cinci rapoarte, într-o singură citire
+    # (per produs, per utilizator, per zi; trimestrul și weekendul se derivă din time_id)
+    "dashboard": """
+        SELECT
+            CASE
+                WHEN GROUPING(FOI.product_id) = 0 THEN 'P'
+                WHEN GROUPING(FOI.user_id) = 0 THEN 'U'
+                ELSE 'D'
+            END AS grp,
+            CASE
+                WHEN GROUPING(FOI.product_id) = 0 THEN FOI.product_id
+                WHEN GROUPING(FOI.user_id) = 0 THEN FOI.user_id
+                ELSE FOI.time_id
+            END AS key_id,
+            SUM(FOI.sales_amount) AS sales_sum,
+            SUM(FOI.sales_amount * FOI.profit_margin) AS profit_sum,
+            SUM(CASE WHEN FOI.sales_amount > 0 THEN FOI.discount_amount / FOI.sales_amount END) AS ratio_sum,
+            COUNT(CASE WHEN FOI.sales_amount > 0 THEN FOI.discount_amount / FOI.sales_amount END) AS ratio_count,
+            COUNT(DISTINCT FOI.order_id) AS order_count
+        FROM FactOrderItems FOI
+        WHERE FOI.time_id >= ? AND FOI.time_id <= ?
+        GROUP BY GROUPING SETS ((FOI.product_id), (FOI.user_id), (FOI.time_id));
+    """,
+}
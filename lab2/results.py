@@ -0,0 +1,147 @@
+import functools
+import inspect
+import time
+from decimal import Decimal
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+
+from .metrics import record_rows, timed
+
+try:
+    import orjson
+except ImportError:  # fără orjson se folosește json din biblioteca standard
+    orjson = None
+    import json
+
+# Stratul de rezultate: rândurile rămân tupluri (columns + data), iar JSON-ul se scrie
+# direct cu orjson; dicționarele per rând se construiesc doar pentru forma "rows".
+
+SHAPES = ("rows", "columnar")
+
+
+def _decimal(obj):
+    # Ca jsonable_encoder din FastAPI: MONEY / DECIMAL fără zecimale -> int, altfel float
+    return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return _decimal(obj)
+    if isinstance(obj, Rows):
+        return obj.dicts()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Tip neserializabil: {type(obj).__name__}")
+
+
+def _default_std(obj):
+    if isinstance(obj, Decimal):
+        return _decimal(obj)
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    if isinstance(obj, tuple):
+        return list(obj)
+    return _default(obj)
+
+
+def dumps(content):
+    """Obiect Python -> JSON (bytes, UTF-8)."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default_std, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Răspunsul JSON implicit al aplicației, serializat cu orjson (Decimal inclus)."""
+
+    def render(self, content):
+        with timed("serialize"):
+            return dumps(content)
+
+
+class Rows:
+    """Rezultatul unei interogări: numele coloanelor și rândurile ca tupluri."""
+
+    __slots__ = ("columns", "data")
+
+    def __init__(self, columns, data):
+        self.columns = tuple(columns)
+        self.data = data
+
+    @classmethod
+    def fetch(cls, cursor):
+        columns = [c[0] for c in cursor.description]
+        # pyodbc.Row nu este serializabil direct; tuple() e mult mai ieftin decât dict(zip())
+        return cls(columns, [tuple(row) for row in cursor.fetchall()])
+
+    def __len__(self):
+        return len(self.data)
+
+    def row(self, index):
+        return dict(zip(self.columns, self.data[index]))
+
+    def dicts(self):
+        columns = self.columns
+        return [dict(zip(columns, row)) for row in self.data]
+
+    def columnar(self):
+        return {"columns": self.columns, "data": self.data}
+
+    def replace_column(self, column, new_name, mapping, missing="ID Necunoscut {}"):
+        """Coloana `column` (id) devine `new_name` (nume din `mapping`), mutată pe prima poziție."""
+        pos = self.columns.index(column)
+        rest = [i for i in range(len(self.columns)) if i != pos]
+        columns = (new_name,) + tuple(self.columns[i] for i in rest)
+        data = []
+        for row in self.data:
+            key = row[pos]
+            name = mapping.get(key)
+            data.append((missing.format(key) if name is None else name,) + tuple(row[i] for i in rest))
+        return Rows(columns, data)
+
+
+def execute_rows(cursor, query, params=(), slow_log=None):
+    """Execută interogarea și întoarce Rows; `slow_log` (SlowQueryLog) primește durata totală."""
+    started = time.perf_counter()
+    with timed("execute"):
+        cursor.execute(query, params)
+    with timed("fetch"):
+        rows = Rows.fetch(cursor)
+    record_rows(len(rows))
+    if slow_log is not None:
+        slow_log.observe(cursor, query, params, time.perf_counter() - started, rows=len(rows))
+    return rows
+
+
+def apply_shape(content, shape):
+    """Înlocuiește fiecare Rows din răspuns cu forma cerută (listă de obiecte sau coloane + date)."""
+    if isinstance(content, Rows):
+        return content.columnar() if shape == "columnar" else content.dicts()
+    if isinstance(content, dict):
+        return {k: apply_shape(v, shape) for k, v in content.items()}
+    if isinstance(content, list):
+        return [apply_shape(v, shape) for v in content]
+    return content
+
+
+def shaped(func):
+    """Decorator pentru rute care întorc Rows: adaugă `?shape=rows|columnar` și răspunde direct.
+
+    Răspunsul este construit aici (FastJSONResponse), deci FastAPI nu mai parcurge rezultatul
+    cu jsonable_encoder; un cache de sub decorator păstrează rezultatul independent de formă.
+    """
+    signature = inspect.signature(func)
+    shape_param = inspect.Parameter(
+        "shape", inspect.Parameter.KEYWORD_ONLY,
+        default=Query("rows", description="rows (listă de obiecte) sau columnar ({columns, data})"),
+    )
+
+    @functools.wraps(func)
+    def wrapper(*args, shape="rows", **kwargs):
+        if shape not in SHAPES:
+            raise HTTPException(status_code=400, detail=f"Formă necunoscută: {shape} (rows sau columnar)")
+        return FastJSONResponse(apply_shape(func(*args, **kwargs), shape))
+
+    wrapper.__signature__ = signature.replace(parameters=[*signature.parameters.values(), shape_param])
+    return wrapper
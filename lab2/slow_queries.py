@@ -0,0 +1,253 @@
+"""Jurnalul interogărilor lente, cu captura planului de execuție.
+
+Orice instrucțiune care depășește SLOW_QUERY_CONFIG["threshold_ms"] (prin execute_query,
+execute_rows sau calea CRUD) este scrisă ca o linie JSON în fișierul rotativ configurat:
+amprenta SQL normalizată, parametrii redactați (doar tipul / lungimea), durata, rândurile și
+ruta apelantă. Prima dată când o amprentă depășește pragul, se capturează și planul:
+SET SHOWPLAN_XML ON pe SQL Server, EXPLAIN FORMAT=JSON pe MySQL, EXPLAIN QUERY PLAN pe SQLite
+(toate fără a executa instrucțiunea).
+
+    GET /admin/diagnostics/slow-queries                    -> număr, p95, max per amprentă
+    GET /admin/diagnostics/slow-queries?fingerprint=<id>   -> detaliile amprentei, cu planul
+"""
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import re
+import threading
+import time
+from collections import deque
+from decimal import Decimal
+
+from .metrics import current_route
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "slow_queries.jsonl")
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING = re.compile(r"N?'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%s|\?")
+# (?, ?, ?) -> (?+) și VALUES (?, ?), (?, ?) -> VALUES (?, ?), ...
+_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROWS = re.compile(r"(\((?:[^()]|\(\?\+\))*\))(?:\s*,\s*\1)+")
+_SPACE = re.compile(r"\s+")
+
+# Captura planului pe dialect: (instrucțiuni înainte, prefixul interogării, instrucțiuni după)
+PLAN_CAPTURE = {
+    "mssql": (["SET SHOWPLAN_XML ON"], "", ["SET SHOWPLAN_XML OFF"]),
+    "mysql": ([], "EXPLAIN FORMAT=JSON ", []),
+    "sqlite": ([], "EXPLAIN QUERY PLAN ", []),
+}
+
+
+def normalize(sql):
+    """SQL-ul fără literali, comentarii și liste de lungime variabilă (aceeași formă -> aceeași amprentă)."""
+    sql = _COMMENT.sub(" ", sql)
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _SPACE.sub(" ", sql).strip().rstrip(";")
+    sql = _LIST.sub("(?+)", sql)
+    return _ROWS.sub(r"\1, ...", sql)
+
+
+def fingerprint(sql):
+    normalized = normalize(sql)
+    return hashlib.sha1(normalized.encode("utf-8")).hexdigest()[:16], normalized
+
+
+def _redact_value(value):
+    if value is None or isinstance(value, bool):
+        return value
+    if isinstance(value, int):
+        return "<int>"
+    if isinstance(value, (float, Decimal)):
+        return "<num>"
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__}:{len(value)}>"
+    return f"<{type(value).__name__}>"
+
+
+def redact(params, many=False):
+    """Parametrii fără valori; la executemany doar numărul de rânduri și forma primului."""
+    if params is None:
+        return None
+    if many:
+        params = list(params)
+        return {"rows": len(params), "first": redact(params[0]) if params else None}
+    if isinstance(params, dict):
+        return {k: _redact_value(v) for k, v in params.items()}
+    if isinstance(params, (list, tuple)):
+        return [_redact_value(v) for v in params]
+    return _redact_value(params)
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class SlowQueryLog:
+    """Pragul, fișierul JSONL rotativ și agregatele per amprentă (ținute în memorie)."""
+
+    def __init__(self, dialect, threshold_ms=500, path=DEFAULT_PATH, max_bytes=10 * 1024 * 1024,
+                 backups=5, samples=500, capture_plans=True):
+        self.dialect = dialect
+        self.threshold = threshold_ms / 1000.0
+        self.samples = samples
+        self.capture_plans = capture_plans
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._logger = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups,
+                                                           encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            self._logger = logging.getLogger(f"{__name__}.{dialect}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.handlers[:] = [handler]
+
+    def observe(self, cursor, sql, params, seconds, rows=None, many=False, plan_ready=True):
+        """Apelat după fiecare instrucțiune; nu face nimic sub prag.
+
+        plan_ready=False dacă cursorul are încă rezultate necitite (conexiunea e ocupată):
+        planul va fi capturat la următoarea depășire.
+        """
+        if seconds < self.threshold:
+            return
+        fp, normalized = fingerprint(sql)
+        route = current_route() or "-"
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                stats = self._stats[fp] = {
+                    "fingerprint": fp, "sql": normalized, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "durations": deque(maxlen=self.samples), "routes": {}, "first_seen": int(time.time()),
+                    "last_seen": None, "plan": None, "plan_error": None, "plan_pending": True,
+                }
+            ms = seconds * 1000
+            stats["count"] += 1
+            stats["total_ms"] += ms
+            stats["max_ms"] = max(stats["max_ms"], ms)
+            stats["durations"].append(ms)
+            stats["routes"][route] = stats["routes"].get(route, 0) + 1
+            stats["last_seen"] = int(time.time())
+            capture = self.capture_plans and plan_ready and stats["plan_pending"]
+            if capture:
+                stats["plan_pending"] = False
+
+        entry = {
+            "ts": int(time.time()), "fingerprint": fp, "sql": normalized, "params": redact(params, many),
+            "duration_ms": round(seconds * 1000, 1), "rows": rows, "route": route,
+        }
+        if capture:
+            # La executemany planul este același pentru toate rândurile: îl estimăm pe primul
+            plan_params = (params[0] if params else None) if many else params
+            plan, error = self.capture_plan(cursor, sql, plan_params)
+            with self._lock:
+                stats["plan"], stats["plan_error"] = plan, error
+            entry["plan"] = plan
+            if error:
+                entry["plan_error"] = error
+        if self._logger is not None:
+            self._logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+
+    def capture_plan(self, cursor, sql, params):
+        """(plan, eroare): planul estimat, citit pe un cursor nou al aceleiași conexiuni."""
+        before, prefix, after = PLAN_CAPTURE[self.dialect]
+        if params is not None and self.dialect != "mssql" and not isinstance(params, (list, tuple, dict)):
+            params = (params,)
+        try:
+            plan_cursor = getattr(cursor, "connection", None).cursor()
+        except Exception as e:
+            return None, f"Fără conexiune pentru plan: {e}"
+        try:
+            for statement in before:
+                plan_cursor.execute(statement)
+            try:
+                if params:
+                    plan_cursor.execute(prefix + sql, params)
+                else:
+                    plan_cursor.execute(prefix + sql)
+                rows = plan_cursor.fetchall()
+            finally:
+                for statement in after:
+                    plan_cursor.execute(statement)
+        except Exception as e:
+            return None, str(e)
+        finally:
+            try:
+                plan_cursor.close()
+            except Exception:
+                pass
+        rows = [tuple(r.values()) if isinstance(r, dict) else tuple(r) for r in rows]
+        if self.dialect == "sqlite":
+            return "\n".join(str(r[-1]) for r in rows), None
+        return "\n".join(str(r[0]) for r in rows if r), None
+
+    def cursor(self, cursor):
+        """Cursor care cronometrează execute / executemany (calea CRUD)."""
+        return LoggedCursor(cursor, self)
+
+    def summary(self):
+        with self._lock:
+            items = [dict(s, durations=list(s["durations"]), routes=dict(s["routes"])) for s in self._stats.values()]
+        result = []
+        for s in sorted(items, key=lambda s: s["total_ms"], reverse=True):
+            result.append({
+                "fingerprint": s["fingerprint"], "sql": s["sql"], "count": s["count"],
+                "total_ms": round(s["total_ms"], 1), "avg_ms": round(s["total_ms"] / s["count"], 1),
+                "p95_ms": round(_percentile(s["durations"], 0.95), 1), "max_ms": round(s["max_ms"], 1),
+                "routes": s["routes"], "first_seen": s["first_seen"], "last_seen": s["last_seen"],
+                "has_plan": s["plan"] is not None,
+            })
+        return {"threshold_ms": self.threshold * 1000, "fingerprints": result}
+
+    def details(self, fp):
+        with self._lock:
+            stats = self._stats.get(fp)
+            if stats is None:
+                return None
+            return {k: (list(v) if isinstance(v, deque) else v) for k, v in stats.items() if k != "plan_pending"}
+
+
+class LoggedCursor:
+    """Proxy peste cursorul driverului; restul atributelor (fetch*, description, fast_executemany) sunt delegate."""
+
+    def __init__(self, cursor, log):
+        object.__setattr__(self, "_cursor", cursor)
+        object.__setattr__(self, "_log", log)
+
+    def execute(self, sql, *args):
+        started = time.perf_counter()
+        result = self._cursor.execute(sql, *args)
+        params = args[0] if len(args) == 1 else (list(args) or None)
+        self._observe(sql, params, time.perf_counter() - started, many=False)
+        # pyodbc întoarce cursorul (cursor.execute(...).fetchone()); păstrăm proxy-ul
+        return self if result is self._cursor else result
+
+    def executemany(self, sql, seq):
+        seq = list(seq)
+        started = time.perf_counter()
+        result = self._cursor.executemany(sql, seq)
+        self._observe(sql, seq, time.perf_counter() - started, many=True)
+        return self if result is self._cursor else result
+
+    def _observe(self, sql, params, seconds, many):
+        rowcount = getattr(self._cursor, "rowcount", -1)
+        # Rezultate necitite (SELECT, OUTPUT) țin conexiunea ocupată: planul se amână
+        self._log.observe(self._cursor, sql, params, seconds, rows=rowcount if rowcount >= 0 else None,
+                          many=many, plan_ready=self._cursor.description is None)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._cursor, name, value)
+
+    def __iter__(self):
+        return iter(self._cursor)
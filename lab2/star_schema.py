@@ -0,0 +1,93 @@
+"""Schema stea a depozitului de date (DimTime, DimLocation, DimStatus, DimProduct, DimUser,
+DimOrder, FactOrderItems): DDL-ul portabil și ordinea coloanelor la inserare.
+
+Folosită de generatorul de date (datagen.py) și de ETL-ul incremental (etl.py).
+"""
+from .migrations import Table
+from .report_queries import date_to_time_id
+
+# Tipuri comune celor trei dialecte; tabelele existente (ex. cu IDENTITY) sunt folosite ca atare
+TABLES = {
+    "DimTime": Table("DimTime", """
+        CREATE TABLE DimTime (
+            time_id INT NOT NULL PRIMARY KEY,
+            full_date DATE NOT NULL,
+            quarter INT NOT NULL,
+            year INT NOT NULL,
+            is_weekend INT NOT NULL
+        )
+    """),
+    "DimLocation": Table("DimLocation", """
+        CREATE TABLE DimLocation (
+            location_id INT NOT NULL PRIMARY KEY,
+            country VARCHAR(100) NOT NULL,
+            region VARCHAR(100) NOT NULL
+        )
+    """),
+    "DimStatus": Table("DimStatus", """
+        CREATE TABLE DimStatus (
+            status_id INT NOT NULL PRIMARY KEY,
+            status_name VARCHAR(50) NOT NULL,
+            is_final INT NOT NULL
+        )
+    """),
+    "DimProduct": Table("DimProduct", """
+        CREATE TABLE DimProduct (
+            product_id INT NOT NULL PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            price DECIMAL(12, 2) NOT NULL
+        )
+    """),
+    "DimUser": Table("DimUser", """
+        CREATE TABLE DimUser (
+            user_id INT NOT NULL PRIMARY KEY,
+            nume VARCHAR(100) NOT NULL,
+            location_id INT,
+            created_at INT
+        )
+    """),
+    "DimOrder": Table("DimOrder", """
+        CREATE TABLE DimOrder (
+            order_id INT NOT NULL PRIMARY KEY,
+            user_id INT NOT NULL,
+            products VARCHAR(255) NOT NULL,
+            order_status VARCHAR(50) NOT NULL,
+            status_id INT NOT NULL,
+            order_public_id VARCHAR(36) NOT NULL,
+            created_at INT NOT NULL,
+            created_time_id INT NOT NULL
+        )
+    """),
+    "FactOrderItems": Table("FactOrderItems", """
+        CREATE TABLE FactOrderItems (
+            fact_id INT NOT NULL PRIMARY KEY,
+            order_id INT NOT NULL,
+            user_id INT NOT NULL,
+            product_id INT NOT NULL,
+            time_id INT NOT NULL,
+            status_id INT NOT NULL,
+            location_id INT NOT NULL,
+            sales_amount DECIMAL(12, 2) NOT NULL,
+            profit_margin DECIMAL(6, 4) NOT NULL,
+            discount_amount DECIMAL(12, 2),
+            metadata VARCHAR(255)
+        )
+    """),
+}
+
+COLUMNS = {
+    "DimTime": ("time_id", "full_date", "quarter", "year", "is_weekend"),
+    "DimLocation": ("location_id", "country", "region"),
+    "DimStatus": ("status_id", "status_name", "is_final"),
+    "DimProduct": ("product_id", "name", "price"),
+    "DimUser": ("user_id", "nume", "location_id", "created_at"),
+    "DimOrder": ("order_id", "user_id", "products", "order_status", "status_id", "order_public_id",
+                 "created_at", "created_time_id"),
+    "FactOrderItems": ("fact_id", "order_id", "user_id", "product_id", "time_id", "status_id", "location_id",
+                       "sales_amount", "profit_margin", "discount_amount", "metadata"),
+}
+
+
+def time_row(d):
+    """Rândul DimTime al unei zile (ordinea din COLUMNS["DimTime"])."""
+    return date_to_time_id(d), d.isoformat(), (d.month - 1) // 3 + 1, d.year, int(d.weekday() >= 5)
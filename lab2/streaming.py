@@ -0,0 +1,177 @@
+import asyncio
+import csv
+import io
+import json
+import threading
+import weakref
+from decimal import Decimal
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+
+from .db_executor import DBExecutor
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return str(obj)
+
+
+def encode_ndjson(columns, rows):
+    return "".join(
+        json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=_json_default) + "\n"
+        for row in rows
+    ).encode("utf-8")
+
+
+def encode_csv(columns, rows, header=False):
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    if header:
+        writer.writerow(columns)
+    writer.writerows(rows)
+    return buf.getvalue().encode("utf-8")
+
+
+class ExportStreams:
+    """Limita exporturilor simultane și executorul lor dedicat.
+
+    Un export ține o conexiune din pool (și cursorul deschis) cât timp clientul descarcă.
+    Fără limită, câțiva clienți lenți ar epuiza pool-ul pentru toate celelalte rute; peste
+    `max_streams` exporturi active se răspunde imediat cu 503. Executorul are câte un thread
+    per export permis, deci un fetchmany() nu așteaptă niciodată în coadă după cereri care
+    vor o conexiune (exporturile se numără în dimensionarea pool-ului, vezi db_config.py).
+    """
+
+    def __init__(self, max_streams=2):
+        self.max_streams = max_streams
+        self.executor = DBExecutor("exports", max_streams, max_queue=0)
+        self._lock = threading.Lock()
+        self._active = 0
+        self._counters = {"started": 0, "rejected": 0}
+
+    def _acquire(self):
+        with self._lock:
+            if self._active >= self.max_streams:
+                self._counters["rejected"] += 1
+                raise HTTPException(status_code=503, detail=f"Prea multe exporturi simultane ({self.max_streams}).")
+            self._active += 1
+            self._counters["started"] += 1
+        released = [False]
+
+        def release():
+            with self._lock:
+                if not released[0]:
+                    released[0] = True
+                    self._active -= 1
+        return release
+
+    def stats(self):
+        with self._lock:
+            return {"max_streams": self.max_streams, "active": self._active, **self._counters}
+
+
+def stream_query(streams, get_db, query, params=(), fmt="ndjson", batch_size=1000, transform=None):
+    """Ocupă un loc de export (HTTPException 503 dacă nu există) și întoarce generatorul rezultatului.
+
+    Locul se eliberează la terminarea generatorului sau, dacă răspunsul nu a fost trimis
+    niciodată, când generatorul este colectat.
+    """
+    release = streams._acquire()
+    body = _stream(streams.executor, get_db, query, params, fmt, batch_size, transform, release)
+    weakref.finalize(body, release)
+    return body
+
+
+async def _stream(executor, get_db, query, params, fmt, batch_size, transform, release):
+    """Generator async: execută interogarea și emite rezultatul în loturi de `batch_size` rânduri.
+
+    Cursorul este citit cu fetchmany() pe `executor`, deci memoria rămâne constantă indiferent
+    de numărul de rânduri. Dacă clientul se deconectează, interogarea este anulată pe server
+    (cursor.cancel()), iar conexiunea se întoarce în pool abia după ce apelul aflat în curs pe
+    thread (execute / fetchmany) s-a terminat: cursorul nu este închis cât încă este folosit.
+    transform(columns, rows) -> (columns, rows) poate înlocui coloane (ex. id -> nume).
+    """
+    # Apelurile pe executor sunt protejate cu shield: la deconectare, generatorul nu mai așteaptă,
+    # dar apelul își termină treaba pe thread, iar `pending` rămâne de așteptat înainte de închidere
+    borrow = asyncio.ensure_future(executor.run_always(get_db))
+    try:
+        conn = await asyncio.shield(borrow)
+    except BaseException:
+        borrow.add_done_callback(lambda done: _return_borrowed(done, executor, release))
+        raise
+    cursor = conn.cursor()
+    pending = None
+    finished = False
+    try:
+        pending = asyncio.ensure_future(executor.run_always(cursor.execute, query, params))
+        await asyncio.shield(pending)
+        columns = [c[0] for c in cursor.description]
+        first = True
+        while True:
+            pending = asyncio.ensure_future(executor.run_always(cursor.fetchmany, batch_size))
+            rows = await asyncio.shield(pending)
+            if transform is not None:
+                columns_out, rows = transform(columns, rows)
+            else:
+                columns_out = columns
+            if fmt == "csv":
+                if first or rows:
+                    yield encode_csv(columns_out, rows, header=first)
+            elif rows:
+                yield encode_ndjson(columns_out, rows)
+            first = False
+            if not rows:
+                break
+        finished = True
+    finally:
+        if not finished:
+            # Client deconectat (sau eroare): oprim interogarea în curs pe server; cancel() este
+            # singurul apel sigur cât timp execute / fetchmany încă rulează pe cursor
+            cancel = getattr(cursor, "cancel", None)
+            if cancel is not None:
+                try:
+                    cancel()
+                except Exception:
+                    pass
+        # Închiderea se face în fundal, după apelul în curs (dacă există)
+        if pending is None or pending.done():
+            executor.submit_nowait(_close, cursor, conn, release)
+        else:
+            pending.add_done_callback(lambda _: executor.submit_nowait(_close, cursor, conn, release))
+
+
+def _return_borrowed(borrow, executor, release):
+    # Împrumutul a continuat după deconectare: conexiunea primită se returnează în pool
+    if borrow.cancelled() or borrow.exception() is not None:
+        release()
+        return
+    executor.submit_nowait(_close, None, borrow.result(), release)
+
+
+def _close(cursor, conn, release):
+    if cursor is not None:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+    try:
+        conn.close()
+    finally:
+        release()
+
+
+def streaming_response(body, fmt, filename):
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format necunoscut: {fmt} (ndjson sau csv)")
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
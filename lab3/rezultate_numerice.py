@@ -1,10 +1,18 @@
+import argparse
 import os
 import json
+import sys
+import time
 import pandas as pd
 from sqlalchemy import create_engine, text
 from urllib.parse import quote_plus
 from decimal import Decimal
 
+try:
+    import orjson  # parsare (și NDJSON) mai rapide; fără el se folosește json
+except ImportError:
+    orjson = None
+
 conn_str = (
     "Driver={ODBC Driver 17 for SQL Server};"
     "Server=DESKTOPPAV;"
@@ -17,6 +25,10 @@ OUTPUT_DIR = "json_reports"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
+# Rânduri citite de la server per lot (rezultatul nu este niciodată încărcat integral)
+BATCH_SIZE = 1000
+FORMATS = ("json", "ndjson")
+
 # Clasă pentru a permite serializarea obiectelor Decimal (MONEY din SQL Server) în JSON
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -24,48 +36,110 @@ class DecimalEncoder(json.JSONEncoder):
             return float(obj)
         return super(DecimalEncoder, self).default(obj)
 
-def process_and_save(file_name, query, description):
+def _decimal_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Tip neserializabil: {type(obj).__name__}")
+
+def parse_json(value):
+    return orjson.loads(value) if orjson is not None else json.loads(value)
+
+def dumps_line(row_dict):
+    """Un rând NDJSON (bytes, fără newline)."""
+    if orjson is not None:
+        return orjson.dumps(row_dict, default=_decimal_default)
+    return json.dumps(row_dict, ensure_ascii=False, cls=DecimalEncoder).encode("utf-8")
+
+def dumps_item(row_dict):
+    # Elementul unui tablou scris cu json.dump(..., indent=4): același text, indentat încă un nivel
+    text_item = json.dumps(row_dict, indent=4, ensure_ascii=False, cls=DecimalEncoder)
+    return ("    " + text_item.replace("\n", "\n    ")).encode("utf-8")
+
+def transform_row(row_dict):
+    if "metadata" in row_dict and row_dict["metadata"]:
+        try:
+            meta = parse_json(row_dict["metadata"])
+            row_dict["metadata_parsed"] = meta
+
+            if isinstance(meta, dict):
+                row_dict["detalii_tehnice"] = {
+                    "browser_utilizat": meta.get("browser", "Necunoscut"),
+                    "sistem_operare": meta.get("os", "Necunoscut"),
+                    "campanie_sursa": meta.get("source", "Direct")
+                }
+        except (ValueError, TypeError):
+            pass
+
+    if "IstoricMetadata" in row_dict and row_dict["IstoricMetadata"]:
+        try:
+            row_dict["IstoricMetadata"] = parse_json(row_dict["IstoricMetadata"])
+        except (ValueError, TypeError):
+            pass
+    return row_dict
+
+def peak_rss_mb():
+    """RSS-ul maxim al procesului de la pornire (MB); None dacă platforma nu îl expune."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows: peak_wset
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+def process_and_save(file_name, query, description, format="json"):
+    """Execută interogarea și scrie rezultatul pe măsură ce sosesc loturile de rânduri.
+
+    format="json" -> tablou JSON (același text ca json.dump(..., indent=4)), "ndjson" -> un obiect
+    pe linie. Memoria depinde de BATCH_SIZE, nu de numărul de rânduri; fișierul final apare
+    doar dacă interogarea s-a terminat cu cel puțin un rând.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"Format necunoscut: {format} ({', '.join(FORMATS)})")
     print(f"\n--- {description} ---")
+    path = f"{OUTPUT_DIR}/{file_name}.{format}"
+    tmp_path = f"{path}.tmp"
+    rows = 0
+    started = time.perf_counter()
     with engine.connect() as conn:
         try:
-            result = conn.execute(text(query)).fetchall()
-            if result:
-                output_data = []
-                for row in result:
-                    row_dict = dict(row._mapping)
-                    
-                    if "metadata" in row_dict and row_dict["metadata"]:
-                        try:
-                            meta = json.loads(row_dict["metadata"])
-                            row_dict["metadata_parsed"] = meta
-                            
-                            if isinstance(meta, dict):
-                                row_dict["detalii_tehnice"] = {
-                                    "browser_utilizat": meta.get("browser", "Necunoscut"),
-                                    "sistem_operare": meta.get("os", "Necunoscut"),
-                                    "campanie_sursa": meta.get("source", "Direct")
-                                }
-                        except:
-                            pass
-                    
-                    if "IstoricMetadata" in row_dict and row_dict["IstoricMetadata"]:
-                        try:
-                            row_dict["IstoricMetadata"] = json.loads(row_dict["IstoricMetadata"])
-                        except:
-                            pass
-                            
-                    output_data.append(row_dict)
-
-                path = f"{OUTPUT_DIR}/{file_name}.json"
-                with open(path, "w", encoding='utf-8') as f:
-                    json.dump(output_data, f, indent=4, ensure_ascii=False, cls=DecimalEncoder)
-                
-                print(f"Succes! Date salvate în: {path}")
-                print(f"Total rânduri procesate: {len(output_data)}")
-            else:
-                print("Nu s-au găsit date pentru intervalul selectat (Ultimul Trimestru).")
+            result = conn.execution_options(stream_results=True, yield_per=BATCH_SIZE).execute(text(query))
+            with open(tmp_path, "wb") as f:
+                for batch in result.partitions():
+                    chunk = []
+                    for row in batch:
+                        row_dict = transform_row(dict(row._mapping))
+                        if format == "ndjson":
+                            chunk.append(dumps_line(row_dict) + b"\n")
+                        else:
+                            chunk.append((b"[\n" if rows == 0 else b",\n") + dumps_item(row_dict))
+                        rows += 1
+                    f.write(b"".join(chunk))
+                if format == "json" and rows:
+                    f.write(b"\n]")
         except Exception as e:
             print(f"Eroare la execuția query-ului: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return 0
+
+    if not rows:
+        os.remove(tmp_path)
+        print("Nu s-au găsit date pentru intervalul selectat (Ultimul Trimestru).")
+        return 0
+    os.replace(tmp_path, path)
+    elapsed = time.perf_counter() - started
+    peak = peak_rss_mb()
+    print(f"Succes! Date salvate în: {path}")
+    print(f"Total rânduri procesate: {rows} ({rows / max(elapsed, 1e-9):.0f} rânduri/s, "
+          f"{os.path.getsize(path) / 1024 / 1024:.1f} MB"
+          + (f", RSS maxim {peak:.0f} MB)" if peak is not None else ")"))
+    return rows
 
 def menu_json():
     while True:
@@ -76,6 +150,7 @@ def menu_json():
         print("2. Istoric context Utilizator Top (Limitat la 3 luni)")
         print("3. Analiză Surse Trafic Premium (Filtru Timp + Volum)")
         print("4. Rulează toate analizele (Filtru Trimestru)")
+        print("5. Export complet trimestru, fără TOP (NDJSON, streaming)")
         print("0. Ieșire")
         
         opt = input("\nAlege opțiunea: ")
@@ -127,6 +202,8 @@ def menu_json():
 
         elif opt == "4":
             menu_json_auto_run_all()
+        elif opt == "5":
+            export_trimestru("ndjson")
         elif opt == "0":
             break
         else:
@@ -145,5 +222,25 @@ def menu_json_auto_run_all():
     for name, query in q_list:
         process_and_save(name, query, f"Auto-Raport: {name}")
 
+def export_trimestru(format="ndjson"):
+    """Analizele 1-3 fără TOP: toate rândurile trimestrului, scrise în streaming."""
+    print(f"Export complet pentru ultimul trimestru ({format})...")
+    trei_luni_sql = "CONVERT(VARCHAR(8), DATEADD(month, -3, GETDATE()), 112)"
+
+    q_list = [
+        ("comenzi_tehnice_trimestru", f"SELECT p.name AS Produs, f.sales_amount, f.metadata, u.nume AS Client, l.region AS Regiune FROM FactOrderItems f INNER JOIN DimProduct p ON f.product_id = p.product_id INNER JOIN DimUser u ON f.user_id = u.user_id INNER JOIN DimLocation l ON f.location_id = l.location_id WHERE f.metadata IS NOT NULL AND f.time_id >= {trei_luni_sql} ORDER BY f.time_id DESC, f.fact_id DESC"),
+        ("istoric_utilizatori_trimestru", f"SELECT u.nume, (SELECT f.metadata FROM FactOrderItems f WHERE f.user_id = u.user_id AND f.time_id >= {trei_luni_sql} FOR JSON PATH) as IstoricMetadata FROM DimUser u JOIN FactOrderItems f ON u.user_id = f.user_id GROUP BY u.user_id, u.nume ORDER BY COUNT(f.fact_id) DESC"),
+        ("surse_trafic_trimestru", f"SELECT f.fact_id, f.sales_amount, f.metadata FROM FactOrderItems f WHERE f.metadata IS NOT NULL AND f.time_id >= {trei_luni_sql} ORDER BY f.sales_amount DESC"),
+    ]
+
+    for name, query in q_list:
+        process_and_save(name, query, f"Export: {name}", format=format)
+
 if __name__ == "__main__":
-    menu_json()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Analizele JSON DWH (ultimul trimestru)")
+    parser.add_argument("--export", choices=FORMATS, help="exportul complet al trimestrului, fără meniu")
+    args = parser.parse_args()
+    if args.export:
+        export_trimestru(args.export)
+    else:
+        menu_json()
\ No newline at end of file
@@ -1,4 +1,12 @@
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+matplotlib.use("Agg")  # graficele se salvează doar în fișiere; Agg merge și în procesele din pool
 import pandas as pd
 import matplotlib.pyplot as plt
 from sqlalchemy import create_engine, text
@@ -17,9 +25,116 @@ OUTPUT_DIR = "graphs_output"
 if not os.path.exists(OUTPUT_DIR):
     os.makedirs(OUTPUT_DIR)
 
+# Amprenta datelor fiecărui grafic la ultima randare (graficul nu se redesenează dacă nu s-a schimbat)
+HASHES_FILE = os.path.join(OUTPUT_DIR, "chart_hashes.json")
+
 # Filtru global pentru ultimele 3 luni (format YYYYMMDD pentru time_id)
 TREI_LUNI_SQL = "CONVERT(VARCHAR(8), DATEADD(month, -3, GETDATE()), 112)"
 
+# Modul batch: faptele din fereastră citite o singură dată (doar chei și sume), dimensiunile separat
+FACTS_SQL = f"""
+SELECT f.time_id, f.product_id, f.location_id, f.sales_amount
+FROM FactOrderItems f
+WHERE f.time_id >= {TREI_LUNI_SQL}
+"""
+PRODUCTS_SQL = "SELECT product_id, name FROM DimProduct"
+LOCATIONS_SQL = "SELECT location_id, region FROM DimLocation"
+
+# --- Desenarea graficelor (aceeași în meniu și în modul batch) ---
+
+def draw_venituri_servicii(df):
+    fig = plt.figure(figsize=(10, 5))
+    plt.bar(df['Serviciu'], df['TotalIncasari'], color='plum')
+    plt.title('Venituri per Tip de Serviciu Digital (Ultimul Trimestru)')
+    plt.ylabel('Suma')
+    return fig
+
+def draw_distributie_regiuni(df):
+    fig = plt.figure(figsize=(8, 8))
+    plt.pie(df['ComenziActive'], labels=df['Regiune'], autopct='%1.1f%%', startangle=140)
+    plt.title('Top Regiuni după Volumul de Comenzi (Recent)')
+    return fig
+
+def draw_evolutie_vanzari(df):
+    fig = plt.figure(figsize=(12, 6))
+    plt.plot(df['Data_Formata'], df['Vanzari'], marker='o', linestyle='-', color='green', linewidth=2)
+    plt.title('Evoluție Vânzări Zilnice (Ultimele 3 Luni)')
+    plt.xlabel('Data')
+    plt.ylabel('Vânzări')
+    plt.xticks(rotation=45)
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    return fig
+
+# Grafic -> (funcția de desenare, fișierul din OUTPUT_DIR)
+CHARTS = {
+    "venituri_servicii": (draw_venituri_servicii, "venituri_servicii.png"),
+    "distributie_regiuni": (draw_distributie_regiuni, "regiuni_top_pie.png"),
+    "evolutie_vanzari": (draw_evolutie_vanzari, "evolutie_vanzari.png"),
+}
+
+def render_chart(name, df):
+    """Desenează și salvează graficul, apoi închide figura (altfel memoria crește la fiecare rulare)."""
+    draw, file_name = CHARTS[name]
+    path = f"{OUTPUT_DIR}/{file_name}"
+    fig = draw(df)
+    try:
+        fig.savefig(path)
+    finally:
+        plt.close(fig)
+    return path
+
+def data_hash(name, df):
+    digest = hashlib.sha1(name.encode("utf-8"))
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+def load_hashes():
+    try:
+        with open(HASHES_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+_pool = None
+
+def render_charts(frames, parallel=False):
+    """Randează graficele ale căror date s-au schimbat; cu parallel=True, în procese separate."""
+    global _pool
+    hashes = load_hashes()
+    todo = {}
+    for name, df in frames.items():
+        digest = data_hash(name, df)
+        if hashes.get(name) == digest and os.path.exists(f"{OUTPUT_DIR}/{CHARTS[name][1]}"):
+            print(f"--> Grafic neschimbat (aceleași date): {OUTPUT_DIR}/{CHARTS[name][1]}")
+        else:
+            todo[name] = (df, digest)
+
+    if parallel and len(todo) > 1:
+        if _pool is None:
+            # Pool-ul rămâne pornit între iterațiile meniului (pornirea proceselor costă)
+            _pool = ProcessPoolExecutor(max_workers=min(len(CHARTS), os.cpu_count() or 1))
+        futures = {name: _pool.submit(render_chart, name, df) for name, (df, _) in todo.items()}
+        paths = {name: future.result() for name, future in futures.items()}
+    else:
+        paths = {name: render_chart(name, df) for name, (df, _) in todo.items()}
+
+    for name, path in paths.items():
+        hashes[name] = todo[name][1]
+        print(f"--> Grafic salvat: {path}")
+    if paths:
+        with open(HASHES_FILE, "w", encoding="utf-8") as f:
+            json.dump(hashes, f, indent=2)
+    return len(paths)
+
+# --- Rapoartele individuale (meniu, opțiunile 1-3) ---
+
+def format_date_ids(ids):
+    # ID-ul numeric (YYYYMMDD) -> string formatat (DD.MM.YYYY)
+    s = ids.astype("int64").astype(str)
+    return (s.str[6:8] + "." + s.str[4:6] + "." + s.str[0:4]).where(s.str.len() == 8, s)
+
 def report_venituri_servicii():
     """Raport 1: Venituri per Tip de Serviciu (Bar Chart)"""
     print("\n[1] Raport: Venituri per Tip de Serviciu (Ultimele 3 luni)")
@@ -32,17 +147,9 @@ def report_venituri_servicii():
     ORDER BY TotalIncasari DESC
     """
     df = pd.read_sql(text(q), engine)
-    
+    show_venituri_servicii(df)
     if not df.empty:
-        print(df.to_string(index=False))
-        plt.figure(figsize=(10, 5))
-        plt.bar(df['Serviciu'], df['TotalIncasari'], color='plum')
-        plt.title('Venituri per Tip de Serviciu Digital (Ultimul Trimestru)')
-        plt.ylabel('Suma')
-        plt.savefig(f"{OUTPUT_DIR}/venituri_servicii.png")
-        print(f"--> Grafic salvat: {OUTPUT_DIR}/venituri_servicii.png")
-    else:
-        print("Nu există date de vânzări în ultimele 3 luni.")
+        render_charts({"venituri_servicii": df})
 
 def report_distributie_regiuni():
     """Raport 2: Distribuția Comenzilor pe Regiuni (Pie Chart)"""
@@ -56,16 +163,9 @@ def report_distributie_regiuni():
     ORDER BY ComenziActive DESC
     """
     df = pd.read_sql(text(q), engine)
-    
+    show_distributie_regiuni(df)
     if not df.empty:
-        print(df.to_string(index=False))
-        plt.figure(figsize=(8, 8))
-        plt.pie(df['ComenziActive'], labels=df['Regiune'], autopct='%1.1f%%', startangle=140)
-        plt.title('Top Regiuni după Volumul de Comenzi (Recent)')
-        plt.savefig(f"{OUTPUT_DIR}/regiuni_top_pie.png")
-        print(f"--> Grafic salvat: {OUTPUT_DIR}/regiuni_top_pie.png")
-    else:
-        print("Nu există date geografice pentru ultimele 3 luni.")
+        render_charts({"distributie_regiuni": df})
 
 def report_evolutie_vanzari():
     """Raport 3: Evoluția Vânzărilor în Timp (Line Chart)"""
@@ -78,31 +178,107 @@ def report_evolutie_vanzari():
     ORDER BY f.time_id
     """
     df = pd.read_sql(text(q), engine)
-    
     if not df.empty:
-        # Convertim ID-ul numeric (YYYYMMDD) în string formatat (DD.MM.YYYY)
-        def format_date_id(date_id):
-            s = str(int(date_id))
-            if len(s) == 8:
-                return f"{s[6:8]}.{s[4:6]}.{s[0:4]}"
-            return s
-
-        df['Data_Formata'] = df['Perioada'].apply(format_date_id)
-        
-        print(df[['Data_Formata', 'Vanzari']].to_string(index=False))
-        
-        plt.figure(figsize=(12, 6))
-        plt.plot(df['Data_Formata'], df['Vanzari'], marker='o', linestyle='-', color='green', linewidth=2)
-        plt.title('Evoluție Vânzări Zilnice (Ultimele 3 Luni)')
-        plt.xlabel('Data')
-        plt.ylabel('Vânzări')
-        plt.xticks(rotation=45)
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.tight_layout()
-        plt.savefig(f"{OUTPUT_DIR}/evolutie_vanzari.png")
-        print(f"--> Grafic salvat: {OUTPUT_DIR}/evolutie_vanzari.png")
+        df['Data_Formata'] = format_date_ids(df['Perioada'])
+    show_evolutie_vanzari(df)
+    if not df.empty:
+        render_charts({"evolutie_vanzari": df})
+
+def show_venituri_servicii(df):
+    if df.empty:
+        print("Nu există date de vânzări în ultimele 3 luni.")
     else:
+        print(df.to_string(index=False))
+
+def show_distributie_regiuni(df):
+    if df.empty:
+        print("Nu există date geografice pentru ultimele 3 luni.")
+    else:
+        print(df.to_string(index=False))
+
+def show_evolutie_vanzari(df):
+    if df.empty:
         print("Nu există date cronologice pentru ultimele 3 luni.")
+    else:
+        print(df[['Data_Formata', 'Vanzari']].to_string(index=False))
+
+# --- Modul batch (opțiunea 4): o singură extragere, agregatele derivate în memorie ---
+
+def extract_window():
+    """Faptele din ultimele 3 luni ca DataFrame tipizat (chei int32, sume float64, nume category)."""
+    with engine.connect() as conn:
+        facts = pd.read_sql(text(FACTS_SQL), conn)
+        products = pd.read_sql(text(PRODUCTS_SQL), conn)
+        locations = pd.read_sql(text(LOCATIONS_SQL), conn)
+    # MONEY / DECIMAL vin ca obiecte Decimal; float64 pentru agregări vectorizate
+    facts = facts.astype({"time_id": "int32", "sales_amount": "float64"})
+    # Cheile lipsă (NULL) sau fără rând în dimensiune devin NaN, ca JOIN-ul din rapoartele individuale
+    facts["Serviciu"] = facts["product_id"].map(products.set_index("product_id")["name"]).astype("category")
+    facts["Regiune"] = facts["location_id"].map(locations.set_index("location_id")["region"]).astype("category")
+    return facts[["time_id", "Serviciu", "Regiune", "sales_amount"]]
+
+def derive_reports(facts):
+    """Cele trei agregate din rapoartele 1-3, cu aceleași coloane, calculate din aceleași fapte."""
+    venituri = (
+        facts.dropna(subset=["Serviciu"])
+        .groupby("Serviciu", observed=True)["sales_amount"]
+        .agg(TotalIncasari="sum", NrComenzi="size")
+        .reset_index()
+        .sort_values("TotalIncasari", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+    venituri["Serviciu"] = venituri["Serviciu"].astype(str)
+
+    regiuni = (
+        facts["Regiune"].dropna().value_counts(sort=False)
+        .rename_axis("Regiune").reset_index(name="ComenziActive")
+        .query("ComenziActive > 0")
+        .sort_values("ComenziActive", ascending=False, kind="stable")
+        .head(5)
+        .reset_index(drop=True)
+    )
+    regiuni["Regiune"] = regiuni["Regiune"].astype(str)
+
+    evolutie = (
+        facts.groupby("time_id")["sales_amount"].sum()
+        .rename_axis("Perioada").reset_index(name="Vanzari")
+        .sort_values("Perioada")
+        .reset_index(drop=True)
+    )
+    evolutie["Data_Formata"] = format_date_ids(evolutie["Perioada"])
+
+    return {"venituri_servicii": venituri, "distributie_regiuni": regiuni, "evolutie_vanzari": evolutie}
+
+def run_all(parallel=True):
+    """Rapoartele 1-3 dintr-o singură citire a faptelor; timpii fiecărei etape la final."""
+    timings = {}
+    started = time.perf_counter()
+
+    t0 = time.perf_counter()
+    facts = extract_window()
+    timings["extragere"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reports = derive_reports(facts)
+    timings["agregare"] = time.perf_counter() - t0
+
+    print("\n[1] Raport: Venituri per Tip de Serviciu (Ultimele 3 luni)")
+    show_venituri_servicii(reports["venituri_servicii"])
+    print("\n[2] Raport: Distribuția Comenzilor pe Regiuni (Top 5 - Ultimele 3 luni)")
+    show_distributie_regiuni(reports["distributie_regiuni"])
+    print("\n[3] Raport: Evoluția Vânzărilor în ultimele 3 luni")
+    show_evolutie_vanzari(reports["evolutie_vanzari"])
+
+    t0 = time.perf_counter()
+    rendered = render_charts({name: df for name, df in reports.items() if not df.empty}, parallel=parallel)
+    timings["randare"] = time.perf_counter() - t0
+    timings["total"] = time.perf_counter() - started
+
+    memory = facts.memory_usage(deep=True).sum() / 1024 / 1024
+    print(f"\nTimpi: {len(facts)} rânduri de fapte ({memory:.1f} MB), {rendered} grafice randate")
+    for stage, seconds in timings.items():
+        print(f"  {stage:<10} {seconds * 1000:>9.1f} ms")
+    return timings
 
 def main_menu():
     while True:
@@ -112,11 +288,11 @@ def main_menu():
         print("1. Venituri per Tip de Serviciu (Bar Chart)")
         print("2. Distribuție pe Regiuni (Pie Chart)")
         print("3. Evoluție Vânzări (Line Chart)")
-        print("4. Rulează toate rapoartele")
+        print("4. Rulează toate rapoartele (o singură citire, grafice în paralel)")
         print("0. Ieșire")
-        
+
         opt = input("\nAlege opțiunea: ")
-        
+
         if opt == "1":
             report_venituri_servicii()
         elif opt == "2":
@@ -124,9 +300,7 @@ def main_menu():
         elif opt == "3":
             report_evolutie_vanzari()
         elif opt == "4":
-            report_venituri_servicii()
-            report_distributie_regiuni()
-            report_evolutie_vanzari()
+            run_all()
         elif opt == "0":
             print("Ieșire program...")
             break
@@ -134,4 +308,15 @@ def main_menu():
             print("Opțiune invalidă!")
 
 if __name__ == "__main__":
-    main_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Rapoartele vizuale DWH (ultimele 3 luni)")
+    parser.add_argument("--batch", action="store_true", help="rulează toate rapoartele fără meniu (opțiunea 4)")
+    parser.add_argument("--serial", action="store_true", help="în modul batch, graficele se randează pe rând")
+    args = parser.parse_args()
+    try:
+        if args.batch:
+            run_all(parallel=not args.serial)
+        else:
+            main_menu()
+    finally:
+        if _pool is not None:
+            _pool.shutdown()